@@ -0,0 +1,243 @@
+"""
+Sorted, filtered pages of a router's PPP accounts.
+An AccountIndex is built once per snapshot on top of its SessionColumns. Each
+sort order is computed on first use and kept, so a page request is a filter
+mask applied to a precomputed order plus a slice, and its response size does
+not depend on the number of accounts.
+"""
+
+import base64
+import json
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from session_columns import SessionColumns, member_name
+
+# Sort keys accepted by AccountIndex.page(); ties are broken by name, then by row number
+SORT_KEYS = ('name', 'uptime', 'downtime', 'rx', 'tx', 'status')
+
+# Account statuses, in the order they sort
+STATUSES = ('online', 'offline', 'disabled')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(sort: str, descending: bool, value, name: str, row: int) -> str:
+    """Opaque cursor pointing just after the row with the given sort value, name and row number"""
+    document = json.dumps([sort, descending, value, name, row], separators=(',', ':'))
+    return base64.urlsafe_b64encode(document.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[object, str, int]:
+    """
+    Read a cursor made by encode_cursor().
+
+    Args:
+        cursor: Cursor from a previous page
+        sort: Sort key of the current request
+        descending: Sort direction of the current request
+
+    Returns:
+        tuple: (sort value, name, row number) of the last row of the previous page
+
+    Raises:
+        ValueError: If the cursor is malformed or was made for another sort order
+    """
+    try:
+        document = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, cursor_descending, value, name, row = json.loads(document)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(name, str) or not isinstance(row, int) or isinstance(row, bool):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or cursor_descending != descending:
+        raise ValueError("Cursor does not match the requested sort order")
+    return value, name, row
+
+
+class AccountIndex:
+    """
+    Sort orders and filter columns over one snapshot's SessionColumns.
+
+    Immutable apart from the lazily filled order cache, so it can be cached
+    on the snapshot and shared between requests.
+    """
+
+    def __init__(self, columns: SessionColumns):
+        """
+        Build the filter columns.
+
+        Args:
+            columns: The snapshot's session columns
+        """
+        self.columns = columns
+        secrets = columns.secrets
+        self.names = np.array([str(secret.get('name', '')).lower() for secret in secrets], dtype=str)
+        self.profiles = np.array([str(secret.get('profile', '')).lower() for secret in secrets], dtype=object)
+        # Index into STATUSES; a disabled account that is still connected counts as online
+        self.status = np.where(columns.online, 0, np.where(columns.disabled, 2, 1)).astype(np.int8)
+        # Names differ only by case at worst; the stable sort breaks those ties by row number
+        self.name_rank = np.empty(len(secrets), dtype=np.int64)
+        self.name_rank[np.argsort(self.names, kind='stable')] = np.arange(len(secrets))
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def sort_values(self, sort: str) -> np.ndarray:
+        """
+        Values rows are ordered by for a sort key, ascending.
+
+        Downtime is ordered by the last logout time, so the order does not
+        depend on the current time: connected accounts first, then the most
+        recent logouts, and accounts that never logged out last.
+        """
+        columns = self.columns
+        if sort == 'name':
+            return self.name_rank
+        if sort == 'uptime':
+            return columns.uptime_seconds
+        if sort == 'downtime':
+            values = np.where(np.isnan(columns.last_logged_out), np.inf, -columns.last_logged_out)
+            return np.where(columns.online, -np.inf, values)
+        if sort == 'rx':
+            return columns.rx_rate
+        if sort == 'tx':
+            return columns.tx_rate
+        if sort == 'status':
+            return self.status
+        raise ValueError(f"Unknown sort key: {sort}")
+
+    def order(self, sort: str, descending: bool = False) -> np.ndarray:
+        """
+        Row numbers in sort order, ties broken by ascending name and row number; computed once per
+        key and direction. A descending name order is the exact reverse of the ascending one.
+
+        Returns:
+            ndarray: int64 row numbers
+        """
+        key = (sort, descending)
+        with self._lock:
+            order = self._orders.get(key)
+        if order is None:
+            values = self.sort_values(sort)
+            if sort == 'name':
+                order = np.argsort(-values if descending else values, kind='stable')
+            else:
+                order = np.lexsort((self.name_rank, -values if descending else values))
+            with self._lock:
+                self._orders[key] = order
+        return order
+
+    def filter_mask(self, statuses: Optional[Iterable[str]] = None, profiles: Optional[Iterable[str]] = None,
+                    members: Optional[Iterable] = None, name: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Rows matching all given filters.
+
+        Args:
+            statuses: Allowed statuses (see STATUSES)
+            profiles: Allowed PPP profiles, case-insensitive
+            members: Members of a group (names or {'name': ...}), case-insensitive
+            name: Case-insensitive substring of the account name
+
+        Returns:
+            ndarray: bool mask, or None if no filter was given
+        """
+        mask = None
+
+        def narrow(condition):
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        if statuses is not None:
+            codes = [STATUSES.index(status) for status in statuses]
+            narrow(np.isin(self.status, codes))
+        if profiles is not None:
+            narrow(np.isin(self.profiles, [profile.lower() for profile in profiles]))
+        if members is not None:
+            rows = [self.columns.row_by_name.get(member_name(member).lower()) for member in members]
+            member_mask = np.zeros(len(self), dtype=bool)
+            member_mask[[row for row in rows if row is not None]] = True
+            narrow(member_mask)
+        if name:
+            needle = name.lower()
+            narrow(np.fromiter((needle in candidate for candidate in self.names.tolist()),
+                               dtype=bool, count=len(self)))
+        return mask
+
+    def page(self, sort: str = 'name', descending: bool = False, mask: Optional[np.ndarray] = None,
+             limit: int = DEFAULT_PAGE_SIZE, offset: int = 0,
+             after: Optional[Tuple[object, str]] = None) -> Tuple[np.ndarray, int, int]:
+        """
+        Select one page of rows.
+
+        Args:
+            sort: Sort key (see SORT_KEYS)
+            descending: Sort direction
+            mask: Rows to include (see filter_mask()), or None for all
+            limit: Page size
+            offset: Rows of the filtered order to skip; ignored when after is given
+            after: (sort value, name, row number) of the last row of the previous page, from a cursor
+
+        Returns:
+            tuple: (row numbers of the page, number of matching rows, offset of the page)
+        """
+        rows = self.order(sort, descending)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        if after is not None:
+            offset = self._position_after(rows, sort, descending, *after)
+        return rows[offset:offset + limit], len(rows), offset
+
+    def cursor_for(self, row: int, sort: str, descending: bool) -> str:
+        """Cursor continuing after a row"""
+        name = str(self.names[row])
+        value = name if sort == 'name' else self.sort_values(sort)[row].item()
+        return encode_cursor(sort, descending, value, name, int(row))
+
+    def _position_after(self, rows: np.ndarray, sort: str, descending: bool, value, name: str, row: int) -> int:
+        """Index of the first of the ordered rows that comes after (value, name, row)"""
+        names = self.names[rows]
+        if sort == 'name':
+            name = str(value)
+            if descending:
+                after = (names < name) | ((names == name) & (rows < row))
+            else:
+                after = (names > name) | ((names == name) & (rows > row))
+        else:
+            try:
+                value = float(value)
+            except (TypeError, ValueError) as e:
+                raise ValueError("Invalid cursor") from e
+            values = self.sort_values(sort)[rows]
+            beyond = values < value if descending else values > value
+            after = beyond | ((values == value) & ((names > name) | ((names == name) & (rows > row))))
+        return int(np.argmax(after)) if after.any() else len(rows)
+
+    def rows(self, rows: Iterable[int], now: Optional[float] = None) -> List[Dict]:
+        """
+        Account rows for a page: the secret plus status, session and traffic fields.
+
+        Returns:
+            list: Copies of the secrets with status, uptime_seconds (-1 if offline),
+                  downtime (seconds, '-' if online or unknown), last_uptime, rx_rate and tx_rate
+        """
+        columns = self.columns
+        now = time.time() if now is None else now
+        result = []
+        for row in rows:
+            row = int(row)
+            account = dict(columns.secrets[row])
+            logged_out = columns.last_logged_out[row]
+            account['status'] = STATUSES[self.status[row]].capitalize()
+            account['uptime_seconds'] = int(columns.uptime_seconds[row])
+            account['downtime'] = ('-' if columns.online[row] or np.isnan(logged_out)
+                                   else max(int(now - logged_out), 0))
+            account['last_uptime'] = account.get('last-logged-out', '-')
+            account['rx_rate'] = float(columns.rx_rate[row])
+            account['tx_rate'] = float(columns.tx_rate[row])
+            result.append(account)
+        return result
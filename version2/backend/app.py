@@ -2,17 +2,29 @@ from flask import Flask, render_template, jsonify, request, send_file
 from flask_cors import CORS
 import json
 import os
+from collections import OrderedDict
 from datetime import datetime, timezone
 import logging
 from mikrotik_client import MikroTikClient
 from router_manager import router_manager
+from collector import collector, COLLECT_INTERVAL
+from session_columns import SessionColumns
+from account_index import AccountIndex, SORT_KEYS, STATUSES, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor
+from dashboard_delta import DASHBOARD_LISTS, DashboardSubscriptions, room_name, wire_message
+from dashboard_broadcast import BroadcastCadence, ClientSendQueues
+from json_payload import COMPRESS_MIN_SIZE, ENCODINGS, FIELDS_ENCODINGS, EncodedJSON, SocketJSON
+from field_projection import parse_fields, project, projection_key
+from columnar_format import COLUMNAR, encode_lists, encode_rows, parse_format
+from search_index import SearchIndex, DEFAULT_RESULTS, MAX_RESULTS
+from lookup_index import IP, MAC, LookupIndex, normalize_ip, normalize_mac
 from logger import log, info, error, warning, debug
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import threading, time
+import numpy as np
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for API endpoints
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", json=SocketJSON)
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO)
@@ -33,11 +45,116 @@ def get_active_router_id():
             active_router_id = 'router_001'
     return active_router_id
 
-def get_mikrotik_client(router_id=None):
-    """Create and return a MikroTik client instance for the specified router"""
+def get_router_snapshot(router_id=None):
+    """Get the latest collected snapshot for the specified router"""
     if not router_id:
         router_id = get_active_router_id()
-    return router_manager.get_mikrotik_client(router_id)
+    return collector.get_snapshot(router_id)
+
+def snapshot_error(snapshot):
+    """Error message for a missing or failed snapshot"""
+    if snapshot is None:
+        return 'Router not found'
+    return snapshot.error or 'Failed to connect to router'
+
+def payload_response(payload, fresh=None, fresh_within=()):
+    """
+    Serve an EncodedJSON as it is.
+
+    Bodies of at least COMPRESS_MIN_SIZE bytes are compressed with the best
+    encoding the client accepts. Every response carries an ETag and must be
+    revalidated, so a client that still has the body gets a 304.
+
+    fresh holds fields that change with every request (the current time) and
+    are added to the body when it is sent (into the nested object at
+    fresh_within, if given). They are not part of the ETag, which is then weak.
+    """
+    encoding = None
+    if len(payload) >= COMPRESS_MIN_SIZE:
+        encoding = request.accept_encodings.best_match(FIELDS_ENCODINGS if fresh else ENCODINGS)
+    etag = payload.etag(encoding)
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        body = payload.with_fields(fresh, encoding, fresh_within) if fresh else payload.encoded(encoding)
+        response = app.response_class(body, mimetype='application/json')
+        if encoding:
+            response.content_encoding = encoding
+    response.set_etag(etag, weak=bool(fresh))
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = True
+    return response
+
+def request_time():
+    """current_time field of a response, added to it by payload_response()"""
+    return {'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+# Most (router, view) pairs whose last payload is kept; views with field projections are open-ended
+MAX_LATEST_PAYLOADS = 256
+
+# Last payload of each (router, view): (router settings, EncodedJSON), least recently used first
+latest_payloads = OrderedDict()
+latest_payloads_lock = threading.Lock()
+
+def cached_payload(snapshot, view, router, build):
+    """
+    EncodedJSON of a view of a snapshot, serialized once per snapshot version.
+
+    build(snapshot) makes the data, without fields that change per request
+    (those are passed to payload_response()); it runs again when the router's
+    settings change. A view whose content did not change since the previous
+    snapshot keeps the previous payload, so its bytes and ETag stay the same.
+    """
+    settings = f"{router['name']}:{router['host']}:{router['port']}" if router else ''
+
+    def build_payload(snapshot):
+        data = build(snapshot)
+        key = (snapshot.router_id, view)
+        with latest_payloads_lock:
+            previous = latest_payloads.get(key)
+            if previous is not None:
+                latest_payloads.move_to_end(key)
+        if previous is not None and previous[0] == settings and previous[1].data == data:
+            return previous[1]
+        payload = EncodedJSON(data)
+        with latest_payloads_lock:
+            latest_payloads[key] = (settings, payload)
+            latest_payloads.move_to_end(key)
+            while len(latest_payloads) > MAX_LATEST_PAYLOADS:
+                latest_payloads.popitem(last=False)
+        return payload
+
+    return snapshot.cached(f"payload:{view}:{settings}", build_payload)
+
+def snapshot_response(snapshot, view, router, build, projection=None, row_format=None, fresh=None):
+    """
+    JSON response for a view of a snapshot; see cached_payload() and payload_response().
+
+    With a projection (see parse_fields()) the view's lists are cut down to
+    the requested fields before serialization; with row_format COLUMNAR they
+    are sent as columnar tables.
+    """
+    if projection is None and row_format is None:
+        return payload_response(cached_payload(snapshot, view, router, build), fresh)
+
+    def build_view(snapshot):
+        data = build(snapshot)
+        if projection is not None:
+            data = project(data, projection)
+        if row_format == COLUMNAR:
+            data = encode_lists(data, projection or ())
+        return data
+
+    key = f"{view}?{projection_key(projection or {})}&{row_format or ''}"
+    return payload_response(cached_payload(snapshot, key, router, build_view), fresh)
+
+def fields_arg(lists, primary):
+    """Projection requested by the fields query parameter; raises ValueError for unknown fields"""
+    return parse_fields(request.args.get('fields'), lists, primary)
+
+def format_arg():
+    """Row format requested by the format query parameter (None for arrays of objects); raises ValueError"""
+    return parse_format(request.args.get('format'))
 
 @app.route('/')
 def index():
@@ -66,11 +183,6 @@ def api_status():
     """Get connection status and basic router info"""
     try:
         router_id = request.args.get('router_id', get_active_router_id())
-        client = get_mikrotik_client(router_id)
-        if client is None:
-            return jsonify({'success': False, 'connected': False, 'error': router_manager.last_client_error or 'Failed to connect to router', 'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
-        connected = client.test_connection()
-        
         router = router_manager.get_router(router_id)
         if not router:
             return jsonify({
@@ -80,8 +192,8 @@ def api_status():
                 'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             })
         
-        if connected:
-            identity = client.get_identity()
+        snapshot = get_router_snapshot(router_id)
+        if snapshot and snapshot.success:
             return jsonify({
                 'success': True,
                 'connected': True,
@@ -89,7 +201,7 @@ def api_status():
                 'router_name': router['name'],
                 'router_ip': router['host'],
                 'router_port': router['port'],
-                'identity': identity,
+                'identity': snapshot.identity,
                 'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             })
         else:
@@ -100,7 +212,7 @@ def api_status():
                 'router_name': router['name'],
                 'router_ip': router['host'],
                 'router_port': router['port'],
-                'error': 'Connection failed',
+                'error': snapshot_error(snapshot),
                 'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             })
     except Exception as e:
@@ -117,19 +229,16 @@ def api_resources():
     """Get system resources"""
     try:
         router_id = request.args.get('router_id', get_active_router_id())
-        client = get_mikrotik_client(router_id)
-        if client is None:
-            return jsonify({'success': False, 'error': router_manager.last_client_error or 'Failed to connect to router'})
-        if not client.test_connection():
-            return jsonify({'success': False, 'error': 'Not connected'})
+        snapshot = get_router_snapshot(router_id)
+        if not snapshot or not snapshot.success:
+            return jsonify({'success': False, 'error': snapshot_error(snapshot)})
         
-        resources = client.get_resources()
         router = router_manager.get_router(router_id)
         return jsonify({
             'success': True,
             'router_id': router_id,
             'router_name': router['name'] if router else 'Unknown',
-            'resources': resources,
+            'resources': snapshot.resources,
             'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         })
     except Exception as e:
@@ -141,21 +250,22 @@ def api_interfaces():
     """Get network interfaces"""
     try:
         router_id = request.args.get('router_id', get_active_router_id())
-        client = get_mikrotik_client(router_id)
-        if client is None:
-            return jsonify({'success': False, 'error': router_manager.last_client_error or 'Failed to connect to router'})
-        if not client.test_connection():
-            return jsonify({'success': False, 'error': 'Not connected'})
+        try:
+            projection = fields_arg({'interfaces': 'interfaces'}, 'interfaces')
+            row_format = format_arg()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        snapshot = get_router_snapshot(router_id)
+        if not snapshot or not snapshot.success:
+            return jsonify({'success': False, 'error': snapshot_error(snapshot)})
         
-        interfaces = client.get_interfaces()
         router = router_manager.get_router(router_id)
-        return jsonify({
+        return snapshot_response(snapshot, 'interfaces', router, lambda snapshot: {
             'success': True,
             'router_id': router_id,
             'router_name': router['name'] if router else 'Unknown',
-            'interfaces': interfaces,
-            'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
+            'interfaces': snapshot.interfaces
+        }, projection, row_format, request_time())
     except Exception as e:
         error(f"Error in interfaces API: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -165,49 +275,48 @@ def api_export():
     """Export all data as JSON"""
     try:
         router_id = request.args.get('router_id', get_active_router_id())
-        client = get_mikrotik_client(router_id)
-        if client is None:
-            return jsonify({'success': False, 'error': router_manager.last_client_error or 'Failed to connect to router'})
-        if not client.test_connection():
-            return jsonify({'success': False, 'error': 'Not connected'})
+        snapshot = get_router_snapshot(router_id)
+        if not snapshot or not snapshot.success:
+            return jsonify({'success': False, 'error': snapshot_error(snapshot)})
         
         router = router_manager.get_router(router_id)
-        
-        # Gather all data
-        data = {
-            'export_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'router_info': {
-                'id': router_id,
-                'name': router['name'] if router else 'Unknown',
-                'host': router['host'] if router else '',
-                'port': router['port'] if router else 8728,
-                'identity': client.get_identity()
-            },
-            'resources': client.get_resources(),
-            'interfaces': client.get_interfaces(),
-            'pppoe_interfaces': client.get_pppoe_interfaces(),
-            'ppp_secrets': client.get_ppp_secrets(),
-            'ppp_active': client.get_ppp_active(),
-            'ppp_accounts': client.get_ppp_secrets()
-        }
-        
-        return jsonify({
-            'success': True,
-            'data': data
-        })
+        payload = cached_payload(snapshot, 'export', router, lambda snapshot: build_export(snapshot, router_id, router))
+        return payload_response(payload, {'export_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, ('data',))
     except Exception as e:
         error(f"Error in export API: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+def build_export(snapshot, router_id, router):
+    """Export document with all data of a snapshot; api_export() adds data.export_time"""
+    data = {
+        'router_info': {
+            'id': router_id,
+            'name': router['name'] if router else 'Unknown',
+            'host': router['host'] if router else '',
+            'port': router['port'] if router else 8728,
+            'identity': snapshot.identity
+        },
+        'resources': snapshot.resources,
+        'interfaces': snapshot.interfaces,
+        'pppoe_interfaces': snapshot.pppoe_interfaces,
+        'ppp_secrets': snapshot.ppp_secrets,
+        'ppp_active': snapshot.ppp_active,
+        'ppp_accounts': snapshot.ppp_secrets
+    }
+    return {
+        'success': True,
+        'data': data
+    }
+
 @app.route('/api/health')
 def api_health():
     """Health check endpoint"""
     try:
         router_id = request.args.get('router_id', get_active_router_id())
-        client = get_mikrotik_client(router_id)
-        if client is None:
-            return jsonify({'success': False, 'status': 'unhealthy', 'error': router_manager.last_client_error or 'Failed to connect to router', 'timestamp': datetime.now().isoformat()})
-        connected = client.test_connection()
+        snapshot = get_router_snapshot(router_id)
+        if snapshot is None:
+            return jsonify({'success': False, 'status': 'unhealthy', 'error': snapshot_error(snapshot), 'timestamp': datetime.now().isoformat()})
+        connected = snapshot.success
         
         router = router_manager.get_router(router_id)
         return jsonify({
@@ -216,6 +325,8 @@ def api_health():
             'router_name': router['name'] if router else 'Unknown',
             'status': 'healthy' if connected else 'unhealthy',
             'connected': connected,
+            'last_collected': snapshot.collected_at,
+            'coalesced_fetches': router_manager.get_single_flight_stats(),
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
@@ -300,21 +411,22 @@ def api_ppp_active():
     """Get active PPP connections"""
     try:
         router_id = request.args.get('router_id', get_active_router_id())
-        client = get_mikrotik_client(router_id)
-        if client is None:
-            return jsonify({'success': False, 'error': router_manager.last_client_error or 'Failed to connect to router'})
-        if not client.test_connection():
-            return jsonify({'success': False, 'error': 'Not connected'})
+        try:
+            projection = fields_arg({'ppp_active': 'ppp_active'}, 'ppp_active')
+            row_format = format_arg()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        snapshot = get_router_snapshot(router_id)
+        if not snapshot or not snapshot.success:
+            return jsonify({'success': False, 'error': snapshot_error(snapshot)})
         
-        ppp_active = client.get_ppp_active()
         router = router_manager.get_router(router_id)
-        return jsonify({
+        return snapshot_response(snapshot, 'ppp_active', router, lambda snapshot: {
             'success': True,
             'router_id': router_id,
             'router_name': router['name'] if router else 'Unknown',
-            'ppp_active': ppp_active,
-            'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
+            'ppp_active': snapshot.ppp_active
+        }, projection, row_format, request_time())
     except Exception as e:
         error(f"Error in PPP active API: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -324,132 +436,313 @@ def api_ppp_accounts():
     """Get PPP accounts (secrets)"""
     try:
         router_id = request.args.get('router_id', get_active_router_id())
-        client = get_mikrotik_client(router_id)
-        if client is None:
-            return jsonify({'success': False, 'error': router_manager.last_client_error or 'Failed to connect to router'})
-        if not client.test_connection():
-            return jsonify({'success': False, 'error': 'Not connected'})
+        try:
+            projection = fields_arg({'ppp_accounts': 'ppp_secrets'}, 'ppp_accounts')
+            row_format = format_arg()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        snapshot = get_router_snapshot(router_id)
+        if not snapshot or not snapshot.success:
+            return jsonify({'success': False, 'error': snapshot_error(snapshot)})
         
-        ppp_accounts = client.get_ppp_secrets()
         router = router_manager.get_router(router_id)
-        return jsonify({
+        return snapshot_response(snapshot, 'ppp_accounts', router, lambda snapshot: {
             'success': True,
             'router_id': router_id,
             'router_name': router['name'] if router else 'Unknown',
-            'ppp_accounts': ppp_accounts,
-            'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
+            'ppp_accounts': snapshot.ppp_secrets
+        }, projection, row_format, request_time())
     except Exception as e:
         error(f"Error in PPP accounts API: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+def build_session_columns(snapshot):
+    """Columnar view of a snapshot's PPP accounts, built once per snapshot"""
+    return SessionColumns.from_snapshot(snapshot)
+
+def build_accounts_summary(snapshot):
+    """Split a snapshot's PPP accounts into online and offline lists with statistics"""
+    all_accounts = snapshot.ppp_secrets
+    columns = snapshot.cached('session_columns', build_session_columns)
+    
+    online_accounts = [all_accounts[row] for row in np.flatnonzero(columns.online)]
+    
+    # Offline accounts get a status, their last logout time and downtime in seconds
+    offline_rows = np.flatnonzero(~columns.online)
+    statuses = np.where(columns.disabled[offline_rows], 'Disabled', 'Offline')
+    downtimes = columns.downtime_seconds()[offline_rows]
+    offline_accounts = []
+    for row, status, downtime in zip(offline_rows.tolist(), statuses.tolist(), downtimes.tolist()):
+        offline_acc = dict(all_accounts[row])  # ensure a copy
+        offline_acc['status'] = status
+        offline_acc['last_uptime'] = offline_acc.get('last-logged-out', '-')
+        offline_acc['downtime'] = downtime if downtime >= 0 else '-'
+        offline_accounts.append(offline_acc)
+    
+    return {
+        'all_accounts': all_accounts,
+        'online_accounts': online_accounts,
+        'offline_accounts': offline_accounts,
+        'statistics': columns.statistics()
+    }
+
+# Row lists of the accounts summary, all sent whole
+SUMMARY_LISTS = {'all_accounts': None, 'online_accounts': None, 'offline_accounts': None}
+
 @app.route('/api/ppp_accounts_summary')
 def api_ppp_accounts_summary():
     """Get PPP accounts summary with all, online, and offline accounts"""
     try:
         router_id = request.args.get('router_id', get_active_router_id())
-        client = get_mikrotik_client(router_id)
-        if client is None:
-            return jsonify({'success': False, 'error': router_manager.last_client_error or 'Failed to connect to router'})
-        if not client.test_connection():
-            return jsonify({'success': False, 'error': 'Not connected'})
-        
-        # Fetch all accounts and active accounts
-        all_accounts = client.get_ppp_secrets() or []
-        active_accounts = client.get_ppp_active() or []
-        
-        # Create a set of active account names for fast lookup
-        active_names = set()
-        for acc in active_accounts:
-            if acc.get('name'):
-                active_names.add(acc['name'].lower())
-        
-        # Separate accounts into online and offline
-        online_accounts = []
-        offline_accounts = []
-        
-        for account in all_accounts:
-            account_name = account.get('name', '').lower()
-            if account_name in active_names:
-                online_accounts.append(account)
-            else:
-                # Always set status for offline accounts
-                offline_acc = dict(account)  # ensure a copy
-                disabled_val = str(offline_acc.get('disabled', '')).strip().lower()
-                if disabled_val in ('true', 'yes', '1') or offline_acc.get('disabled') is True or offline_acc.get('disabled') == 1:
-                    offline_acc['status'] = 'Disabled'
-                else:
-                    offline_acc['status'] = 'Offline'
-                # Set last_uptime to last_logged_out if present, otherwise '-'
-                offline_acc['last_uptime'] = offline_acc.get('last-logged-out', '-')
-                # Calculate downtime in seconds if last-logged-out is present
-                last_logged_out = offline_acc.get('last-logged-out')
-                if last_logged_out:
-                    try:
-                        # Parse as local time (not UTC) to match frontend expectations
-                        dt_last = datetime.strptime(last_logged_out, '%Y-%m-%d %H:%M:%S')
-                        now = datetime.now()
-                        downtime_seconds = int((now - dt_last).total_seconds())
-                        offline_acc['downtime'] = downtime_seconds
-                    except Exception:
-                        offline_acc['downtime'] = '-'
-                else:
-                    offline_acc['downtime'] = '-'
-                offline_accounts.append(offline_acc)
-        
-        # Calculate statistics
-        total_accounts = len(all_accounts)
-        online_count = len(online_accounts)
-        offline_count = len(offline_accounts)
-        enabled_count = len([acc for acc in all_accounts if acc.get('disabled') != 'true'])
-        disabled_count = total_accounts - enabled_count
+        try:
+            row_format = format_arg()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        snapshot = get_router_snapshot(router_id)
+        if not snapshot or not snapshot.success:
+            return jsonify({'success': False, 'error': snapshot_error(snapshot)})
         
+        summary = snapshot.cached('accounts_summary', build_accounts_summary)
         router = router_manager.get_router(router_id)
-        return jsonify({
+        return snapshot_response(snapshot, 'ppp_accounts_summary', router, lambda snapshot: {
             'success': True,
             'router_id': router_id,
             'router_name': router['name'] if router else 'Unknown',
-            'all_accounts': all_accounts,
-            'online_accounts': online_accounts,
-            'offline_accounts': offline_accounts,
-            'statistics': {
-                'total_accounts': total_accounts,
-                'online_accounts': online_count,
-                'offline_accounts': offline_count,
-                'enabled_accounts': enabled_count,
-                'disabled_accounts': disabled_count
-            },
-            'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
+            'all_accounts': summary['all_accounts'],
+            'online_accounts': summary['online_accounts'],
+            'offline_accounts': summary['offline_accounts'],
+            'statistics': summary['statistics']
+        }, SUMMARY_LISTS if row_format else None, row_format, request_time())
     except Exception as e:
         error(f"Error in PPP accounts summary API: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+def build_account_index(snapshot):
+    """Sort orders and filter columns of a snapshot's PPP accounts, built once per snapshot"""
+    return AccountIndex(snapshot.cached('session_columns', build_session_columns))
+
+def list_arg(name):
+    """Comma-separated query parameter as a list, or None if it is absent or empty"""
+    value = request.args.get(name, '').strip()
+    return [item.strip() for item in value.split(',') if item.strip()] if value else None
+
+def int_arg(name, default, minimum, maximum=None):
+    """Integer query parameter within bounds; raises ValueError naming the parameter"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if number < minimum or (maximum is not None and number > maximum):
+        raise ValueError(f"{name} must be between {minimum} and {maximum}" if maximum is not None
+                         else f"{name} must be at least {minimum}")
+    return number
+
+@app.route('/api/ppp_accounts_page')
+def api_ppp_accounts_page():
+    """
+    Page through a router's PPP accounts, sorted and filtered on the server.
+
+    Query params:
+        router_id: Router (default: active router)
+        sort: name, uptime, downtime, rx, tx or status (default name); order: asc or desc (default asc)
+        status: Comma-separated online/offline/disabled; profile: comma-separated profiles
+        group: Group id; q: case-insensitive substring of the account name
+        limit: Page size (default 50, at most 500)
+        cursor: next_cursor of the previous page, or offset: rows to skip
+        format: rows (default) or columnar
+    Response: { success, router_id, router_name, accounts: [...], total, offset, limit,
+                next_cursor (null on the last page), statistics, current_time }
+    """
+    try:
+        router_id = request.args.get('router_id', get_active_router_id())
+        sort = request.args.get('sort', 'name')
+        order = request.args.get('order', 'asc')
+        statuses = list_arg('status')
+        try:
+            if sort not in SORT_KEYS:
+                raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+            if order not in ('asc', 'desc'):
+                raise ValueError("order must be asc or desc")
+            if statuses is not None and not set(statuses) <= set(STATUSES):
+                raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+            limit = int_arg('limit', DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+            offset = int_arg('offset', 0, 0)
+            descending = order == 'desc'
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor, sort, descending) if cursor else None
+            row_format = format_arg()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        snapshot = get_router_snapshot(router_id)
+        if not snapshot or not snapshot.success:
+            return jsonify({'success': False, 'error': snapshot_error(snapshot)})
+
+        members = None
+        group_id = request.args.get('group')
+        if group_id:
+            group = next((g for g in router_manager.get_groups(router_id) if g.get('id') == group_id), None)
+            if group is None:
+                return jsonify({'success': False, 'error': 'Group not found'}), 404
+            members = group.get('accounts', [])
+
+        index = snapshot.cached('account_index', build_account_index)
+        mask = index.filter_mask(statuses=statuses, profiles=list_arg('profile'), members=members,
+                                 name=request.args.get('q'))
+        rows, total, offset = index.page(sort, descending, mask, limit, offset, after)
+        next_cursor = index.cursor_for(rows[-1], sort, descending) if offset + len(rows) < total else None
+        router = router_manager.get_router(router_id)
+        accounts = index.rows(rows)
+        return payload_response(EncodedJSON({
+            'success': True,
+            'router_id': router_id,
+            'router_name': router['name'] if router else 'Unknown',
+            'accounts': encode_rows(accounts) if row_format == COLUMNAR else accounts,
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'statistics': index.columns.statistics()
+        }), request_time())
+    except Exception as e:
+        error(f"Error in PPP accounts page API: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+# Search index of each router, kept across snapshots and updated incrementally; dropped once
+# the collector stops polling the router
+search_indexes = {}
+
+@app.route('/api/search')
+def api_search():
+    """
+    Find accounts by name, comment, caller-id/MAC or address.
+
+    Query params:
+        router_id: Router (default: active router)
+        q: Text to find, case-insensitive: prefix of a value, or a substring of at least 3 characters
+        limit: Number of accounts (default 10, at most 100)
+    Response: { success, router_id, query, results: [{name, field, value, match}], current_time }
+    """
+    try:
+        router_id = request.args.get('router_id', get_active_router_id())
+        query = request.args.get('q', '')
+        try:
+            limit = int_arg('limit', DEFAULT_RESULTS, 1, MAX_RESULTS)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        snapshot = get_router_snapshot(router_id)
+        # Drop the indexes of routers the collector no longer polls (disabled or deleted)
+        for stale in search_indexes.keys() - collector.get_all_snapshots().keys():
+            search_indexes.pop(stale, None)
+        if not snapshot or not snapshot.success:
+            return jsonify({'success': False, 'error': snapshot_error(snapshot)})
+
+        index = search_indexes.setdefault(router_id, SearchIndex())
+        index.sync(snapshot)
+        return payload_response(EncodedJSON({
+            'success': True,
+            'router_id': router_id,
+            'query': query,
+            'results': index.search(query, limit)
+        }), request_time())
+    except Exception as e:
+        error(f"Error in search API: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+# Address index over every router's sessions and DHCP leases, updated incrementally
+lookup_index = LookupIndex()
+
+def account_of(source, row):
+    """PPP account a looked-up row belongs to, or None (DHCP leases)"""
+    if source == 'ppp_active':
+        return row.get('name')
+    if source == 'pppoe_interfaces':
+        name = row.get('name', '')
+        return name[len('<pppoe-'):-1] if name.startswith('<pppoe-') and name.endswith('>') else name
+    return None
+
+@app.route('/api/lookup')
+def api_lookup():
+    """
+    Find which router, account and session an IP or MAC address belongs to, across all routers.
+
+    Query params (one of):
+        ip: IPv4/IPv6 address (session address, caller-id or DHCP lease)
+        mac: MAC address in any common notation (PPPoE caller-id or DHCP lease)
+    Response: { success, query, results: [{router_id, router_name, source, account, groups: [{id, name}],
+                session, updated}], current_time }
+    """
+    try:
+        ip, mac = request.args.get('ip'), request.args.get('mac')
+        if bool(ip) == bool(mac):
+            return jsonify({'success': False, 'error': 'Give exactly one of ip or mac'}), 400
+        kind, address = (IP, normalize_ip(ip)) if ip else (MAC, normalize_mac(mac))
+        if address is None:
+            return jsonify({'success': False, 'error': f"Invalid {kind} address"}), 400
+
+        # Read through get_snapshot() so routers idle in the collector get their sessions refreshed
+        snapshots = {}
+        for router_id in collector.get_all_snapshots():
+            snapshot = collector.get_snapshot(router_id)
+            if snapshot is not None:
+                snapshots[router_id] = snapshot
+        lookup_index.sync(snapshots.values())
+        results = []
+        for router_id, source, row in lookup_index.lookup(kind, address):
+            account = account_of(source, row)
+            router = router_manager.get_router(router_id)
+            results.append({
+                'router_id': router_id,
+                'router_name': router['name'] if router else 'Unknown',
+                'source': source,
+                'account': account,
+                'groups': router_manager.get_account_groups(router_id).get(account, []) if account else [],
+                'session': row,
+                'updated': snapshots[router_id].source_times.get(source),
+            })
+        return payload_response(EncodedJSON({
+            'success': True,
+            'query': {kind: address},
+            'results': results
+        }), request_time())
+    except Exception as e:
+        error(f"Error in lookup API: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/pppoe')
 def api_pppoe():
     """Get PPPoE interfaces and related data"""
     try:
         router_id = request.args.get('router_id', get_active_router_id())
-        client = get_mikrotik_client(router_id)
-        if client is None:
-            return jsonify({'success': False, 'error': router_manager.last_client_error or 'Failed to connect to router'})
-        if not client.test_connection():
-            return jsonify({'success': False, 'error': 'Not connected', 'error_message': client.get_error()})
+        try:
+            projection = fields_arg({'pppoe_interfaces': 'pppoe_interfaces', 'ppp_secrets': 'ppp_secrets',
+                                     'ppp_active': 'ppp_active'}, 'pppoe_interfaces')
+            row_format = format_arg()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        snapshot = get_router_snapshot(router_id)
+        if not snapshot or not snapshot.success:
+            return jsonify({'success': False, 'error': snapshot_error(snapshot)})
         
-        pppoe_interfaces = client.get_pppoe_interfaces()
-        ppp_secrets = client.get_ppp_secrets()
-        ppp_active = client.get_ppp_active()
+        pppoe_interfaces = snapshot.pppoe_interfaces
+        ppp_secrets = snapshot.ppp_secrets
+        ppp_active = snapshot.ppp_active
         
         # Calculate aggregate stats
-        total_accounts = len(ppp_secrets) if ppp_secrets else 0
+        statistics = snapshot.cached('session_columns', build_session_columns).statistics()
+        total_accounts = statistics['total_accounts']
         online_accounts = len(pppoe_interfaces) if pppoe_interfaces else 0
         offline_accounts = total_accounts - online_accounts
         
-        enabled_accounts = len([s for s in ppp_secrets if s.get('disabled') != 'true']) if ppp_secrets else 0
-        disabled_accounts = total_accounts - enabled_accounts
+        enabled_accounts = statistics['enabled_accounts']
+        disabled_accounts = statistics['disabled_accounts']
         
         router = router_manager.get_router(router_id)
-        return jsonify({
+        return snapshot_response(snapshot, 'pppoe', router, lambda snapshot: {
             'success': True,
             'router_id': router_id,
             'router_name': router['name'] if router else 'Unknown',
@@ -462,11 +755,10 @@ def api_pppoe():
                 'offline_accounts': offline_accounts,
                 'enabled_accounts': enabled_accounts,
                 'disabled_accounts': disabled_accounts,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                'last_updated': datetime.fromisoformat(snapshot.collected_at).strftime('%Y-%m-%d %H:%M:%S')
             },
-            'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'error_message': client.get_error()
-        })
+            'error_message': snapshot.error
+        }, projection, row_format, request_time())
     except Exception as e:
         error(f"Error in PPPoE API: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -478,7 +770,9 @@ def api_groups():
     
     GET: Returns all groups for the specified router.
         Query param: router_id (optional, defaults to active router)
-        Response: { success: bool, groups: [ {id, name, description, accounts, created_at, updated_at} ] }
+        Response: { success: bool, groups: [ {id, name, description, accounts, created_at, updated_at,
+                    member_stats?: {total, online, offline, disabled}} ] }
+        member_stats counts the members found on the router and is left out while it is unreachable.
     POST: Create a new group.
         Payload: { name: str, description?: str, accounts?: [str, ...], router_id?: str }
         Response: { success: bool, group: {...} }
@@ -494,6 +788,11 @@ def api_groups():
     if request.method == 'GET':
         try:
             groups = router_manager.get_groups(router_id)
+            snapshot = get_router_snapshot(router_id)
+            if snapshot and snapshot.success:
+                columns = snapshot.cached('session_columns', build_session_columns)
+                for group, counts in zip(groups, columns.group_counts(groups)):
+                    group['member_stats'] = counts
             return jsonify({'success': True, 'groups': groups, 'router_id': router_id})
         except Exception as e:
             error(f"Error reading groups: {e}")
@@ -887,6 +1186,7 @@ def api_routers():
             
             success = router_manager.delete_router(router_id)
             if success:
+                search_indexes.pop(router_id, None)
                 return jsonify({'success': True, 'message': 'Router deleted'})
             else:
                 return jsonify({'success': False, 'error': 'Failed to delete router'}), 400
@@ -965,74 +1265,205 @@ def api_active_router():
 
 # Helper to gather all dashboard data
 
-def get_dashboard_data():
+def build_aggregate_stats(snapshot):
+    """Dashboard account statistics for a snapshot, using the same logic as the summary endpoint"""
+    return snapshot.cached('session_columns', build_session_columns).statistics()
+
+def dashboard_fresh_fields(snapshot):
+    """Dashboard fields added per request or broadcast rather than cached with the content"""
+    return {'snapshot_version': snapshot.version, 'current_time': datetime.now().isoformat()}
+
+def get_dashboard_payload(router_id=None):
+    """
+    Dashboard data of a router as (EncodedJSON, fresh fields or None).
+    The EncodedJSON is serialized once per snapshot version; see payload_response().
+    """
     try:
-        router_id = get_active_router_id()
-        client = get_mikrotik_client(router_id)
-        if client is None or not client.test_connection():
-            return {
+        router_id = router_id or get_active_router_id()
+        snapshot = get_router_snapshot(router_id)
+        if not snapshot or not snapshot.success:
+            return EncodedJSON({
                 'success': False,
-                'error': router_manager.last_client_error or 'Failed to connect to router',
+                'router_id': router_id,
+                'error': snapshot_error(snapshot),
                 'current_time': datetime.now().isoformat()
-            }
+            }), None
         router = router_manager.get_router(router_id)
-        # Gather all data
-        pppoe_ifaces = client.get_pppoe_interfaces() or []
-        ppp_accounts = client.get_ppp_secrets() or []
-        ppp_active = client.get_ppp_active() or []
-        
-        # Use the same logic as the summary endpoint for consistency
-        active_names = set()
-        for acc in ppp_active:
-            if acc.get('name'):
-                active_names.add(acc['name'].lower())
-        
-        # Calculate statistics using the same logic as summary endpoint
-        total_accounts = len(ppp_accounts)
-        online_count = len([acc for acc in ppp_accounts if acc.get('name', '').lower() in active_names])
-        offline_count = total_accounts - online_count
-        enabled_count = len([acc for acc in ppp_accounts if acc.get('disabled') != 'true'])
-        disabled_count = total_accounts - enabled_count
-        
-        aggregate_stats = {
-            'total_accounts': total_accounts,
-            'online_accounts': online_count,
-            'offline_accounts': offline_count,
-            'enabled_accounts': enabled_count,
-            'disabled_accounts': disabled_count
-        }
-        
-        return {
+        return cached_payload(snapshot, 'dashboard', router, lambda snapshot: {
             'success': True,
             'router_id': router_id,
             'router_name': router['name'] if router else 'Unknown',
-            'pppoe_interfaces': pppoe_ifaces,
-            'ppp_accounts': ppp_accounts,
-            'ppp_active': ppp_active,
-            'aggregate_stats': aggregate_stats,
-            'current_time': datetime.now().isoformat(),
-            'error_message': client.get_error()
-        }
+            'pppoe_interfaces': snapshot.pppoe_interfaces,
+            'ppp_accounts': snapshot.ppp_secrets,
+            'ppp_active': snapshot.ppp_active,
+            'aggregate_stats': build_aggregate_stats(snapshot),
+            'error_message': snapshot.error
+        }), dashboard_fresh_fields(snapshot)
     except Exception as e:
         error(f"Error in dashboard data aggregation: {e}")
-        return {
+        return EncodedJSON({
             'success': False,
             'error': str(e),
             'current_time': datetime.now().isoformat()
-        }
+        }), None
+
+def get_dashboard_data(router_id=None):
+    """Dashboard data of a router; its lists are shared by every reader of the snapshot, so read-only"""
+    payload, fresh = get_dashboard_payload(router_id)
+    return {**payload.data, **fresh} if fresh else payload.data
 
 @app.route('/api/dashboard')
 def dashboard():
-    return jsonify(get_dashboard_data())
+    return payload_response(*get_dashboard_payload(request.args.get('router_id')))
 
 # WebSocket background broadcast
+# Clients join the room of the router they view, or of the router and field
+# projection they subscribed with (a channel). dashboard_update sends the full
+# state once, then diffs against the previous message of that channel's stream.
+# Clients acknowledge each message with dashboard_ack; a client that falls
+# behind gets the newest state once it catches up instead of every message.
+dashboard_subscriptions = DashboardSubscriptions()
+broadcast_cadence = BroadcastCadence(COLLECT_INTERVAL)
+
+def latest_full_message(channel):
+    """Full message of the last state broadcast on a channel, or None"""
+    stream = dashboard_subscriptions.stream(channel)
+    return stream.full_message() if stream else None
+
+dashboard_send_queues = ClientSendQueues(latest_full_message)
+
+def full_dashboard_message(channel):
+    """Full dashboard_update message for a client that is new or missed a sequence number"""
+    stream = dashboard_subscriptions.stream(channel)
+    message = stream.full_message() if stream else None
+    if message is None:
+        data = project(get_dashboard_data(channel[0]), dashboard_subscriptions.projection(channel) or {})
+        # Nothing broadcast yet (unless it happened meanwhile); the first broadcast is a full message anyway
+        message = (stream.full_message() if stream else None) or EncodedJSON(
+            wire_message({**data, 'type': 'full', 'seq': 0}, dashboard_subscriptions.row_format(channel)))
+    return message
+
+@socketio.on('dashboard_subscribe')
+def on_dashboard_subscribe(data=None):
+    """
+    Start sending a router's dashboard updates to this client (one router per client).
+
+    data may hold 'fields': list fields to send, as "<list>.<field>" items
+    (see field_projection); lists it does not mention are sent whole. With
+    'format': 'columnar' the lists are sent as columnar tables.
+    """
+    data = data or {}
+    router_id = data.get('router_id') or get_active_router_id()
+    try:
+        projection = parse_fields(data.get('fields'), DASHBOARD_LISTS, defaults=False)
+        row_format = parse_format(data.get('format'))
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}
+    channel, previous = dashboard_subscriptions.subscribe(request.sid, router_id, projection, row_format)
+    if previous != channel:
+        if previous is not None:
+            leave_room(room_name(previous))
+            collector.unwatch(previous[0])
+        join_room(room_name(channel))
+        collector.watch(router_id)
+    message = full_dashboard_message(channel)
+    dashboard_send_queues.sent(request.sid, channel, message)
+    emit('dashboard_update', message)
+    return {'success': True}
+
+@socketio.on('dashboard_unsubscribe')
+def on_dashboard_unsubscribe(data=None):
+    """Stop sending dashboard updates to this client"""
+    previous = dashboard_subscriptions.unsubscribe(request.sid)
+    dashboard_send_queues.remove(request.sid)
+    if previous is not None:
+        leave_room(room_name(previous))
+        collector.unwatch(previous[0])
+
+@socketio.on('disconnect')
+def on_disconnect():
+    previous = dashboard_subscriptions.unsubscribe(request.sid)
+    dashboard_send_queues.remove(request.sid)
+    if previous is not None:
+        collector.unwatch(previous[0])
+
+@socketio.on('dashboard_resync')
+def on_dashboard_resync(data=None):
+    """Send the full dashboard state again"""
+    channel = dashboard_subscriptions.channel_of(request.sid)
+    router_id = (data or {}).get('router_id') or (channel[0] if channel else None) or get_active_router_id()
+    if channel is not None and channel[0] == router_id:
+        message = full_dashboard_message(channel)
+        dashboard_send_queues.sent(request.sid, channel, message)
+    else:
+        message = full_dashboard_message((router_id, ''))
+    emit('dashboard_update', message)
+
+@socketio.on('dashboard_ack')
+def on_dashboard_ack(data=None):
+    """A client processed dashboard_update messages up to seq; send what waited for it"""
+    seq = (data or {}).get('seq')
+    if not isinstance(seq, int):
+        return
+    message = dashboard_send_queues.ack(request.sid, seq)
+    if message is not None:
+        channel = dashboard_subscriptions.channel_of(request.sid)
+        emit('dashboard_update', wire_message(message, dashboard_subscriptions.row_format(channel)))
+
+def broadcast_dashboard(router_id):
+    """Publish a router's current dashboard to each of its channels; clients that are behind get it later"""
+    data = get_dashboard_data(router_id)
+    for channel in dashboard_subscriptions.channels(router_id):
+        stream = dashboard_subscriptions.stream(channel)
+        if stream is None:
+            continue
+        message = stream.publish(project(data, dashboard_subscriptions.projection(channel) or {}))
+        row_format = dashboard_subscriptions.row_format(channel)
+        waiting = []
+        for sid in dashboard_subscriptions.subscribers(channel):
+            outgoing = dashboard_send_queues.offer(sid, message)
+            if outgoing is message:
+                continue
+            waiting.append(sid)
+            if outgoing is not None:
+                socketio.emit('dashboard_update', wire_message(outgoing, row_format), to=sid)
+        # One encoding of the message for every client of the channel that keeps up
+        socketio.emit('dashboard_update', wire_message(message, row_format), to=room_name(channel),
+                      skip_sid=waiting)
 
 def dashboard_broadcast_loop():
+    """Broadcast each subscribed router's new snapshots to its room, at the router's cadence"""
+    sent_versions = {}
     while True:
-        data = get_dashboard_data()
-        socketio.emit('dashboard_update', data)
-        time.sleep(3)
+        router_ids = dashboard_subscriptions.routers()
+        for router_id in sent_versions.keys() - set(router_ids):
+            broadcast_cadence.forget(router_id)
+        if not router_ids:
+            sent_versions = {}
+            time.sleep(1)
+            continue
+        # Forget routers whose room emptied
+        sent_versions = {router_id: sent_versions.get(router_id, 0) for router_id in router_ids}
+        now = time.monotonic()
+        next_due = {router_id: broadcast_cadence.next_due(router_id) for router_id in router_ids}
+        due = {router_id: sent_versions[router_id] for router_id in router_ids if next_due[router_id] <= now}
+        later = [when - now for when in next_due.values() if when > now]
+        if not due:
+            time.sleep(min(later))
+            continue
+        # Wake up as soon as the collector publishes a new snapshot of a due router,
+        # or when the next router falls due
+        updated = collector.wait_for_updates(due, timeout=min(later + [COLLECT_INTERVAL]))
+        for router_id, snapshot in updated.items():
+            started = time.monotonic()
+            sent_versions[router_id] = snapshot.version
+            try:
+                broadcast_dashboard(router_id)
+            except Exception as e:
+                error(f"Error broadcasting dashboard of router {router_id}: {e}")
+            broadcast_cadence.record(router_id, started, time.monotonic() - started, snapshot)
 
+collector.start()
 threading.Thread(target=dashboard_broadcast_loop, daemon=True).start()
 
 # Catch-all route for SPA navigation (must be at the end)
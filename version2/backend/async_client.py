@@ -0,0 +1,357 @@
+"""
+Asyncio client for the MikroTik RouterOS API.
+Speaks the API protocol directly so a single event loop can poll many routers
+concurrently, multiplexing commands on each connection with .tag words.
+
+This is a standalone client for scripts and tooling (run_fleet_poll()); the
+collector keeps polling through the pooled MikroTikClient.
+"""
+
+import asyncio
+import binascii
+import hashlib
+import ssl
+from typing import Dict, List, Optional
+import logger
+from routeros_protocol import (
+    RouterOsFatalError, RouterOsTrapError,
+    build_command, encode_sentence, parse_sentence, read_sentence
+)
+
+
+class _PendingCommand:
+    """Replies collected for one tagged command until !done arrives."""
+
+    __slots__ = ('replies', 'done_attributes', 'trap', 'future')
+
+    def __init__(self, future: asyncio.Future):
+        self.replies: List[Dict] = []
+        self.done_attributes: Dict = {}
+        self.trap: Optional[RouterOsTrapError] = None
+        self.future = future
+
+
+class AsyncMikroTikClient:
+    """
+    Asyncio client for interacting with MikroTik routers using the RouterOS API.
+    Offers the same read operations as MikroTikClient.
+    """
+
+    def __init__(self, host: str, user: str, password: str, port: int = 8728, use_ssl: bool = False,
+                 max_in_flight: int = 4, timeout: float = 15.0):
+        """
+        Initialize the asyncio MikroTik client.
+
+        Args:
+            host: Router IP address or hostname
+            user: Router username
+            password: Router password
+            port: Router API port (default: 8728, SSL: 8729)
+            use_ssl: Whether to use SSL for the connection
+            max_in_flight: Maximum number of commands outstanding on the connection at once
+            timeout: Seconds to wait for connect and for each command to complete
+        """
+        self.host = host
+        self.user = user
+        self.password = password
+        self.port = port
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.connected = False
+        self.error_message = None
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, _PendingCommand] = {}
+        self._next_tag = 0
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def connect(self) -> bool:
+        """
+        Connect and log in to the MikroTik router.
+
+        Returns:
+            bool: True if connection was successful, False otherwise
+        """
+        try:
+            ssl_context = None
+            if self.use_ssl:
+                ssl_context = ssl.create_default_context()
+                ssl_context.check_hostname = False
+                ssl_context.verify_mode = ssl.CERT_NONE
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=ssl_context), self.timeout)
+            self._read_task = asyncio.ensure_future(self._read_loop())
+            await self._login()
+            self.connected = True
+            return True
+        except Exception as e:
+            logger.error(f"Connection to {self.host} failed: {e}", "AsyncMikroTikClient.connect")
+            self.error_message = str(e) or type(e).__name__
+            await self.disconnect()
+            return False
+
+    async def disconnect(self) -> None:
+        """
+        Disconnect from the MikroTik router.
+        """
+        self.connected = False
+        if self._read_task:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+            self._writer = None
+        self._fail_pending(ConnectionError("Connection closed"))
+
+    async def _login(self) -> None:
+        """Log in using the post-6.43 method, falling back to the MD5 challenge."""
+        done = await self._call(build_command('/login', '', {'name': self.user, 'password': self.password}),
+                                return_done=True)
+        if 'ret' in done:
+            challenge = binascii.unhexlify(done['ret'])
+            digest = hashlib.md5(b'\x00' + self.password.encode() + challenge).hexdigest()
+            await self._call(build_command('/login', '', {'name': self.user, 'response': '00' + digest}))
+
+    async def command(self, path: str, command: str = 'print', arguments: Optional[Dict] = None,
+                      queries: Optional[Dict] = None, proplist: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Run one API command and return its !re rows.
+
+        Several commands may run concurrently on the same connection; their
+        replies are told apart by their .tag.
+
+        Args:
+            path: Menu path, e.g. '/ppp/secret'
+            command: Command within the menu (default: 'print')
+            arguments: Attribute words sent as '=key=value'
+            queries: Equality query words sent as '?key=value'
+            proplist: Properties to return
+
+        Returns:
+            list: Rows returned by the router
+
+        Raises:
+            RouterOsTrapError: If the router answered with !trap
+        """
+        return await self._call(build_command(path, command, arguments, queries, proplist))
+
+    async def _call(self, words: List[str], return_done: bool = False):
+        if self._writer is None:
+            raise ConnectionError("Not connected")
+        async with self._in_flight:
+            self._next_tag += 1
+            tag = str(self._next_tag)
+            pending = _PendingCommand(asyncio.get_running_loop().create_future())
+            self._pending[tag] = pending
+            try:
+                self._writer.write(encode_sentence(words + [f".tag={tag}"]))
+                await self._writer.drain()
+                await asyncio.wait_for(pending.future, self.timeout)
+            finally:
+                self._pending.pop(tag, None)
+        if pending.trap:
+            raise pending.trap
+        return pending.done_attributes if return_done else pending.replies
+
+    async def _read_loop(self) -> None:
+        """Read reply sentences and route them to the command that owns their tag."""
+        try:
+            while True:
+                words = await read_sentence(self._reader)
+                if words:
+                    self._dispatch(words)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.connected = False
+            self.error_message = str(e) or type(e).__name__
+            self._fail_pending(e)
+
+    def _dispatch(self, words: List[str]) -> None:
+        """Apply one reply sentence to the command it belongs to."""
+        reply_type, tag, attributes = parse_sentence(words)
+        if reply_type == '!fatal':
+            message = words[1] if len(words) > 1 else 'fatal error'
+            raise RouterOsFatalError(message)
+        pending = self._pending.get(tag)
+        if pending is None:
+            # Reply for a command that already timed out
+            return
+        if reply_type == '!re':
+            pending.replies.append(attributes)
+        elif reply_type == '!trap':
+            pending.trap = RouterOsTrapError(attributes.get('message', 'unknown error'),
+                                             attributes.get('category'))
+        elif reply_type == '!done':
+            pending.done_attributes = attributes
+            if not pending.future.done():
+                pending.future.set_result(True)
+        elif reply_type == '!empty':
+            # RouterOS 7.18+ answers a command without rows with !empty (and then !done)
+            if not pending.future.done():
+                pending.future.set_result(True)
+        else:
+            logger.warning(f"Ignoring unexpected reply type {reply_type} from {self.host}",
+                           "AsyncMikroTikClient._dispatch")
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for pending in list(self._pending.values()):
+            if not pending.future.done():
+                pending.future.set_exception(exc)
+                # Mark retrieved so an abandoned future does not log a warning
+                pending.future.exception()
+        self._pending.clear()
+
+    async def _fetch(self, path: str, source: str, **kwargs) -> Optional[List[Dict]]:
+        if not self.connected:
+            logger.error(f"{source}: Not connected to router", f"AsyncMikroTikClient.{source}")
+            return None
+        try:
+            return await self.command(path, **kwargs)
+        except Exception as e:
+            error_msg = f"Error in {source} for {self.host}: {e or type(e).__name__}"
+            logger.error(error_msg, f"AsyncMikroTikClient.{source}")
+            self.error_message = error_msg
+            return None
+
+    async def get_system_resources(self) -> Optional[Dict]:
+        """
+        Get system resources (CPU, memory, etc.).
+
+        Returns:
+            dict: System resources information or None if failed
+        """
+        rows = await self._fetch('/system/resource', 'get_system_resources')
+        return rows[0] if rows else None
+
+    async def get_system_identity(self) -> Optional[str]:
+        """
+        Get router identity (name).
+
+        Returns:
+            str: Router name or None if failed
+        """
+        rows = await self._fetch('/system/identity', 'get_system_identity')
+        return rows[0].get('name') if rows else None
+
+    async def get_interfaces(self) -> Optional[List[Dict]]:
+        """
+        Get network interfaces information.
+
+        Returns:
+            list: List of interfaces information or None if failed
+        """
+        return await self._fetch('/interface', 'get_interfaces')
+
+    async def get_ppp_secrets(self) -> List[Dict]:
+        """
+        Get PPP secrets (accounts).
+
+        Returns:
+            list: List of PPP secrets or empty list if none found
+        """
+        return await self._fetch('/ppp/secret', 'get_ppp_secrets') or []
+
+    async def get_active_ppp_connections(self) -> List[Dict]:
+        """
+        Get active PPP connections.
+
+        Returns:
+            list: List of active PPP connections or empty list if none found
+        """
+        return await self._fetch('/ppp/active', 'get_active_ppp_connections') or []
+
+    def get_error(self) -> Optional[str]:
+        """
+        Get the last error message.
+
+        Returns:
+            str: Error message or None if no error
+        """
+        return self.error_message
+
+
+# Operations poll_fleet runs by default, named after the client methods
+DEFAULT_FLEET_OPERATIONS = ('get_system_resources', 'get_interfaces', 'get_ppp_secrets', 'get_active_ppp_connections')
+
+
+async def poll_router(router: Dict, operations=DEFAULT_FLEET_OPERATIONS, max_in_flight: int = 4,
+                      timeout: float = 15.0) -> Dict:
+    """
+    Connect to one router, run the given operations concurrently and disconnect.
+
+    Args:
+        router: Router configuration as stored in routers.json
+        operations: Names of AsyncMikroTikClient read methods to run
+        max_in_flight: Maximum number of commands outstanding on the connection
+        timeout: Seconds allowed for connect and for each command
+
+    Returns:
+        dict: {'router_id', 'success', 'error', 'data': {operation: result}}
+    """
+    client = AsyncMikroTikClient(
+        host=router['host'],
+        user=router['username'],
+        password=router['password'],
+        port=router.get('port', 8728),
+        use_ssl=router.get('use_ssl', False),
+        max_in_flight=max_in_flight,
+        timeout=timeout
+    )
+    result = {'router_id': router.get('id'), 'success': False, 'error': None, 'data': {}}
+    if not await client.connect():
+        result['error'] = client.get_error()
+        return result
+    try:
+        values = await asyncio.gather(*(getattr(client, op)() for op in operations))
+        result['data'] = dict(zip(operations, values))
+        result['success'] = True
+        result['error'] = client.get_error()
+    finally:
+        await client.disconnect()
+    return result
+
+
+async def poll_fleet(routers: List[Dict], operations=DEFAULT_FLEET_OPERATIONS, max_in_flight: int = 4,
+                     max_concurrent_routers: int = 256, timeout: float = 15.0) -> Dict[str, Dict]:
+    """
+    Poll many routers concurrently from one event loop.
+
+    Args:
+        routers: Router configurations; disabled routers are skipped
+        operations: Names of AsyncMikroTikClient read methods to run on each router
+        max_in_flight: Maximum number of commands outstanding per router
+        max_concurrent_routers: Maximum number of routers connected at the same time
+        timeout: Seconds allowed for connect and for each command
+
+    Returns:
+        dict: Per-router results from poll_router(), keyed by router ID
+    """
+    limit = asyncio.Semaphore(max_concurrent_routers)
+
+    async def bounded(router: Dict) -> Dict:
+        async with limit:
+            try:
+                return await poll_router(router, operations, max_in_flight, timeout)
+            except Exception as e:
+                return {'router_id': router.get('id'), 'success': False, 'error': str(e), 'data': {}}
+
+    enabled = [r for r in routers if r.get('enabled', True)]
+    results = await asyncio.gather(*(bounded(r) for r in enabled))
+    return {r['router_id']: r for r in results}
+
+
+def run_fleet_poll(routers: List[Dict], **kwargs) -> Dict[str, Dict]:
+    """
+    Blocking wrapper around poll_fleet() for use from threads.
+
+    Returns:
+        dict: Per-router results from poll_router(), keyed by router ID
+    """
+    return asyncio.run(poll_fleet(routers, **kwargs))
@@ -0,0 +1,375 @@
+"""
+End-to-end API latency benchmark.
+Runs the Flask app against a local FakeRouterOS at several account counts and
+measures latency percentiles, throughput at a fixed concurrency, the router
+logins caused per API request and the router commands per collector cycle
+(poll batch) while the requests ran. Results are written as JSON, and two
+result files can be compared to catch regressions before a rollout.
+
+    python benchmark.py run --scales 1000,10000,50000 --output results.json
+    python benchmark.py compare baseline.json results.json --threshold 10
+
+Each scale runs in its own subprocess with a scratch data directory, so the
+app's global router manager and collector start clean every time.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_ENDPOINTS = ('/api/dashboard', '/api/pppoe', '/api/ppp_accounts_summary', '/api/export', '/api/groups')
+DEFAULT_SCALES = (1000, 10000, 50000)
+
+# Share of accounts connected on the fake router
+ACTIVE_RATIO = 0.4
+
+# Accounts per generated group
+GROUP_SIZE = 50
+
+BENCH_ROUTER_ID = 'bench_router'
+
+# Seconds to wait for the collector's first complete snapshot
+SNAPSHOT_TIMEOUT = 300
+
+# Metrics compared between runs: (name, whether higher is better, smallest
+# absolute change that can count as a regression, so noise on tiny values
+# such as background polls spread over many requests is not flagged)
+COMPARED_METRICS = (
+    ('p50_ms', False, 1.0),
+    ('p95_ms', False, 1.0),
+    ('p99_ms', False, 1.0),
+    ('throughput_rps', True, 0.0),
+    ('router_commands_per_cycle', False, 0.5),
+)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a list of values.
+
+    Args:
+        values: Samples (need not be sorted)
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile, or 0.0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(max(math.ceil(pct * len(ordered) / 100), 1), len(ordered))
+    return ordered[rank - 1]
+
+
+# ----------------------------------------------------------------------
+# Measuring one scale (runs in the child process)
+# ----------------------------------------------------------------------
+
+def _write_data_dir(directory: str, port: int, accounts: int) -> None:
+    """Create routers.json and groups for the fake router in a scratch data directory"""
+    groups_dir = os.path.join(directory, 'data', 'groups', BENCH_ROUTER_ID)
+    os.makedirs(groups_dir)
+    router = {
+        'id': BENCH_ROUTER_ID, 'name': 'Benchmark Router', 'description': 'FakeRouterOS',
+        'host': '127.0.0.1', 'port': port, 'username': 'admin', 'password': '',
+        'use_ssl': False, 'enabled': True,
+    }
+    with open(os.path.join(directory, 'data', 'routers.json'), 'w') as f:
+        json.dump([router], f)
+    groups = []
+    for index, start in enumerate(range(1, accounts + 1, GROUP_SIZE)):
+        groups.append({
+            'id': f"group-{index}", 'router_id': BENCH_ROUTER_ID, 'name': f"Group {index}", 'description': '',
+            'accounts': [f"user{n:05d}" for n in range(start, min(start + GROUP_SIZE, accounts + 1))],
+            'created_at': '', 'updated_at': '',
+        })
+    with open(os.path.join(groups_dir, 'groups.json'), 'w') as f:
+        json.dump(groups, f)
+
+
+def _snapshot_version(collector) -> int:
+    """Version of the benchmark router's snapshot: one more per collector cycle that published"""
+    snapshot = collector.get_all_snapshots().get(BENCH_ROUTER_ID)
+    return snapshot.version if snapshot else 0
+
+
+def _measure_endpoint(base_url: str, path: str, requests_count: int, concurrency: int, fake, collector) -> Dict:
+    """
+    Issue requests_count GETs with concurrency workers and summarize them.
+
+    API requests read snapshots and do not reach the router themselves, so the
+    router commands are reported per collector cycle that ran meanwhile.
+    """
+    import requests
+
+    local = threading.local()
+
+    def request_once(_):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session.get(base_url + path, timeout=120)
+            ok = response.status_code == 200 and response.json().get('success', True) is not False
+            size = len(response.content)
+        except Exception:
+            ok, size = False, 0
+        return time.perf_counter() - started, ok, size
+
+    stats_before = fake.get_stats()
+    version_before = _snapshot_version(collector)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(request_once, range(requests_count)))
+    elapsed = time.perf_counter() - started
+    stats_after = fake.get_stats()
+    cycles = _snapshot_version(collector) - version_before
+
+    latencies = [latency * 1000 for latency, ok, _ in samples if ok]
+    completed = len(latencies)
+    logins = stats_after['logins'] - stats_before['logins']
+    commands = stats_after['commands'] - stats_before['commands']
+    return {
+        'requests': requests_count,
+        'errors': requests_count - completed,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / completed, 3) if completed else 0.0,
+        'max_ms': round(max(latencies), 3) if latencies else 0.0,
+        'throughput_rps': round(completed / elapsed, 2) if elapsed > 0 else 0.0,
+        'response_bytes': round(sum(size for _, ok, size in samples if ok) / completed) if completed else 0,
+        'router_logins': logins,
+        'router_commands': commands,
+        'collector_cycles': cycles,
+        'router_logins_per_request': round(logins / requests_count, 4),
+        'router_commands_per_cycle': round(commands / cycles, 2) if cycles else 0.0,
+    }
+
+
+def measure_scale(accounts: int, endpoints: List[str], requests_count: int, concurrency: int,
+                  warmup: int, churn: float, latency: float, seed: int) -> Dict:
+    """
+    Benchmark every endpoint at one account count.
+    Must run in a fresh process: it changes the working directory and imports the app.
+    """
+    from fake_routeros import FakeRouterOS
+
+    fake = FakeRouterOS(port=0, secrets=accounts, active=int(accounts * ACTIVE_RATIO), churn=churn,
+                        latency=latency, seed=seed).start()
+    workdir = tempfile.TemporaryDirectory(prefix='mikrotik-bench-')
+    try:
+        _write_data_dir(workdir.name, fake.port, accounts)
+        os.chdir(workdir.name)
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+        import app as app_module
+        from werkzeug.serving import make_server
+
+        # Wait for the collector's first complete snapshot
+        setup_started = time.monotonic()
+        deadline = setup_started + SNAPSHOT_TIMEOUT
+        while True:
+            snapshot = app_module.collector.get_snapshot(BENCH_ROUTER_ID)
+            if snapshot and snapshot.success and len(snapshot.ppp_secrets) == accounts:
+                break
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"No complete snapshot of {accounts} accounts after {SNAPSHOT_TIMEOUT}s")
+            time.sleep(0.5)
+        setup_seconds = time.monotonic() - setup_started
+
+        server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        try:
+            results = {}
+            for path in endpoints:
+                if warmup:
+                    _measure_endpoint(base_url, path, warmup, concurrency, fake, app_module.collector)
+                results[path] = _measure_endpoint(base_url, path, requests_count, concurrency, fake,
+                                                  app_module.collector)
+        finally:
+            server.shutdown()
+        return {'accounts': accounts, 'active_sessions': fake.get_stats()['active'],
+                'first_snapshot_seconds': round(setup_seconds, 3), 'endpoints': results}
+    finally:
+        fake.stop()
+        os.chdir(BACKEND_DIR)
+        workdir.cleanup()
+
+
+# ----------------------------------------------------------------------
+# Running and comparing
+# ----------------------------------------------------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(args) -> int:
+    """Benchmark each scale in a subprocess and write the combined results"""
+    endpoints = args.endpoints.split(',') if args.endpoints else list(DEFAULT_ENDPOINTS)
+    scales = [int(scale) for scale in args.scales.split(',')] if args.scales else list(DEFAULT_SCALES)
+    report = {
+        'meta': {
+            'started_at': datetime.now().isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'warmup': args.warmup,
+            'churn': args.churn,
+            'router_latency': args.router_latency,
+            'seed': args.seed,
+        },
+        'results': {},
+    }
+    for accounts in scales:
+        print(f"Benchmarking {accounts} accounts...", file=sys.stderr, flush=True)
+        with tempfile.NamedTemporaryFile('r', suffix='.json') as result_file:
+            command = [sys.executable, os.path.abspath(__file__), '_scale', str(accounts), result_file.name,
+                       '--endpoints', ','.join(endpoints), '--requests', str(args.requests),
+                       '--concurrency', str(args.concurrency), '--warmup', str(args.warmup),
+                       '--churn', str(args.churn), '--router-latency', str(args.router_latency),
+                       '--seed', str(args.seed)]
+            completed = subprocess.run(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL,
+                                       stderr=None if args.verbose else subprocess.DEVNULL)
+            if completed.returncode != 0:
+                print(f"Benchmark at {accounts} accounts failed (exit code {completed.returncode})",
+                      file=sys.stderr)
+                return 1
+            report['results'][str(accounts)] = json.load(result_file)
+        for path, result in report['results'][str(accounts)]['endpoints'].items():
+            print(f"  {path:<28} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+                  f"p99 {result['p99_ms']:>9.2f} ms  {result['throughput_rps']:>8.1f} req/s  "
+                  f"{result['router_commands_per_cycle']:.2f} cmd/cycle", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+def compare_reports(baseline: Dict, current: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare two benchmark reports.
+
+    Args:
+        baseline: Report of the reference run
+        current: Report of the run under test
+        threshold: Percent change in the wrong direction counted as a regression
+
+    Returns:
+        list: One entry per scale/endpoint/metric present in both reports
+    """
+    rows = []
+    for scale, base_scale in baseline.get('results', {}).items():
+        current_scale = current.get('results', {}).get(scale)
+        if not current_scale:
+            continue
+        for path, base in base_scale['endpoints'].items():
+            now = current_scale['endpoints'].get(path)
+            if not now:
+                continue
+            for metric, higher_is_better, min_delta in COMPARED_METRICS:
+                before, after = base.get(metric, 0), now.get(metric, 0)
+                change = (after - before) / before * 100 if before else (0.0 if not after else float('inf'))
+                worse = -change if higher_is_better else change
+                regression = worse > threshold and abs(after - before) >= min_delta
+                rows.append({'scale': int(scale), 'endpoint': path, 'metric': metric, 'baseline': before,
+                             'current': after, 'change_pct': round(change, 1), 'regression': regression})
+    return rows
+
+
+def compare(args) -> int:
+    """Print the differences between two result files; exit code 1 if anything regressed"""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare_reports(baseline, current, args.threshold)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'accounts':>8}  {'endpoint':<28} {'metric':<28} {'baseline':>12} {'current':>12} {'change':>9}")
+        for row in rows:
+            flag = '  REGRESSION' if row['regression'] else ''
+            print(f"{row['scale']:>8}  {row['endpoint']:<28} {row['metric']:<28} {row['baseline']:>12} "
+                  f"{row['current']:>12} {row['change_pct']:>+8.1f}%{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    if regressions:
+        print(f"{regressions} regression(s) above {args.threshold}%", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def _add_run_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--endpoints', help=f"Comma-separated paths (default: {','.join(DEFAULT_ENDPOINTS)})")
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per endpoint first')
+    parser.add_argument('--churn', type=float, default=0.0, help='Sessions reconnecting per second on the router')
+    parser.add_argument('--router-latency', type=float, default=0.0, help='Seconds added to every router command')
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='End-to-end API latency benchmark')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the benchmark')
+    run_parser.add_argument('--scales', help=f"Comma-separated account counts "
+                                             f"(default: {','.join(map(str, DEFAULT_SCALES))})")
+    run_parser.add_argument('--output', '-o', help='Write results to this file instead of stdout')
+    run_parser.add_argument('--verbose', '-v', action='store_true', help='Show the app output of each scale')
+    _add_run_options(run_parser)
+
+    compare_parser = commands.add_parser('compare', help='Compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=10.0,
+                                help='Percent change in the wrong direction reported as a regression')
+    compare_parser.add_argument('--json', action='store_true', help='Print the comparison as JSON')
+
+    # Internal: measure one scale in a fresh process
+    scale_parser = commands.add_parser('_scale')
+    scale_parser.add_argument('accounts', type=int)
+    scale_parser.add_argument('result_file')
+    _add_run_options(scale_parser)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        return run(args)
+    if args.command == 'compare':
+        return compare(args)
+    endpoints = args.endpoints.split(',') if args.endpoints else list(DEFAULT_ENDPOINTS)
+    result = measure_scale(args.accounts, endpoints, args.requests, args.concurrency, args.warmup,
+                           args.churn, args.router_latency, args.seed)
+    with open(args.result_file, 'w') as f:
+        json.dump(result, f)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
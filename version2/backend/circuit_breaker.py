@@ -0,0 +1,134 @@
+"""
+Circuit breaker for router connections.
+After repeated connection failures a router's breaker opens and callers fail
+immediately with the last error instead of waiting for a TCP timeout each time.
+While open, the router is probed in the background with exponential backoff.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+# Consecutive failures that open the breaker
+FAILURE_THRESHOLD = 3
+
+# Seconds before the first background probe of an open breaker
+INITIAL_PROBE_DELAY = 5.0
+
+# Upper bound for the probe delay as it doubles
+MAX_PROBE_DELAY = 300.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+PROBING = 'probing'
+
+
+class CircuitBreaker:
+    """
+    Thread-safe failure tracker for one router.
+    """
+
+    def __init__(self, router_id: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 initial_probe_delay: float = INITIAL_PROBE_DELAY, max_probe_delay: float = MAX_PROBE_DELAY):
+        """
+        Initialize the breaker in the closed state.
+
+        Args:
+            router_id: ID of the router this breaker guards
+            failure_threshold: Consecutive failures that open the breaker
+            initial_probe_delay: Seconds before the first probe once open
+            max_probe_delay: Upper bound for the probe delay
+        """
+        self.router_id = router_id
+        self.failure_threshold = failure_threshold
+        self.initial_probe_delay = initial_probe_delay
+        self.max_probe_delay = max_probe_delay
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._last_error = None
+        self._opened_at = None
+        self._probe_delay = initial_probe_delay
+        self._next_probe = 0.0
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may try to reach the router.
+
+        Returns:
+            bool: False while the breaker is open or a probe is running
+        """
+        with self._lock:
+            return self._state == CLOSED
+
+    def record_success(self) -> None:
+        """Close the breaker and reset the failure count"""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probe_delay = self.initial_probe_delay
+
+    def record_failure(self, message: Optional[str]) -> bool:
+        """
+        Count a failed attempt to reach the router.
+
+        Args:
+            message: Error message of the failure
+
+        Returns:
+            bool: True if this failure opened the breaker
+        """
+        with self._lock:
+            self._failures += 1
+            self._last_error = message or self._last_error
+            if self._state == PROBING:
+                # Probe failed: back off further
+                self._probe_delay = min(self._probe_delay * 2, self.max_probe_delay)
+                self._state = OPEN
+                self._next_probe = time.monotonic() + self._probe_delay
+                return False
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = datetime.now().isoformat()
+                self._probe_delay = self.initial_probe_delay
+                self._next_probe = time.monotonic() + self._probe_delay
+                return True
+            return False
+
+    def start_probe(self) -> bool:
+        """
+        Claim the next background probe if it is due.
+
+        Returns:
+            bool: True if the caller should probe the router now
+        """
+        with self._lock:
+            if self._state != OPEN or time.monotonic() < self._next_probe:
+                return False
+            self._state = PROBING
+            return True
+
+    @property
+    def last_error(self) -> Optional[str]:
+        with self._lock:
+            return self._last_error
+
+    def get_state(self) -> Dict:
+        """
+        Get the breaker state for status reporting.
+
+        Returns:
+            dict: State, consecutive failures, last error and probe timing
+        """
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'last_error': self._last_error,
+                'opened_at': self._opened_at,
+                'next_probe_in': round(max(0.0, self._next_probe - time.monotonic()), 1)
+                if self._state == OPEN else None
+            }
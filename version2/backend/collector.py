@@ -0,0 +1,533 @@
+"""
+Background collector for MikroTik router data.
+Polls every enabled router on a schedule and publishes an immutable, versioned
+RouterSnapshot per router. API handlers and the socket broadcast read these
+snapshots instead of talking to the routers themselves.
+
+Each data source is polled on its own interval, and routers can override the
+defaults with a "poll_intervals" object in routers.json, e.g.
+{"ppp_secrets": 600, "ppp_active": 5}. Routers with "listen": true have their
+session tables streamed by a SessionTracker instead of re-downloaded.
+
+The fast-changing LIVE_SOURCES are only polled while someone looks at the
+router: a dashboard subscriber (watch()) or a snapshot read within IDLE_TIMEOUT.
+"""
+
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+from mikrotik_client import DATA_SOURCES, PPP_SECRET_PROPLISTS, PPP_ACTIVE_PROPLISTS
+from rate_engine import RateEngine, get_rate_smoothing
+from router_manager import router_manager
+from session_tracker import SessionTracker
+from logger import info, error, warning, debug
+
+# Seconds between polls of the fastest-changing data
+COLLECT_INTERVAL = 3
+
+# Default seconds between polls of each data source
+DEFAULT_POLL_INTERVALS = {
+    'identity': 300,
+    'resources': 30,
+    'interfaces': 60,
+    'pppoe_interfaces': COLLECT_INTERVAL,
+    'ppp_secrets': 300,
+    'ppp_active': COLLECT_INTERVAL,
+    'dhcp_leases': 60,
+}
+
+# Shortest poll interval a router may configure
+MIN_POLL_INTERVAL = 1
+
+# Sources due within this many seconds of each other are fetched in the same batch
+SCHEDULE_COALESCE_WINDOW = 0.5
+
+# Longest random delay before a router's first poll, so routers do not poll in lockstep
+MAX_START_JITTER = 5.0
+
+# Sources no longer polled while a router's session tracker has them in sync.
+# pppoe_interfaces stays polled because listen does not report byte counters.
+STREAMED_SOURCES = ('ppp_active',)
+
+# Sources polled every few seconds for live dashboards; suspended while a router is idle
+LIVE_SOURCES = ('pppoe_interfaces', 'ppp_active')
+
+# Seconds without subscribers or snapshot reads after which a router is idle
+IDLE_TIMEOUT = 60
+
+# Maximum number of routers polled at the same time
+MAX_PARALLEL_ROUTERS = 8
+
+
+class RouterSnapshot:
+    """
+    Immutable view of one router's data.
+
+    Data sources are refreshed on different schedules; source_times records
+    when each one was last fetched successfully. The row lists are shared by
+    every reader of the snapshot and must be treated as read-only; copy a row
+    before changing it.
+    """
+
+    __slots__ = ('router_id', 'version', 'collected_at', 'duration', 'success', 'error',
+                 'identity', 'resources', 'interfaces', 'pppoe_interfaces',
+                 'ppp_secrets', 'ppp_active', 'dhcp_leases', 'source_times', '_cache', '_cache_lock')
+
+    def __init__(self, router_id: str, version: int = 0, collected_at: Optional[str] = None,
+                 duration: float = 0.0, success: bool = False, error: Optional[str] = None,
+                 identity: Optional[str] = None, resources: Optional[Dict] = None,
+                 interfaces: Optional[List[Dict]] = None, pppoe_interfaces: Optional[List[Dict]] = None,
+                 ppp_secrets: Optional[List[Dict]] = None, ppp_active: Optional[List[Dict]] = None,
+                 dhcp_leases: Optional[List[Dict]] = None, source_times: Optional[Dict[str, str]] = None):
+        values = {
+            'router_id': router_id,
+            'version': version,
+            'collected_at': collected_at or datetime.now().isoformat(),
+            'duration': duration,
+            'success': success,
+            'error': error,
+            'identity': identity,
+            'resources': resources,
+            'interfaces': interfaces or [],
+            'pppoe_interfaces': pppoe_interfaces or [],
+            'ppp_secrets': ppp_secrets or [],
+            'ppp_active': ppp_active or [],
+            'dhcp_leases': dhcp_leases or [],
+            'source_times': source_times or {},
+            '_cache': {},
+            # Reentrant: a view's factory may use other cached views of the same snapshot
+            '_cache_lock': threading.RLock(),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RouterSnapshot is immutable")
+
+    def replace(self, **changes) -> 'RouterSnapshot':
+        """
+        Create a new snapshot with some fields changed.
+
+        Returns:
+            RouterSnapshot: Copy with the given fields replaced (derived views are not carried over)
+        """
+        fields = {name: getattr(self, name) for name in self.__slots__ if not name.startswith('_')}
+        fields.update(changes)
+        return RouterSnapshot(**fields)
+
+    def cached(self, key: str, factory: Callable[['RouterSnapshot'], object]):
+        """
+        Compute a derived view of this snapshot once and reuse it for later readers.
+
+        Args:
+            key: Name of the derived view
+            factory: Function building the view from the snapshot
+
+        Returns:
+            The cached view
+        """
+        with self._cache_lock:
+            if key not in self._cache:
+                self._cache[key] = factory(self)
+            return self._cache[key]
+
+
+def get_poll_intervals(router: Dict) -> Dict[str, float]:
+    """
+    Get the poll interval of every data source for a router.
+
+    Args:
+        router: Router configuration; its optional "poll_intervals" overrides the defaults
+
+    Returns:
+        dict: Seconds between polls keyed by data source
+    """
+    intervals = dict(DEFAULT_POLL_INTERVALS)
+    overrides = router.get('poll_intervals')
+    if isinstance(overrides, dict):
+        for source, value in overrides.items():
+            if source not in intervals:
+                continue
+            try:
+                intervals[source] = max(MIN_POLL_INTERVAL, float(value))
+            except (TypeError, ValueError):
+                debug(f"Ignoring invalid poll interval {value!r} for {source} on router {router.get('id')}",
+                      "SnapshotCollector")
+    return intervals
+
+
+class SnapshotCollector:
+    """
+    Owns polling of all enabled routers and publishes their snapshots.
+
+    A single scheduler thread keeps a heap of (due time, router, data source)
+    entries. Sources of one router that fall due together are fetched in one
+    pipelined batch on a worker thread and merged into the router's previous
+    snapshot, so slow-changing data is not re-read on every cycle.
+    """
+
+    def __init__(self, router_manager, max_workers: int = MAX_PARALLEL_ROUTERS):
+        """
+        Initialize the collector.
+
+        Args:
+            router_manager: RouterManager providing router configs and pooled clients
+            max_workers: Maximum number of routers polled at the same time
+        """
+        self.router_manager = router_manager
+        self._snapshots: Dict[str, RouterSnapshot] = {}
+        self._cond = threading.Condition()
+        self._refresh_locks: Dict[str, threading.Lock] = {}
+        self._schedule: List[tuple] = []
+        # Bumped when a router is (re)scheduled so entries from before are dropped
+        self._generations: Dict[str, int] = {}
+        self._busy = set()
+        self._trackers: Dict[str, SessionTracker] = {}
+        self._rate_engines: Dict[str, RateEngine] = {}
+        self._watchers: Dict[str, int] = {}
+        self._last_read: Dict[str, float] = {}
+        # Routers whose live sources were skipped while idle
+        self._suspended = set()
+        # Last snapshot version of each router, kept after the router is forgotten so
+        # the versions of a router that is enabled again keep increasing
+        self._last_versions: Dict[str, int] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='collector')
+        self._thread = None
+
+    def start(self) -> None:
+        """Start the background scheduler thread (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            info("Snapshot collector started", "SnapshotCollector")
+
+    def get_snapshot(self, router_id: str) -> Optional[RouterSnapshot]:
+        """
+        Get the latest snapshot for a router.
+
+        A router that has not been collected yet (e.g. just added) is polled
+        once synchronously so the first request still gets data, and so are
+        the live sources of a router whose polling was suspended while idle.
+        Disabled routers are never polled and get an empty snapshot carrying
+        an error.
+
+        Args:
+            router_id: Router ID
+
+        Returns:
+            RouterSnapshot: Latest snapshot, or None if the router does not exist
+        """
+        with self._cond:
+            snapshot = self._snapshots.get(router_id)
+            self._last_read[router_id] = time.monotonic()
+            resume = router_id in self._suspended
+        if snapshot is not None and resume:
+            # Readers arriving during the refresh join it (see refresh())
+            snapshot = self.refresh(router_id, LIVE_SOURCES) or snapshot
+            with self._cond:
+                self._suspended.discard(router_id)
+        elif snapshot is None:
+            router = self.router_manager.get_router(router_id)
+            if not router:
+                return None
+            if not router.get('enabled', True):
+                return RouterSnapshot(router_id, error='Router is disabled')
+            snapshot = self.refresh(router_id)
+        return snapshot
+
+    def get_all_snapshots(self) -> Dict[str, RouterSnapshot]:
+        """Get the latest snapshot of every collected router"""
+        with self._cond:
+            return dict(self._snapshots)
+
+    def watch(self, router_id: str) -> None:
+        """Register a live subscriber of a router, keeping its live sources polled"""
+        with self._cond:
+            self._watchers[router_id] = self._watchers.get(router_id, 0) + 1
+
+    def unwatch(self, router_id: str) -> None:
+        """Drop a live subscriber registered with watch()"""
+        with self._cond:
+            count = self._watchers.get(router_id, 0) - 1
+            if count > 0:
+                self._watchers[router_id] = count
+            else:
+                self._watchers.pop(router_id, None)
+                # Keep polling for one more idle timeout in case the viewer comes back
+                self._last_read[router_id] = time.monotonic()
+
+    def is_idle(self, router_id: str) -> bool:
+        """Whether nobody watches the router and its snapshot was not read within IDLE_TIMEOUT"""
+        with self._cond:
+            if self._watchers.get(router_id):
+                return False
+            last_read = self._last_read.get(router_id)
+            return last_read is None or time.monotonic() - last_read > IDLE_TIMEOUT
+
+    def wait_for_updates(self, versions: Dict[str, int], timeout: float) -> Dict[str, RouterSnapshot]:
+        """
+        Block until at least one router has a snapshot newer than the given version, or the timeout expires.
+
+        Args:
+            versions: Last version seen, keyed by router ID
+            timeout: Seconds to wait
+
+        Returns:
+            dict: Newer snapshots keyed by router ID (empty on timeout)
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                updated = {}
+                for router_id, version in versions.items():
+                    snapshot = self._snapshots.get(router_id)
+                    if snapshot is not None and snapshot.version > version:
+                        updated[router_id] = snapshot
+                remaining = deadline - time.monotonic()
+                if updated or remaining <= 0:
+                    return updated
+                self._cond.wait(remaining)
+
+    def wait_for_update(self, router_id: str, after_version: int, timeout: float) -> Optional[RouterSnapshot]:
+        """
+        Block until a router has a snapshot newer than after_version, or the timeout expires.
+
+        Returns:
+            RouterSnapshot: Latest snapshot (possibly unchanged on timeout) or None
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                snapshot = self._snapshots.get(router_id)
+                remaining = deadline - time.monotonic()
+                if (snapshot and snapshot.version > after_version) or remaining <= 0:
+                    return snapshot
+                self._cond.wait(remaining)
+
+    def refresh(self, router_id: str, sources: Optional[Iterable[str]] = None) -> Optional[RouterSnapshot]:
+        """
+        Poll one router now and publish a new snapshot.
+
+        Concurrent refreshes of the same sources of a router are coalesced
+        (e.g. the requests that all find a new router without a snapshot):
+        one poll runs and every caller gets its snapshot. Other refreshes of
+        the same router are serialized.
+
+        Args:
+            router_id: Router ID
+            sources: Data sources to fetch (default: all of them)
+
+        Returns:
+            RouterSnapshot: The published snapshot, or None if the router does not exist
+        """
+        sources = list(DATA_SOURCES) if sources is None else [s for s in DATA_SOURCES if s in sources]
+        return self.router_manager.single_flight.do((router_id, 'refresh', tuple(sources)),
+                                                    self._refresh, router_id, sources)
+
+    def _refresh(self, router_id: str, sources: List[str]) -> Optional[RouterSnapshot]:
+        with self._cond:
+            lock = self._refresh_locks.setdefault(router_id, threading.Lock())
+        with lock:
+            with self._cond:
+                current = self._snapshots.get(router_id)
+            if not self.router_manager.get_router(router_id):
+                return None
+            snapshot = self._collect(router_id, current, sources)
+            self._publish(snapshot)
+            return snapshot
+
+    def _collect(self, router_id: str, previous: Optional[RouterSnapshot], sources: List[str]) -> RouterSnapshot:
+        """Fetch the given sources in one pipelined batch and merge them into the previous snapshot"""
+        started = time.monotonic()
+        version = (previous.version if previous else self._last_versions.get(router_id, 0)) + 1
+        base = previous or RouterSnapshot(router_id)
+        try:
+            data, fetch_error = self.router_manager.fetch(router_id, 'collect', sources,
+                                                          PPP_SECRET_PROPLISTS['snapshot'],
+                                                          PPP_ACTIVE_PROPLISTS['snapshot'])
+            if data is None:
+                return base.replace(version=version, success=False, collected_at=datetime.now().isoformat(),
+                                    error=fetch_error or 'Failed to read from router',
+                                    duration=time.monotonic() - started)
+            fetched_at = time.monotonic()
+            # Sources whose command failed keep their previous value
+            fetched = {source: value for source, value in data.items() if value is not None}
+            if 'pppoe_interfaces' in fetched:
+                fetched['pppoe_interfaces'] = self._rate_engine(router_id).apply(fetched['pppoe_interfaces'],
+                                                                                 fetched_at)
+            collected_at = datetime.now().isoformat()
+            source_times = dict(base.source_times)
+            source_times.update({source: collected_at for source in fetched})
+            return base.replace(
+                version=version,
+                collected_at=collected_at,
+                duration=time.monotonic() - started,
+                success=True,
+                error=fetch_error if len(fetched) < len(data) else None,
+                source_times=source_times,
+                **fetched
+            )
+        except Exception as e:
+            error(f"Error collecting router {router_id}: {e}", "SnapshotCollector")
+            return base.replace(version=version, success=False, error=str(e),
+                                collected_at=datetime.now().isoformat(), duration=time.monotonic() - started)
+
+    def _rate_engine(self, router_id: str) -> RateEngine:
+        """Get the router's rate engine, with its current smoothing setting"""
+        with self._cond:
+            engine = self._rate_engines.get(router_id)
+            if engine is None:
+                engine = self._rate_engines[router_id] = RateEngine()
+        engine.smoothing = get_rate_smoothing(self.router_manager.get_router(router_id) or {})
+        return engine
+
+    def _publish(self, snapshot: RouterSnapshot) -> None:
+        with self._cond:
+            self._snapshots[snapshot.router_id] = snapshot
+            self._last_versions[snapshot.router_id] = snapshot.version
+            self._cond.notify_all()
+        debug(f"Published snapshot v{snapshot.version} for router {snapshot.router_id} "
+              f"in {snapshot.duration:.2f}s", "SnapshotCollector")
+
+    def _apply_stream(self, router_id: str, field: str, rows: List[Dict]) -> None:
+        """SessionTracker callback: publish a snapshot with a streamed table swapped in"""
+        with self._cond:
+            lock = self._refresh_locks.setdefault(router_id, threading.Lock())
+        with lock:
+            with self._cond:
+                current = self._snapshots.get(router_id)
+            if current is None:
+                return
+            if field == 'pppoe_interfaces':
+                # Keep the counters of the last stats poll for interfaces that still exist
+                polled = {row.get('id'): row for row in current.pppoe_interfaces}
+                rows = [{**polled[row.get('id')], **row} if row.get('id') in polled else row for row in rows]
+            source_times = dict(current.source_times)
+            source_times[field] = datetime.now().isoformat()
+            self._publish(current.replace(version=current.version + 1, source_times=source_times,
+                                          duration=0.0, **{field: rows}))
+
+    def _listen_client(self, router_id: str):
+        """Client factory for session trackers; respects the router's circuit breaker"""
+        breaker = self.router_manager.get_breaker(router_id)
+        if breaker is None or not breaker.allow_request():
+            return None
+        return self.router_manager.get_mikrotik_client(router_id)
+
+    def _sync_trackers(self, routers: List[Dict]) -> None:
+        """Start or stop session trackers to match the routers' listen settings"""
+        listening = {r['id'] for r in routers if r.get('enabled', True) and r.get('listen')}
+        for router_id in list(self._trackers):
+            if router_id not in listening:
+                self._trackers.pop(router_id).stop()
+                info(f"Stopped listening for session changes on router {router_id}", "SnapshotCollector")
+        for router_id in listening - self._trackers.keys():
+            tracker = SessionTracker(router_id, lambda router_id=router_id: self._listen_client(router_id),
+                                     self._apply_stream)
+            self._trackers[router_id] = tracker
+            tracker.start()
+
+    def _sync_routers(self) -> None:
+        """Schedule newly enabled routers and forget deleted or disabled ones"""
+        routers = self.router_manager.get_all_routers()
+        self._sync_trackers(routers)
+        enabled = {r['id'] for r in routers if r.get('enabled', True)}
+        now = time.monotonic()
+        with self._cond:
+            for router_id in list(self._generations):
+                if router_id not in enabled:
+                    del self._generations[router_id]
+                    self._snapshots.pop(router_id, None)
+                    self._rate_engines.pop(router_id, None)
+                    self._suspended.discard(router_id)
+                    info(f"Stopped polling router {router_id}", "SnapshotCollector")
+            for router_id in enabled - self._generations.keys():
+                generation = self._generations[router_id] = time.monotonic_ns()
+                # One offset per router: the first poll fetches every source in one batch
+                due = now + random.uniform(0, MAX_START_JITTER)
+                for source in DATA_SOURCES:
+                    heapq.heappush(self._schedule, (due, router_id, generation, source))
+                info(f"Started polling router {router_id}", "SnapshotCollector")
+
+    def _take_due(self) -> Dict[str, tuple]:
+        """Pop every entry due now, grouped per router as (generation, sources)"""
+        now = time.monotonic()
+        due: Dict[str, tuple] = {}
+        deferred = []
+        with self._cond:
+            while self._schedule and self._schedule[0][0] <= now + SCHEDULE_COALESCE_WINDOW:
+                entry = heapq.heappop(self._schedule)
+                _, router_id, generation, source = entry
+                if self._generations.get(router_id) != generation:
+                    continue
+                if router_id in self._busy:
+                    # Still polling this router; look again shortly
+                    deferred.append((now + SCHEDULE_COALESCE_WINDOW, router_id, generation, source))
+                    continue
+                due.setdefault(router_id, (generation, []))[1].append(source)
+            for entry in deferred:
+                heapq.heappush(self._schedule, entry)
+            self._busy.update(due)
+        return due
+
+    def _poll(self, router_id: str, generation: int, sources: List[str]) -> None:
+        """
+        Worker job: refresh the due sources of one router, then schedule their next poll.
+
+        The next poll is due one interval after this one started, so collection
+        time does not stretch the cadence, but never sooner than this poll took:
+        a router slow to answer gets at least as much time to itself.
+        """
+        started = time.monotonic()
+        tracker = self._trackers.get(router_id)
+        polled = [source for source in sources
+                  if not (tracker and source in STREAMED_SOURCES and tracker.is_synced(source))]
+        if self.is_idle(router_id):
+            with self._cond:
+                snapshot = self._snapshots.get(router_id)
+                fetched = snapshot.source_times if snapshot else {}
+            # Live sources not fetched yet are polled anyway, so the snapshot has every source once
+            skipped = [source for source in polled if source in LIVE_SOURCES and source in fetched]
+            if skipped:
+                polled = [source for source in polled if source not in skipped]
+                with self._cond:
+                    self._suspended.add(router_id)
+        try:
+            if polled:
+                self.refresh(router_id, polled)
+        except Exception as e:
+            error(f"Error polling router {router_id}: {e}", "SnapshotCollector")
+        router = self.router_manager.get_router(router_id) or {}
+        intervals = get_poll_intervals(router)
+        now = time.monotonic()
+        earliest = now + (now - started)
+        with self._cond:
+            self._busy.discard(router_id)
+            if self._generations.get(router_id) == generation:
+                for source in sources:
+                    due = max(started + intervals[source], earliest)
+                    heapq.heappush(self._schedule, (due, router_id, generation, source))
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        """Scheduler loop: hand due router/source pairs to the worker pool"""
+        while True:
+            try:
+                self._sync_routers()
+                for router_id, (generation, sources) in self._take_due().items():
+                    self._executor.submit(self._poll, router_id, generation, sources)
+                with self._cond:
+                    next_due = self._schedule[0][0] if self._schedule else float('inf')
+                    # Wake at least once a second to pick up router changes
+                    self._cond.wait(max(0.0, min(next_due - time.monotonic(), 1.0)))
+            except Exception as e:
+                error(f"Error in collector scheduler: {e}", "SnapshotCollector")
+                time.sleep(1)
+
+
+# Global collector instance
+collector = SnapshotCollector(router_manager)
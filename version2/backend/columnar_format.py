@@ -0,0 +1,91 @@
+"""
+Columnar encoding of row lists (format=columnar).
+Arrays of objects repeat every field name on every row. A columnar table
+names each field once: {"columns": [names], "rows": [[values]]}, with the
+values of each row in column order and null for fields a row lacks. String
+columns with few distinct values (profiles, services, "true"/"false") are
+dictionary-encoded: "dictionaries" maps the column to its distinct values
+and the rows hold indexes into that list.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+COLUMNAR = 'columnar'
+
+# Values of the format parameter; None (or 'rows') is the default array of objects
+ROW_FORMATS = ('rows', COLUMNAR)
+
+# A string column is dictionary-encoded when it has at most this many distinct
+# values per row
+DICTIONARY_MAX_RATIO = 0.5
+
+
+def parse_format(value: Optional[str]) -> Optional[str]:
+    """
+    Check a format parameter.
+
+    Returns:
+        str: COLUMNAR, or None for the default format
+
+    Raises:
+        ValueError: For unknown formats
+    """
+    if not value or value == 'rows':
+        return None
+    if value not in ROW_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(ROW_FORMATS)}")
+    return value
+
+
+def encode_rows(rows: List[Dict]) -> Dict:
+    """
+    Encode rows as a columnar table.
+
+    Args:
+        rows: Rows (not changed)
+
+    Returns:
+        dict: {'columns': [...], 'rows': [[...]], 'dictionaries': {column: [values]}}
+    """
+    columns: Dict[str, None] = {}
+    for row in rows:
+        for field in row:
+            if field not in columns:
+                columns[field] = None
+    names = list(columns)
+    table = [[row.get(field) for field in names] for row in rows]
+    dictionaries = {}
+    limit = len(rows) * DICTIONARY_MAX_RATIO
+    for position, field in enumerate(names):
+        values = [row[position] for row in table]
+        if not all(value is None or isinstance(value, str) for value in values):
+            continue
+        distinct = {value: None for value in values if value is not None}
+        if not distinct or len(distinct) > limit:
+            continue
+        dictionary = list(distinct)
+        indexes = {value: index for index, value in enumerate(dictionary)}
+        for row in table:
+            value = row[position]
+            if value is not None:
+                row[position] = indexes[value]
+        dictionaries[field] = dictionary
+    return {'columns': names, 'rows': table, 'dictionaries': dictionaries}
+
+
+def decode_rows(table: Dict) -> List[Dict]:
+    """Rows of a table made by encode_rows(); null values are left out, as for fields a row lacked"""
+    names = table['columns']
+    dictionaries = [table['dictionaries'].get(field) for field in names]
+    return [{field: (dictionary[value] if dictionary is not None else value)
+             for field, dictionary, value in zip(names, dictionaries, row) if value is not None}
+            for row in table['rows']]
+
+
+def encode_lists(data: Dict, lists: Iterable[str]) -> Dict:
+    """Copy of a response with the given row lists encoded as columnar tables"""
+    result = dict(data)
+    for name in lists:
+        if isinstance(result.get(name), list):
+            result[name] = encode_rows(result[name])
+    return result
@@ -0,0 +1,200 @@
+"""
+Connection pool for MikroTik routers.
+Keeps authenticated RouterOS API connections open per router so requests
+can borrow an already logged-in client instead of connecting every time.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from mikrotik_client import MikroTikClient
+from logger import info, error, warning, debug
+
+
+class RouterConnectionPool:
+    """
+    Thread-safe pool of authenticated MikroTikClient connections for one router.
+    """
+
+    def __init__(self, router_id: str, client_factory: Callable[[], Optional[MikroTikClient]],
+                 max_size: int = 4, idle_timeout: float = 300.0,
+                 liveness_interval: float = 30.0, checkout_timeout: float = 10.0):
+        """
+        Initialize the pool.
+
+        Args:
+            router_id: ID of the router this pool connects to
+            client_factory: Callable returning (connected client, None), or (None, error message) on failure
+            max_size: Maximum number of open connections to the router
+            idle_timeout: Seconds an idle connection is kept before it is closed
+            liveness_interval: Idle seconds after which a connection is probed before reuse
+            checkout_timeout: Seconds to wait for a free connection when the pool is full
+        """
+        self.router_id = router_id
+        self.client_factory = client_factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.liveness_interval = liveness_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._idle: List[Tuple[MikroTikClient, float]] = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {'created': 0, 'reused': 0, 'discarded': 0, 'timeouts': 0}
+
+    def checkout(self) -> Tuple[Optional[MikroTikClient], Optional[str]]:
+        """
+        Borrow a connected client from the pool.
+
+        Idle connections are reused (most recently used first). Connections that
+        have been idle longer than liveness_interval are probed and replaced
+        transparently when they turn out to be dead.
+
+        Returns:
+            tuple: (connected client, None), or (None, error message) if no connection could be made
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            client = None
+            last_used = 0.0
+            with self._cond:
+                if self._closed:
+                    return None, f"Connection pool for router {self.router_id} is closed"
+                if self._idle:
+                    client, last_used = self._idle.pop()
+                elif self._size < self.max_size:
+                    # Reserve a slot; the connection is opened outside the lock
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        message = f"Timed out waiting for a free connection to router {self.router_id}"
+                        warning(message, "RouterConnectionPool.checkout")
+                        return None, message
+                    self._cond.wait(remaining)
+                    continue
+
+            if client is not None:
+                if time.monotonic() - last_used < self.liveness_interval or client.is_alive():
+                    self._stats['reused'] += 1
+                    return client, None
+                debug(f"Dropping stale connection to router {self.router_id}", "RouterConnectionPool.checkout")
+                self._stats['discarded'] += 1
+                self._safe_disconnect(client)
+
+            return self._open_connection()
+
+    def checkin(self, client: Optional[MikroTikClient]) -> None:
+        """
+        Return a borrowed client to the pool.
+
+        Clients whose connection failed while checked out, or that are returned
+        after the pool was closed, are disconnected instead of being kept.
+
+        Args:
+            client: Client previously obtained from checkout()
+        """
+        if client is None:
+            return
+        with self._cond:
+            if client.connected and not self._closed:
+                self._idle.append((client, time.monotonic()))
+                self._cond.notify()
+                return
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+        self._safe_disconnect(client)
+
+    def discard(self, client: Optional[MikroTikClient]) -> None:
+        """
+        Close a borrowed client instead of returning it, e.g. after a request on
+        it failed midway and left unread replies on the connection.
+
+        Args:
+            client: Client previously obtained from checkout()
+        """
+        if client is None:
+            return
+        with self._cond:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+        self._safe_disconnect(client)
+
+    def reap(self) -> int:
+        """
+        Close connections that have been idle longer than idle_timeout.
+
+        Returns:
+            int: Number of connections closed
+        """
+        now = time.monotonic()
+        with self._cond:
+            expired = [c for c, last_used in self._idle if now - last_used > self.idle_timeout]
+            if not expired:
+                return 0
+            self._idle = [(c, t) for c, t in self._idle if now - t <= self.idle_timeout]
+            self._size -= len(expired)
+            self._cond.notify_all()
+        for client in expired:
+            self._safe_disconnect(client)
+        debug(f"Closed {len(expired)} idle connection(s) to router {self.router_id}", "RouterConnectionPool.reap")
+        return len(expired)
+
+    def close(self) -> None:
+        """
+        Close all idle connections and refuse further checkouts.
+        Connections currently checked out are closed when they are returned.
+        """
+        with self._cond:
+            self._closed = True
+            idle = [c for c, _ in self._idle]
+            self._idle = []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for client in idle:
+            self._safe_disconnect(client)
+
+    def get_stats(self) -> Dict:
+        """
+        Get pool usage counters.
+
+        Returns:
+            dict: Open, idle and in-use connection counts plus lifetime counters
+        """
+        with self._cond:
+            return {
+                'router_id': self.router_id,
+                'open': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'max_size': self.max_size,
+                **self._stats
+            }
+
+    def _open_connection(self) -> Tuple[Optional[MikroTikClient], Optional[str]]:
+        """Open a new connection in a slot already reserved by checkout()"""
+        try:
+            client, message = self.client_factory()
+        except Exception as e:
+            client, message = None, str(e)
+        if client is not None and client.connected:
+            with self._cond:
+                self._stats['created'] += 1
+            return client, None
+        if client is not None:
+            message = client.get_error()
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        return None, message or f"Failed to connect to router {self.router_id}"
+
+    @staticmethod
+    def _safe_disconnect(client: MikroTikClient) -> None:
+        try:
+            client.disconnect()
+        except Exception as e:
+            error(f"Error closing connection: {e}", "RouterConnectionPool")
@@ -0,0 +1,237 @@
+"""
+Pacing of the dashboard_update broadcast.
+BroadcastCadence decides when a router's dashboard is broadcast next: at the
+target interval measured from the start of the previous broadcast, stretched
+while building the message is slow or the router is loaded. ClientSendQueues
+keeps slow clients from piling up frames: each client has a bounded number of
+unacknowledged messages, and newer messages for a client that is behind
+replace (or are merged into) the one waiting for it.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from dashboard_delta import DELTA, merge_deltas
+
+# Longest seconds between broadcasts of a router, however slow or loaded
+MAX_BROADCAST_INTERVAL = 30
+
+# Share of the interval that building and sending a router's message may take;
+# slower routers are broadcast less often
+MAX_BUSY_FRACTION = 0.5
+
+# Router CPU load (percent) at which broadcasts are spaced out by LOAD_STRETCH
+HIGH_CPU_LOAD = 80
+LOAD_STRETCH = 2
+
+# EWMA weight of the newest broadcast cost
+COST_SMOOTHING = 0.3
+
+# Messages a client may have unacknowledged before newer ones wait for it
+MAX_IN_FLIGHT = 2
+
+# Seconds after which an unacknowledged message no longer counts as in flight
+ACK_TIMEOUT = 30
+
+
+def _cpu_load(snapshot) -> Optional[float]:
+    resources = getattr(snapshot, 'resources', None) or {}
+    try:
+        return float(resources.get('cpu-load'))
+    except (TypeError, ValueError):
+        return None
+
+
+class BroadcastCadence:
+    """
+    Per-router schedule of dashboard broadcasts.
+
+    The interval is the target, or longer when the smoothed cost of a
+    broadcast exceeds MAX_BUSY_FRACTION of it, when the router took longer
+    than the target to answer its last poll, or when its CPU load is high.
+    The next broadcast is due one interval after the previous one started,
+    so the time spent building it is not added on top.
+    """
+
+    def __init__(self, target: float, max_interval: float = MAX_BROADCAST_INTERVAL):
+        """
+        Initialize the cadence.
+
+        Args:
+            target: Seconds between broadcasts of a router that keeps up
+            max_interval: Longest seconds between broadcasts
+        """
+        self.target = target
+        self.max_interval = max(max_interval, target)
+        self._lock = threading.Lock()
+        self._costs: Dict[str, float] = {}
+        self._intervals: Dict[str, float] = {}
+        self._next_due: Dict[str, float] = {}
+
+    def next_due(self, router_id: str) -> float:
+        """time.monotonic() value at which the router may be broadcast again (0 if now)"""
+        with self._lock:
+            return self._next_due.get(router_id, 0.0)
+
+    def interval(self, router_id: str) -> float:
+        """Current seconds between broadcasts of a router"""
+        with self._lock:
+            return self._intervals.get(router_id, self.target)
+
+    def record(self, router_id: str, started: float, cost: float, snapshot=None) -> float:
+        """
+        Record a broadcast and schedule the next one.
+
+        Args:
+            router_id: Router ID
+            started: time.monotonic() value when the broadcast started
+            cost: Seconds spent building and sending it
+            snapshot: RouterSnapshot that was broadcast, for the router's poll duration and CPU load
+
+        Returns:
+            float: Seconds until the next broadcast of the router, counted from started
+        """
+        with self._lock:
+            previous = self._costs.get(router_id)
+            cost = cost if previous is None else COST_SMOOTHING * cost + (1 - COST_SMOOTHING) * previous
+            self._costs[router_id] = cost
+            interval = max(self.target, cost / MAX_BUSY_FRACTION, getattr(snapshot, 'duration', 0.0))
+            load = _cpu_load(snapshot)
+            if load is not None and load >= HIGH_CPU_LOAD:
+                interval = max(interval, self.target * LOAD_STRETCH)
+            interval = min(interval, self.max_interval)
+            self._intervals[router_id] = interval
+            self._next_due[router_id] = started + interval
+            return interval
+
+    def forget(self, router_id: str) -> None:
+        """Drop a router that is no longer broadcast"""
+        with self._lock:
+            self._costs.pop(router_id, None)
+            self._intervals.pop(router_id, None)
+            self._next_due.pop(router_id, None)
+
+
+class _Client:
+    __slots__ = ('channel', 'in_flight', 'pending', 'last_seq')
+
+    def __init__(self, channel):
+        self.channel = channel
+        # (seq, sent at) of unacknowledged messages
+        self.in_flight = deque()
+        self.pending = None
+        self.last_seq = None
+
+
+class ClientSendQueues:
+    """
+    Flow control of dashboard_update messages per client.
+
+    Clients acknowledge every message they processed (dashboard_ack). A client
+    with MAX_IN_FLIGHT unacknowledged messages gets nothing more until it
+    acknowledges one; meanwhile only the newest message is kept for it.
+    Consecutive deltas are merged, so the client still gets every change in
+    one message; if the chain is broken it gets the full state instead.
+    """
+
+    def __init__(self, full_message: Callable[[str], Dict], max_in_flight: int = MAX_IN_FLIGHT,
+                 ack_timeout: float = ACK_TIMEOUT):
+        """
+        Initialize the queues.
+
+        Args:
+            full_message: Returns the current full message of a channel (as passed to sent())
+            max_in_flight: Messages a client may have unacknowledged
+            ack_timeout: Seconds after which an unacknowledged message is no longer waited for
+        """
+        self._full_message = full_message
+        self.max_in_flight = max_in_flight
+        self.ack_timeout = ack_timeout
+        self._lock = threading.Lock()
+        self._clients: Dict[str, _Client] = {}
+
+    def sent(self, sid: str, channel, message: Dict) -> None:
+        """Record a full message sent to a client directly, e.g. on (re)subscribe; resets its queue"""
+        with self._lock:
+            client = self._clients[sid] = _Client(channel)
+            self._record(client, message)
+
+    def offer(self, sid: str, message: Dict) -> Optional[Dict]:
+        """
+        Offer a broadcast message to a client.
+
+        Args:
+            sid: Client
+            message: Message broadcast to the client's channel
+
+        Returns:
+            dict: The message to send the client now (message itself, or a merged
+                  or full message if older ones were waiting), or None if it has to wait
+        """
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                return None
+            if client.last_seq is not None and message['seq'] <= client.last_seq:
+                return None
+            self._coalesce(client, message)
+            if not self._ready(client):
+                return None
+            return self._take(client)
+
+    def ack(self, sid: str, seq: int) -> Optional[Dict]:
+        """
+        Record that a client processed every message up to seq.
+
+        Returns:
+            dict: Message that was waiting for the client and should be sent now, or None
+        """
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                return None
+            while client.in_flight and client.in_flight[0][0] <= seq:
+                client.in_flight.popleft()
+            if client.pending is None or not self._ready(client):
+                return None
+            return self._take(client)
+
+    def remove(self, sid: str) -> None:
+        """Forget a client that unsubscribed or disconnected"""
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def backlog(self, sid: str) -> int:
+        """Number of unacknowledged messages of a client"""
+        with self._lock:
+            client = self._clients.get(sid)
+            return len(client.in_flight) if client else 0
+
+    def _ready(self, client: _Client) -> bool:
+        expired = time.monotonic() - self.ack_timeout
+        while client.in_flight and client.in_flight[0][1] <= expired:
+            client.in_flight.popleft()
+        return len(client.in_flight) < self.max_in_flight
+
+    def _coalesce(self, client: _Client, message: Dict) -> None:
+        pending = client.pending
+        if (pending is not None and pending['type'] == DELTA and message['type'] == DELTA
+                and message['base_seq'] == pending['seq']):
+            client.pending = merge_deltas(pending, message)
+        else:
+            client.pending = message
+
+    def _take(self, client: _Client) -> Optional[Dict]:
+        message, client.pending = client.pending, None
+        if message['type'] == DELTA and message['base_seq'] != client.last_seq:
+            # A message it depends on was replaced: send the current state instead
+            message = self._full_message(client.channel)
+            if message is None:
+                return None
+        self._record(client, message)
+        return message
+
+    def _record(self, client: _Client, message: Dict) -> None:
+        client.last_seq = message['seq']
+        client.in_flight.append((message['seq'], time.monotonic()))
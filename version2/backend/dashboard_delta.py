@@ -0,0 +1,344 @@
+"""
+Delta encoding for the dashboard_update WebSocket stream.
+Clients get the full dashboard state once, then only the rows that were added,
+removed or changed since the previous message, keyed by RouterOS .id (or name).
+Every message carries a sequence number; a client that misses one asks for a
+full resync. Clients subscribe to the router they view, optionally with a
+field projection and the columnar row format; clients with the same router,
+projection and format form a channel with its own stream, broadcast to a
+Socket.IO room.
+"""
+
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from columnar_format import COLUMNAR, encode_rows
+from field_projection import Projection, projection_key
+from json_payload import EncodedJSON
+
+# Dashboard fields holding row lists, which are sent as diffs
+LIST_FIELDS = ('pppoe_interfaces', 'ppp_accounts', 'ppp_active')
+
+FULL = 'full'
+DELTA = 'delta'
+
+# Kind of list (see field_projection.KNOWN_FIELDS) of each dashboard list field
+DASHBOARD_LISTS = {'pppoe_interfaces': 'pppoe_interfaces', 'ppp_accounts': 'ppp_secrets', 'ppp_active': 'ppp_active'}
+
+# (router ID, projection key and row format): subscribers that get the same messages
+Channel = Tuple[str, str]
+
+
+def room_name(channel: Channel) -> str:
+    """Socket.IO room of a channel's subscribers"""
+    router_id, key = channel
+    return f"router:{router_id}|{key}" if key else f"router:{router_id}"
+
+
+def channel_key(projection: Optional[Projection] = None, row_format: Optional[str] = None) -> str:
+    """Second part of a Channel ('' for whole rows as arrays of objects)"""
+    key = projection_key(projection or {})
+    if row_format:
+        key = f"{key};format={row_format}" if key else f"format={row_format}"
+    return key
+
+
+def wire_message(message: Dict, row_format: Optional[str] = None) -> Dict:
+    """
+    A message as sent to clients of a row format.
+
+    With COLUMNAR, the lists of a full message and the added rows of a delta
+    are columnar tables (see columnar_format); patches stay objects. Messages
+    are kept as row objects until they are sent, so deltas can be merged.
+
+    Returns:
+        dict: message itself for the default format, else an encoded copy
+    """
+    if row_format != COLUMNAR or isinstance(message, EncodedJSON):
+        return message
+    if message['type'] == FULL:
+        return {**message, **{field: encode_rows(message[field]) for field in LIST_FIELDS
+                              if isinstance(message.get(field), list)}}
+    lists = {field: {**diff, 'added': encode_rows(diff['added'])} for field, diff in message['lists'].items()}
+    return {**message, 'lists': lists}
+
+
+def row_key(row: Dict):
+    """Key identifying a row across snapshots: its RouterOS .id, or its name when it has none"""
+    key = row.get('id')
+    return key if key is not None else row.get('name')
+
+
+def diff_rows(old: List[Dict], new: List[Dict]) -> Optional[Dict]:
+    """
+    Diff two versions of a row list.
+
+    Changed rows are sent as patches holding the key and the fields whose
+    value changed. A row that lost fields cannot be patched and is sent as
+    removed and added again.
+
+    Args:
+        old: Rows the client has
+        new: Current rows
+
+    Returns:
+        dict: {'added': [rows], 'removed': [keys], 'changed': [patches]}, or None if nothing changed
+    """
+    if old is new:
+        return None
+    old_by_key = {row_key(row): row for row in old}
+    added, removed, changed = [], [], []
+    seen = set()
+    for row in new:
+        key = row_key(row)
+        seen.add(key)
+        previous = old_by_key.get(key)
+        if previous is None:
+            added.append(row)
+        elif previous is row or previous == row:
+            continue
+        elif previous.keys() - row.keys():
+            removed.append(key)
+            added.append(row)
+        else:
+            patch = {field: value for field, value in row.items() if previous.get(field) != value}
+            patch['id' if 'id' in row else 'name'] = key
+            changed.append(patch)
+    removed.extend(key for key in old_by_key if key not in seen)
+    if not (added or removed or changed):
+        return None
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def _merge_diffs(first: Optional[Dict], second: Optional[Dict]) -> Optional[Dict]:
+    """Combine two consecutive diff_rows() results into one"""
+    if not first or not second:
+        return first or second
+    # Net effect of both diffs per key: ('patch', fields) for a row that existed
+    # before, ('add', row) for a new one, ('replace', row) or ('remove', None)
+    effects: Dict = {}
+    for diff in (first, second):
+        added = {row_key(row): row for row in diff['added']}
+        for key in diff['removed']:
+            if key in added:
+                continue
+            if effects.get(key, ('',))[0] == 'add':
+                del effects[key]
+            else:
+                effects[key] = ('remove', None)
+        for key, row in added.items():
+            kind = effects.get(key, ('',))[0]
+            if key in diff['removed']:
+                effects[key] = ('add' if kind == 'add' else 'replace', row)
+            else:
+                effects[key] = ('add' if kind in ('', 'add') else 'replace', row)
+        for patch in diff['changed']:
+            key = row_key(patch)
+            kind, value = effects.get(key, ('patch', {}))
+            effects[key] = (kind, {**value, **patch})
+    added, removed, changed = [], [], []
+    for key, (kind, value) in effects.items():
+        if kind == 'patch':
+            changed.append(value)
+            continue
+        if kind in ('replace', 'remove'):
+            removed.append(key)
+        if kind in ('add', 'replace'):
+            added.append(value)
+    if not (added or removed or changed):
+        return None
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def merge_deltas(first: Dict, second: Dict) -> Dict:
+    """
+    Combine two consecutive delta messages into one.
+
+    Applying the result to the state at first's base_seq gives the same state
+    as applying both, so a client that has not received first yet can skip it.
+
+    Args:
+        first: Earlier delta message
+        second: Delta message whose base_seq is first's seq
+
+    Returns:
+        dict: Delta message from first's base_seq to second's seq
+    """
+    lists = {}
+    for field in LIST_FIELDS:
+        diff = _merge_diffs(first['lists'].get(field), second['lists'].get(field))
+        if diff is not None:
+            lists[field] = diff
+    return {'type': DELTA, 'seq': second['seq'], 'base_seq': first['base_seq'],
+            'router_id': second.get('router_id'), 'set': {**first['set'], **second['set']}, 'lists': lists}
+
+
+class DashboardStream:
+    """
+    Turns successive dashboard states into full and delta messages.
+
+    Full message: the dashboard data plus {'type': 'full', 'seq': n}, as an
+    EncodedJSON serialized once (in the stream's row format) for every client
+    that needs it.
+    Delta message: {'type': 'delta', 'seq': n, 'base_seq': n - 1, 'router_id',
+    'set': {changed scalar fields}, 'lists': {field: diff_rows() result}}.
+    """
+
+    def __init__(self, row_format: Optional[str] = None):
+        self.row_format = row_format
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._state: Optional[Dict] = None
+        self._full: Optional[EncodedJSON] = None
+
+    def publish(self, data: Dict) -> Dict:
+        """
+        Record a new dashboard state and build the message announcing it.
+
+        A full message is sent for the first state, after a router switch and
+        whenever either state is an error.
+
+        Args:
+            data: Result of get_dashboard_data()
+
+        Returns:
+            dict: Message to broadcast (EncodedJSON for a full message)
+        """
+        with self._lock:
+            previous = self._state
+            self._seq += 1
+            self._state = data
+            self._full = None
+            if (previous is None or not previous.get('success') or not data.get('success')
+                    or previous.get('router_id') != data.get('router_id')):
+                self._full = self._encode_full()
+                return self._full
+            lists = {}
+            for field in LIST_FIELDS:
+                diff = diff_rows(previous.get(field) or [], data.get(field) or [])
+                if diff is not None:
+                    lists[field] = diff
+            changed = {field: value for field, value in data.items()
+                       if field not in LIST_FIELDS and previous.get(field) != value}
+            return {'type': DELTA, 'seq': self._seq, 'base_seq': self._seq - 1,
+                    'router_id': data.get('router_id'), 'set': changed, 'lists': lists}
+
+    def full_message(self) -> Optional[EncodedJSON]:
+        """
+        Full message for the latest published state, for clients that (re)subscribe.
+
+        Returns:
+            EncodedJSON: Full message, or None if nothing was published yet
+        """
+        with self._lock:
+            if self._state is None:
+                return None
+            if self._full is None:
+                self._full = self._encode_full()
+            return self._full
+
+    def _encode_full(self) -> EncodedJSON:
+        return EncodedJSON(wire_message({**self._state, 'type': FULL, 'seq': self._seq}, self.row_format))
+
+
+class DashboardSubscriptions:
+    """
+    Which socket clients view which router's dashboard, and each channel's stream.
+
+    A client views one router at a time. A channel's stream exists while it
+    has subscribers, so a channel that is subscribed to again starts with a
+    full message.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channel_by_sid: Dict[str, Channel] = {}
+        self._sids_by_channel: Dict[Channel, Set[str]] = {}
+        self._projections: Dict[Channel, Optional[Projection]] = {}
+        self._formats: Dict[Channel, Optional[str]] = {}
+        self._streams: Dict[Channel, DashboardStream] = {}
+
+    def subscribe(self, sid: str, router_id: str, projection: Optional[Projection] = None,
+                  row_format: Optional[str] = None) -> Tuple[Channel, Optional[Channel]]:
+        """
+        Subscribe a client to a router, replacing its previous subscription.
+
+        Args:
+            sid: Client
+            router_id: Router to view
+            projection: Fields to send of each dashboard list (see field_projection.parse_fields())
+            row_format: None, or COLUMNAR to send lists as columnar tables
+
+        Returns:
+            tuple: (the client's channel, the channel it was subscribed to before or None)
+        """
+        channel = (router_id, channel_key(projection, row_format))
+        with self._lock:
+            previous = self._remove(sid)
+            self._channel_by_sid[sid] = channel
+            self._sids_by_channel.setdefault(channel, set()).add(sid)
+            self._projections.setdefault(channel, projection if projection_key(projection or {}) else None)
+            self._formats.setdefault(channel, row_format)
+            self._streams.setdefault(channel, DashboardStream(row_format))
+            return channel, previous
+
+    def unsubscribe(self, sid: str) -> Optional[Channel]:
+        """
+        Remove a client's subscription.
+
+        Returns:
+            tuple: Channel the client was subscribed to, or None
+        """
+        with self._lock:
+            return self._remove(sid)
+
+    def channel_of(self, sid: str) -> Optional[Channel]:
+        """Channel a client is subscribed to"""
+        with self._lock:
+            return self._channel_by_sid.get(sid)
+
+    def router_of(self, sid: str) -> Optional[str]:
+        """Router a client is subscribed to"""
+        channel = self.channel_of(sid)
+        return channel[0] if channel else None
+
+    def channels(self, router_id: str) -> List[Channel]:
+        """Channels of a router that have subscribers"""
+        with self._lock:
+            return [channel for channel in self._sids_by_channel if channel[0] == router_id]
+
+    def projection(self, channel: Channel) -> Optional[Projection]:
+        """Projection of a channel, or None if its clients get whole rows"""
+        with self._lock:
+            return self._projections.get(channel)
+
+    def row_format(self, channel: Channel) -> Optional[str]:
+        """Row format of a channel (None for arrays of objects)"""
+        with self._lock:
+            return self._formats.get(channel)
+
+    def subscribers(self, channel: Channel) -> List[str]:
+        """Clients subscribed to a channel"""
+        with self._lock:
+            return list(self._sids_by_channel.get(channel, ()))
+
+    def routers(self) -> List[str]:
+        """Routers with at least one subscriber"""
+        with self._lock:
+            return list({router_id for router_id, _ in self._sids_by_channel})
+
+    def stream(self, channel: Channel) -> Optional[DashboardStream]:
+        """Stream of a channel, or None if it has no subscribers"""
+        with self._lock:
+            return self._streams.get(channel)
+
+    def _remove(self, sid: str) -> Optional[Channel]:
+        channel = self._channel_by_sid.pop(sid, None)
+        if channel is not None:
+            sids = self._sids_by_channel[channel]
+            sids.discard(sid)
+            if not sids:
+                del self._sids_by_channel[channel]
+                del self._projections[channel]
+                del self._formats[channel]
+                del self._streams[channel]
+        return channel
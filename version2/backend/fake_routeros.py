@@ -0,0 +1,699 @@
+"""
+Fake RouterOS API server for tests and benchmarks.
+Speaks the real API wire protocol and serves a synthetic PPPoE concentrator:
+PPP secrets, active sessions with growing byte counters, their pppoe-in
+interfaces and a few system menus. Sessions can churn (disconnect and
+reconnect) at a configurable rate, which is streamed to 'listen' commands, and
+commands can be slowed down or made to fail on purpose.
+
+Run in-process:
+
+    server = FakeRouterOS(port=0, secrets=20000, active=8000).start()
+    ... connect MikroTikClient to 127.0.0.1:server.port ...
+    server.stop()
+
+or as a subprocess:
+
+    python fake_routeros.py --secrets 20000 --active 8000 --churn 20 --latency 0.01
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from routeros_protocol import encode_sentence, read_sentence
+from logger import info, error
+
+# Counters wrap at 2^64, like on the router
+COUNTER_MODULUS = 1 << 64
+
+# Seconds between churn steps
+CHURN_TICK = 0.1
+
+# Interfaces that exist besides the dynamic pppoe-in ones
+STATIC_INTERFACES = (
+    ('ether1', 'ether'), ('ether2', 'ether'), ('ether3', 'ether'), ('ether4', 'ether'), ('bridge1', 'bridge'),
+)
+
+PROFILES = ('default', '10M', '20M', '50M', '100M')
+
+
+def _format_duration(seconds: float) -> str:
+    """Format seconds the way RouterOS prints durations, e.g. '1w2d3h4m5s'"""
+    seconds = int(seconds)
+    parts = []
+    for unit, size in (('w', 604800), ('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds >= size:
+            parts.append(f"{seconds // size}{unit}")
+            seconds %= size
+    if seconds or not parts:
+        parts.append(f"{seconds}s")
+    return ''.join(parts)
+
+
+def _format_time(at: datetime) -> str:
+    return at.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _mac(index: int) -> str:
+    return '02:00:' + ':'.join(f"{(index >> shift) & 0xFF:02X}" for shift in (24, 16, 8, 0))
+
+
+def _address(index: int) -> str:
+    return f"10.{(index >> 16) & 0xFF}.{(index >> 8) & 0xFF}.{index & 0xFF}"
+
+
+def generate_self_signed_cert(directory: str) -> Tuple[str, str]:
+    """
+    Create a self-signed certificate for the API-SSL port with the openssl tool.
+
+    Args:
+        directory: Directory to write cert.pem and key.pem to
+
+    Returns:
+        tuple: (certificate path, key path)
+    """
+    if shutil.which('openssl') is None:
+        raise RuntimeError("openssl is required to generate a self-signed certificate")
+    certfile = os.path.join(directory, 'cert.pem')
+    keyfile = os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '365',
+                    '-subj', '/CN=fake-routeros', '-keyout', keyfile, '-out', certfile],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return certfile, keyfile
+
+
+class _Session:
+    """One connected PPPoE session and its interface"""
+
+    __slots__ = ('secret', 'active_id', 'interface_id', 'session_id', 'started', 'connected_at',
+                 'caller_id', 'address', 'rx_rate', 'tx_rate', 'counter_start')
+
+    def __init__(self, secret: Dict, active_id: str, interface_id: str, caller_id: str, address: str,
+                 rx_rate: float, tx_rate: float, counter_start: int):
+        self.secret = secret
+        self.active_id = active_id
+        self.interface_id = interface_id
+        self.session_id = '0x81' + active_id[1:].rjust(6, '0')
+        self.started = time.monotonic()
+        self.connected_at = datetime.now()
+        self.caller_id = caller_id
+        self.address = address
+        self.rx_rate = rx_rate
+        self.tx_rate = tx_rate
+        self.counter_start = counter_start
+
+    def active_row(self) -> Dict[str, str]:
+        return {
+            '.id': self.active_id,
+            'name': self.secret['name'],
+            'service': 'pppoe',
+            'caller-id': self.caller_id,
+            'address': self.address,
+            'uptime': _format_duration(time.monotonic() - self.started),
+            'encoding': '',
+            'session-id': self.session_id,
+            'limit-bytes-in': '0',
+            'limit-bytes-out': '0',
+            'radius': 'false',
+        }
+
+    def interface_row(self, stats: bool = False) -> Dict[str, str]:
+        row = {
+            '.id': self.interface_id,
+            'name': f"<pppoe-{self.secret['name']}>",
+            'type': 'pppoe-in',
+            'mtu': '1480',
+            'actual-mtu': '1480',
+            'client-mac-address': self.caller_id,
+            'last-link-up-time': _format_time(self.connected_at),
+            'running': 'true',
+            'disabled': 'false',
+        }
+        if stats:
+            elapsed = time.monotonic() - self.started
+            row['rx-byte'] = str((self.counter_start + int(self.rx_rate * elapsed)) % COUNTER_MODULUS)
+            row['tx-byte'] = str((self.counter_start + int(self.tx_rate * elapsed)) % COUNTER_MODULUS)
+            row['rx-packet'] = str(int(self.rx_rate * elapsed) // 1000)
+            row['tx-packet'] = str(int(self.tx_rate * elapsed) // 1000)
+            row['rx-bits-per-second'] = str(int(self.rx_rate * 8))
+            row['tx-bits-per-second'] = str(int(self.tx_rate * 8))
+        return row
+
+
+class _Listener:
+    __slots__ = ('connection', 'path', 'tag', 'proplist')
+
+    def __init__(self, connection: '_Connection', path: str, tag: Optional[str], proplist: Optional[List[str]]):
+        self.connection = connection
+        self.path = path
+        self.tag = tag
+        self.proplist = proplist
+
+
+class _Connection:
+    """State of one client connection"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.logged_in = False
+        self.challenge = None
+        self.listeners: Dict[Optional[str], _Listener] = {}
+
+    def send(self, sentences: List[List[str]]) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(b''.join(encode_sentence(words) for words in sentences))
+
+
+class FakeRouterOS:
+    """
+    In-memory RouterOS API server.
+
+    The latency, failure and churn settings are plain attributes read on every
+    command, so tests can change them while the server runs. get_stats()
+    reports connections, logins and commands served, for counting router
+    round trips per API request.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8728, ssl_port: Optional[int] = None,
+                 certfile: Optional[str] = None, keyfile: Optional[str] = None,
+                 username: str = 'admin', password: str = '', identity: str = 'FakeRouter',
+                 secrets: int = 1000, active: int = 400, leases: int = 20, churn: float = 0.0,
+                 latency: float = 0.0, latency_jitter: float = 0.0,
+                 failure_rate: float = 0.0, drop_rate: float = 0.0,
+                 counter_start: int = 0, empty_replies: bool = False, seed: Optional[int] = None):
+        """
+        Initialize the server and its synthetic data.
+
+        Args:
+            host: Address to listen on
+            port: Plain API port (0 picks a free port)
+            ssl_port: API-SSL port, or None to serve plain API only (0 picks a free port)
+            certfile: Certificate for the API-SSL port (default: generate a self-signed one)
+            keyfile: Private key for certfile
+            username: Accepted login name
+            password: Accepted password
+            identity: Router identity
+            secrets: Number of PPP secrets
+            active: Number of sessions connected at start
+            leases: Number of DHCP leases
+            churn: Sessions per second that disconnect, each replaced by a new session
+            latency: Seconds added before answering each command
+            latency_jitter: Extra random seconds (0 to this value) added to latency
+            failure_rate: Share of commands (0-1) answered with a !trap
+            drop_rate: Share of commands (0-1) answered by closing the connection
+            counter_start: Byte counter value of new sessions, e.g. near 2^64 to test wraparound
+            empty_replies: Answer prints without rows with !empty before !done, as RouterOS 7.18+ does
+            seed: Seed for the generated data and the injected failures
+        """
+        self.host = host
+        self.port = port
+        self.ssl_port = ssl_port
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.username = username
+        self.password = password
+        self.identity = identity
+        self.churn = churn
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.counter_start = counter_start
+        self.empty_replies = empty_replies
+
+        self._random = random.Random(seed)
+        self._booted = time.monotonic()
+        self._next_id = 0x100
+        self._secrets: List[Dict] = []
+        self._sessions: Dict[str, _Session] = {}
+        self._connections: List[_Connection] = []
+        self._stats = Counter()
+        self._commands = Counter()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._servers = []
+        self._thread: Optional[threading.Thread] = None
+        self._churn_task = None
+        self._tempdir = None
+
+        for index in range(1, secrets + 1):
+            self._secrets.append({
+                '.id': f"*{index:X}",
+                'name': f"user{index:05d}",
+                'service': 'pppoe',
+                'profile': PROFILES[index % len(PROFILES)],
+                'disabled': 'true' if index % 25 == 0 else 'false',
+                'comment': f"Customer {index}",
+                'caller-id': '',
+                'local-address': '10.255.255.1',
+                'remote-address': _address(index) if index % 4 == 0 else '',
+                'last-logged-out': 'never',
+                'last-caller-id': '',
+                'last-disconnect-reason': '',
+            })
+        self._leases = [{
+            '.id': f"*{index:X}",
+            'address': f"192.168.{index >> 8}.{index & 0xFF}",
+            'mac-address': _mac(0xDD000000 + index),
+            'host-name': f"cpe-{index}",
+            'server': 'dhcp1',
+            'status': 'bound',
+            'dynamic': 'true',
+        } for index in range(1, leases + 1)]
+        for secret in self._random.sample(self._enabled_offline(), min(active, len(self._secrets))):
+            self._connect(secret)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> 'FakeRouterOS':
+        """Serve from a background thread; returns once the ports are listening"""
+        started = threading.Event()
+        failure = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._start_servers())
+            except Exception as e:
+                failure.append(e)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True, name='fake-routeros')
+        self._thread.start()
+        started.wait()
+        if failure:
+            raise failure[0]
+        return self
+
+    def stop(self) -> None:
+        """Close every connection and stop serving"""
+        if self._loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._stop_servers(), self._loop)
+        future.result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
+
+    async def serve_forever(self) -> None:
+        """Serve on the current event loop until cancelled"""
+        self._loop = asyncio.get_running_loop()
+        await self._start_servers()
+        # The logger keeps messages in memory only; tell a parent process we are up
+        print(f"Fake RouterOS listening on {self.host}:{self.port}"
+              + (f", SSL on {self.host}:{self.ssl_port}" if self.ssl_port is not None else ''), flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self._stop_servers()
+
+    async def _start_servers(self) -> None:
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._servers.append(server)
+        if self.ssl_port is not None:
+            if not self.certfile:
+                self._tempdir = tempfile.TemporaryDirectory(prefix='fake-routeros-')
+                self.certfile, self.keyfile = generate_self_signed_cert(self._tempdir.name)
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(self.certfile, self.keyfile)
+            server = await asyncio.start_server(self._handle, self.host, self.ssl_port, ssl=context)
+            self.ssl_port = server.sockets[0].getsockname()[1]
+            self._servers.append(server)
+        self._churn_task = asyncio.ensure_future(self._churn_loop())
+        info(f"Fake RouterOS serving {len(self._secrets)} secrets, {len(self._sessions)} active sessions "
+             f"on {self.host}:{self.port}" + (f" (SSL {self.ssl_port})" if self.ssl_port is not None else ''),
+             "FakeRouterOS")
+
+    async def _stop_servers(self) -> None:
+        if self._churn_task:
+            self._churn_task.cancel()
+            self._churn_task = None
+        for server in self._servers:
+            server.close()
+        for connection in list(self._connections):
+            connection.writer.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        """
+        Get counters of what the server has served.
+
+        Returns:
+            dict: connections, logins, failed_logins, commands, injected failures
+                  and drops, plus per-command counts and current sizes
+        """
+        stats = dict(self._stats)
+        for key in ('connections', 'logins', 'failed_logins', 'commands', 'injected_failures', 'dropped'):
+            stats.setdefault(key, 0)
+        stats['by_command'] = dict(self._commands)
+        stats['open_connections'] = len(self._connections)
+        stats['secrets'] = len(self._secrets)
+        stats['active'] = len(self._sessions)
+        return stats
+
+    def reset_stats(self) -> None:
+        """Zero the served-request counters"""
+        self._stats = Counter()
+        self._commands = Counter()
+
+    # ------------------------------------------------------------------
+    # Session churn
+    # ------------------------------------------------------------------
+
+    def _enabled_offline(self) -> List[Dict]:
+        return [secret for secret in self._secrets
+                if secret['disabled'] == 'false' and secret['name'] not in self._sessions]
+
+    def _new_id(self) -> str:
+        self._next_id += 1
+        return f"*{self._next_id:X}"
+
+    def _connect(self, secret: Dict) -> _Session:
+        index = int(secret['.id'][1:], 16)
+        session = _Session(
+            secret, self._new_id(), self._new_id(),
+            caller_id=_mac(index),
+            address=secret['remote-address'] or _address(0x400000 + self._next_id),
+            rx_rate=self._random.uniform(1e3, 2e6), tx_rate=self._random.uniform(1e3, 2e5),
+            counter_start=self.counter_start,
+        )
+        self._sessions[secret['name']] = session
+        return session
+
+    def _disconnect(self, session: _Session) -> None:
+        del self._sessions[session.secret['name']]
+        session.secret['last-logged-out'] = _format_time(datetime.now())
+        session.secret['last-caller-id'] = session.caller_id
+        session.secret['last-disconnect-reason'] = 'peer-request'
+
+    def churn_once(self, count: int = 1) -> None:
+        """Disconnect count random sessions and connect as many offline accounts (call on the server loop)"""
+        for _ in range(count):
+            if self._sessions:
+                session = self._sessions[self._random.choice(list(self._sessions))]
+                self._disconnect(session)
+                self._notify('/ppp/active', {'.id': session.active_id, '.dead': 'true'})
+                self._notify('/interface', {'.id': session.interface_id, '.dead': 'true'})
+            offline = self._enabled_offline()
+            if offline:
+                session = self._connect(self._random.choice(offline))
+                self._notify('/ppp/active', session.active_row())
+                self._notify('/interface', session.interface_row())
+
+    async def _churn_loop(self) -> None:
+        pending = 0.0
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(CHURN_TICK)
+            now = time.monotonic()
+            pending += self.churn * (now - last)
+            last = now
+            if pending >= 1:
+                count = int(pending)
+                pending -= count
+                self.churn_once(count)
+
+    def _notify(self, path: str, row: Dict[str, str]) -> None:
+        for connection in self._connections:
+            for listener in connection.listeners.values():
+                if listener.path == path:
+                    connection.send([self._reply('!re', row, listener.proplist, listener.tag)])
+
+    # ------------------------------------------------------------------
+    # Protocol
+    # ------------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = _Connection(writer)
+        self._connections.append(connection)
+        self._stats['connections'] += 1
+        tasks = set()
+        try:
+            while True:
+                words = await read_sentence(reader)
+                # Tagged commands are answered concurrently, as the router does
+                task = asyncio.ensure_future(self._command(connection, words))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError, ssl.SSLError):
+            pass
+        except Exception as e:
+            error(f"Error serving connection: {e}", "FakeRouterOS")
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            self._connections.remove(connection)
+            writer.close()
+
+    @staticmethod
+    def _reply(reply_type: str, row: Optional[Dict[str, str]] = None, proplist: Optional[List[str]] = None,
+               tag: Optional[str] = None) -> List[str]:
+        words = [reply_type]
+        for key, value in (row or {}).items():
+            if proplist is None or key in proplist or key == '.dead':
+                words.append(f"={key}={value}")
+        if tag is not None:
+            words.append(f".tag={tag}")
+        return words
+
+    def _trap(self, message: str, tag: Optional[str], category: Optional[str] = None) -> List[List[str]]:
+        row = {'category': category, 'message': message} if category is not None else {'message': message}
+        return [self._reply('!trap', row, tag=tag), self._reply('!done', tag=tag)]
+
+    async def _command(self, connection: _Connection, words: List[str]) -> None:
+        command = words[0]
+        arguments = {}
+        queries = []
+        tag = None
+        for word in words[1:]:
+            if word.startswith('='):
+                key, _, value = word[1:].partition('=')
+                arguments[key] = value
+            elif word.startswith('?'):
+                queries.append(word[1:])
+            elif word.startswith('.tag='):
+                tag = word[5:]
+
+        self._stats['commands'] += 1
+        self._commands[command] += 1
+        delay = self.latency + (self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if command != '/login':
+            if self.drop_rate and self._random.random() < self.drop_rate:
+                self._stats['dropped'] += 1
+                connection.writer.close()
+                return
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                self._stats['injected_failures'] += 1
+                connection.send(self._trap('injected failure', tag))
+                return
+
+        if command == '/login':
+            connection.send(self._login(connection, arguments, tag))
+        elif not connection.logged_in:
+            connection.send(self._trap('not logged in', tag, '0'))
+        elif command == '/cancel':
+            connection.send(self._cancel(connection, arguments.get('tag'), tag))
+        elif command == '/quit':
+            connection.send([['!fatal', 'session terminated on request']])
+            connection.writer.close()
+        elif command.endswith('/listen'):
+            self._listen(connection, command[:-len('/listen')], arguments, tag)
+        else:
+            connection.send(self._serve(command, arguments, queries, tag))
+
+    def _login(self, connection: _Connection, arguments: Dict[str, str], tag: Optional[str]) -> List[List[str]]:
+        if 'password' in arguments:
+            valid = arguments.get('name') == self.username and arguments['password'] == self.password
+        elif 'response' in arguments and connection.challenge is not None:
+            digest = hashlib.md5(b'\x00' + self.password.encode() + connection.challenge).hexdigest()
+            valid = arguments.get('name') == self.username and arguments['response'] == '00' + digest
+        else:
+            # Pre-6.43 login: hand out a challenge
+            connection.challenge = os.urandom(16)
+            return [self._reply('!done', {'ret': connection.challenge.hex()}, tag=tag)]
+        if not valid:
+            self._stats['failed_logins'] += 1
+            return self._trap('invalid user name or password (6)', tag)
+        connection.logged_in = True
+        self._stats['logins'] += 1
+        return [self._reply('!done', tag=tag)]
+
+    def _cancel(self, connection: _Connection, target: Optional[str], tag: Optional[str]) -> List[List[str]]:
+        replies = []
+        listener = connection.listeners.pop(target, None)
+        if listener is not None:
+            replies.extend(self._trap('interrupted', listener.tag, '2'))
+        replies.append(self._reply('!done', tag=tag))
+        return replies
+
+    def _listen(self, connection: _Connection, path: str, arguments: Dict[str, str], tag: Optional[str]) -> None:
+        if path not in ('/ppp/active', '/interface', '/ppp/secret'):
+            connection.send(self._trap('no such command prefix', tag))
+            return
+        proplist = arguments['.proplist'].split(',') if arguments.get('.proplist') else None
+        connection.listeners[tag] = _Listener(connection, path, tag, proplist)
+
+    def _rows(self, path: str, arguments: Dict[str, str]) -> Optional[List[Dict[str, str]]]:
+        """Rows of a menu for print, or None if the menu does not exist"""
+        if path == '/ppp/secret':
+            return self._secrets
+        if path == '/ppp/active':
+            return [session.active_row() for session in self._sessions.values()]
+        if path == '/interface':
+            stats = 'stats' in arguments or 'stats-detail' in arguments
+            rows = []
+            for index, (name, kind) in enumerate(STATIC_INTERFACES, start=1):
+                row = {'.id': f"*{index:X}", 'name': name, 'type': kind, 'mtu': '1500',
+                       'mac-address': _mac(0xFF000000 + index), 'running': 'true', 'disabled': 'false'}
+                if stats:
+                    row.update({'rx-byte': '0', 'tx-byte': '0', 'rx-bits-per-second': '0', 'tx-bits-per-second': '0'})
+                rows.append(row)
+            rows.extend(session.interface_row(stats) for session in self._sessions.values())
+            return rows
+        if path == '/system/resource':
+            uptime = time.monotonic() - self._booted + 86400
+            return [{
+                'uptime': _format_duration(uptime),
+                'version': '7.15.3 (stable)',
+                'board-name': 'CHR',
+                'architecture-name': 'x86_64',
+                'cpu-count': '4',
+                'cpu-load': str(self._random.randint(1, 30)),
+                'free-memory': str(3 * 1024 ** 3),
+                'total-memory': str(4 * 1024 ** 3),
+                'free-hdd-space': str(800 * 1024 ** 2),
+                'total-hdd-space': str(1024 ** 3),
+            }]
+        if path == '/system/identity':
+            return [{'name': self.identity}]
+        if path == '/ip/dhcp-server/lease':
+            return self._leases
+        return None
+
+    @staticmethod
+    def _matches(row: Dict[str, str], queries: List[str]) -> bool:
+        """Apply query words; all of them must match ('?key=value', '?key', '?-key')"""
+        for query in queries:
+            if query.startswith('-'):
+                if query[1:] in row:
+                    return False
+            elif '=' in query:
+                key, _, value = query.partition('=')
+                if row.get(key, '') != value:
+                    return False
+            elif not query.startswith('#') and query not in row:
+                return False
+        return True
+
+    def _serve(self, command: str, arguments: Dict[str, str], queries: List[str],
+               tag: Optional[str]) -> List[List[str]]:
+        path, _, verb = command.rpartition('/')
+        if path == '/interface' and verb == 'monitor-traffic':
+            return self._monitor_traffic(arguments, tag)
+        if verb not in ('print', 'getall'):
+            return self._trap('no such command', tag)
+        rows = self._rows(path, arguments)
+        if rows is None:
+            return self._trap('no such command prefix', tag)
+        if queries:
+            rows = [row for row in rows if self._matches(row, queries)]
+        if 'count-only' in arguments:
+            return [self._reply('!done', {'ret': str(len(rows))}, tag=tag)]
+        proplist = arguments['.proplist'].split(',') if arguments.get('.proplist') else None
+        replies = [self._reply('!re', row, proplist, tag) for row in rows]
+        if not rows and self.empty_replies:
+            replies.append(self._reply('!empty', tag=tag))
+        replies.append(self._reply('!done', tag=tag))
+        return replies
+
+    def _monitor_traffic(self, arguments: Dict[str, str], tag: Optional[str]) -> List[List[str]]:
+        """monitor-traffic for the given interfaces; always answers as if 'once' was given"""
+        names = [name for name in arguments.get('interface', '').split(',') if name]
+        if not names:
+            return self._trap('interface not specified', tag)
+        sessions = {f"<pppoe-{session.secret['name']}>": session for session in self._sessions.values()}
+        replies = []
+        for name in names:
+            session = sessions.get(name)
+            if session is None and name not in dict(STATIC_INTERFACES):
+                return self._trap(f"no such item ({name})", tag)
+            rx_bps = int(session.rx_rate * 8) if session else 0
+            tx_bps = int(session.tx_rate * 8) if session else 0
+            replies.append(self._reply('!re', {
+                'name': name,
+                'rx-packets-per-second': str(rx_bps // 8000),
+                'rx-bits-per-second': str(rx_bps),
+                'tx-packets-per-second': str(tx_bps // 8000),
+                'tx-bits-per-second': str(tx_bps),
+            }, tag=tag))
+        replies.append(self._reply('!done', tag=tag))
+        return replies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Fake RouterOS API server for tests and benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8728)
+    parser.add_argument('--ssl-port', type=int, default=8729)
+    parser.add_argument('--no-ssl', action='store_true', help='Serve the plain API port only')
+    parser.add_argument('--certfile', help='Certificate for the SSL port (default: self-signed)')
+    parser.add_argument('--keyfile', help='Private key for --certfile')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--identity', default='FakeRouter')
+    parser.add_argument('--secrets', type=int, default=1000, help='Number of PPP secrets')
+    parser.add_argument('--active', type=int, default=400, help='Sessions connected at start')
+    parser.add_argument('--leases', type=int, default=20, help='Number of DHCP leases')
+    parser.add_argument('--churn', type=float, default=0.0, help='Sessions reconnecting per second')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every command')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='Random extra seconds per command')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of commands answered with !trap')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Share of commands that close the connection')
+    parser.add_argument('--counter-start', type=int, default=0, help='Initial byte counter of new sessions')
+    parser.add_argument('--empty-replies', action='store_true', help='Answer empty prints with !empty (RouterOS 7.18+)')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = FakeRouterOS(
+        host=args.host, port=args.port, ssl_port=None if args.no_ssl else args.ssl_port,
+        certfile=args.certfile, keyfile=args.keyfile, username=args.username, password=args.password,
+        identity=args.identity, secrets=args.secrets, active=args.active, leases=args.leases, churn=args.churn,
+        latency=args.latency, latency_jitter=args.latency_jitter, failure_rate=args.failure_rate,
+        drop_rate=args.drop_rate, counter_start=args.counter_start,
+        empty_replies=args.empty_replies, seed=args.seed)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Field projection of row lists (?fields= and socket subscriptions).
+Rows are cut down to the requested fields before serialization. A fields spec
+is a comma-separated list of field names for the endpoint's main list, or
+"<list>.<field>" for another list of the same response; "*" (or "<list>.*")
+keeps every field. Field names are RouterOS attribute names with ".id" as
+"id", checked against the fields known for each list. "id" is always kept so
+rows stay identifiable.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Fields rows of each kind of list can be projected to
+KNOWN_FIELDS = {
+    'ppp_secrets': (
+        'id', 'name', 'service', 'caller-id', 'password', 'profile', 'local-address', 'remote-address',
+        'remote-ipv6-prefix', 'routes', 'ipv6-routes', 'limit-bytes-in', 'limit-bytes-out',
+        'last-logged-out', 'last-caller-id', 'last-disconnect-reason', 'disabled', 'comment',
+    ),
+    'ppp_active': (
+        'id', 'name', 'service', 'caller-id', 'address', 'uptime', 'encoding', 'session-id',
+        'limit-bytes-in', 'limit-bytes-out', 'radius', 'comment',
+    ),
+    'interfaces': (
+        'id', 'name', 'default-name', 'type', 'mtu', 'actual-mtu', 'l2mtu', 'max-l2mtu', 'mac-address',
+        'last-link-up-time', 'last-link-down-time', 'link-downs', 'rx-byte', 'tx-byte', 'rx-packet',
+        'tx-packet', 'rx-drop', 'tx-drop', 'tx-queue-drop', 'rx-error', 'tx-error', 'fp-rx-byte',
+        'fp-tx-byte', 'fp-rx-packet', 'fp-tx-packet', 'running', 'disabled', 'dynamic', 'slave', 'comment',
+    ),
+    'pppoe_interfaces': (
+        'id', 'name', 'type', 'running', 'disabled', 'rx-byte', 'tx-byte', 'rx-bits-per-second',
+        'tx-bits-per-second', 'last-link-up-time', 'client-mac-address', 'mac-address',
+        'rx_bytes', 'tx_bytes', 'rx_rate', 'tx_rate', 'stats_unavailable',
+    ),
+}
+
+# Fields an API list is projected to when the request names none of its fields
+DEFAULT_FIELDS = {
+    'ppp_secrets': ('id', 'name', 'profile', 'disabled'),
+    'ppp_active': ('id', 'name', 'address', 'uptime'),
+    'interfaces': ('id', 'name', 'type', 'running', 'disabled'),
+    'pppoe_interfaces': ('id', 'name', 'running', 'rx_rate', 'tx_rate', 'stats_unavailable'),
+}
+
+ALL_FIELDS = '*'
+
+# Parsed projection: fields per response list, None for lists kept whole
+Projection = Dict[str, Optional[Tuple[str, ...]]]
+
+
+def parse_fields(spec: Union[str, Iterable[str], None], lists: Dict[str, str], primary: Optional[str] = None,
+                 defaults: bool = True) -> Projection:
+    """
+    Parse a fields spec.
+
+    Args:
+        spec: Comma-separated spec, a list of its items, or None/empty for the defaults
+        lists: Kind of list (a KNOWN_FIELDS key) of each list field of the response
+        primary: Response list that unqualified field names refer to, or None to require "<list>."
+        defaults: Whether lists the spec does not mention get DEFAULT_FIELDS (else they are kept whole)
+
+    Returns:
+        dict: Fields per response list in KNOWN_FIELDS order, None where every field is kept
+
+    Raises:
+        ValueError: For unknown lists or fields
+    """
+    items = spec.split(',') if isinstance(spec, str) else list(spec or [])
+    requested: Dict[str, set] = {}
+    for item in items:
+        if not isinstance(item, str):
+            raise ValueError("fields must be strings")
+        item = item.strip()
+        if not item:
+            continue
+        if item == ALL_FIELDS:
+            for name in lists:
+                requested[name] = None
+            continue
+        list_name, _, field = item.partition('.')
+        if not field or list_name not in lists:
+            list_name, field = primary, item
+            if primary is None:
+                raise ValueError(f"Field {item} must be given as <list>.<field>, with list one of "
+                                 f"{', '.join(lists)}")
+        if field == ALL_FIELDS:
+            requested[list_name] = None
+            continue
+        known = KNOWN_FIELDS[lists[list_name]]
+        if field not in known:
+            raise ValueError(f"Unknown field {field} for {list_name}; known fields: {', '.join(known)}")
+        if requested.get(list_name, ()) is not None:
+            requested.setdefault(list_name, set()).add(field)
+    projection: Projection = {}
+    for name, kind in lists.items():
+        if name in requested:
+            fields = requested[name]
+        else:
+            fields = set(DEFAULT_FIELDS[kind]) if defaults else None
+        projection[name] = (None if fields is None
+                            else tuple(field for field in KNOWN_FIELDS[kind] if field in fields or field == 'id'))
+    return projection
+
+
+def router_proplist(kind: str) -> List[str]:
+    """RouterOS .proplist that fetches every field known for a kind of list ("id" as ".id")"""
+    return ['.id' if field == 'id' else field for field in KNOWN_FIELDS[kind]]
+
+
+def projection_key(projection: Projection) -> str:
+    """Stable text form of a projection, for cache keys and room names ('' if nothing is projected)"""
+    return ';'.join(f"{name}={','.join(fields)}" for name, fields in projection.items() if fields is not None)
+
+
+def project_rows(rows: List[Dict], fields: Optional[Tuple[str, ...]]) -> List[Dict]:
+    """
+    Cut rows down to the given fields.
+
+    Args:
+        rows: Rows (not changed)
+        fields: Fields to keep, or None to return the rows as they are
+
+    Returns:
+        list: New rows with only the given fields (those a row has)
+    """
+    if fields is None:
+        return rows
+    return [{field: row[field] for field in fields if field in row} for row in rows]
+
+
+def project(data: Dict, projection: Projection) -> Dict:
+    """Copy of a response with its lists projected"""
+    if not any(fields is not None for fields in projection.values()):
+        return data
+    result = dict(data)
+    for name, fields in projection.items():
+        if isinstance(result.get(name), list):
+            result[name] = project_rows(result[name], fields)
+    return result
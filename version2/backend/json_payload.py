@@ -0,0 +1,232 @@
+"""
+JSON encoded once, served many times.
+API responses and socket messages built from a snapshot are the same for every
+reader of that snapshot version, so they are serialized into an EncodedJSON
+once (kept with RouterSnapshot.cached()) and their compressed variants are
+made on first request. Fields that differ per response, such as the current
+time, are appended to the serialized object with with_fields(); for gzip only
+the appended bytes are compressed per response. orjson is used when it is
+installed and the standard json module otherwise; brotli compression is
+available when the brotli module is installed.
+"""
+
+import gzip
+import hashlib
+import json
+import struct
+import threading
+import zlib
+from typing import Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content-Encoding values EncodedJSON can produce, in order of preference
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Bodies smaller than this many bytes are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+# Content-Encoding values with_fields() can produce without compressing the whole body again
+FIELDS_ENCODINGS = ('gzip',)
+
+# Header of a gzip member without file name or modification time
+_GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+
+
+def _default(value):
+    # numpy scalars and arrays from the columnar views
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """
+    Serialize a value to compact UTF-8 JSON.
+
+    Args:
+        value: JSON-compatible value; numpy scalars and arrays are converted
+
+    Returns:
+        bytes: The JSON document
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=_default,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers beyond 64 bits; the standard encoder handles those
+            pass
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=_default).encode('utf-8')
+
+
+def loads(document):
+    """Parse a JSON document (str or bytes)"""
+    if orjson is not None:
+        return orjson.loads(document)
+    return json.loads(document)
+
+
+class EncodedJSON:
+    """
+    A JSON value together with its serialized form.
+
+    Indexing reads the value (e.g. payload['seq']); body is the serialized
+    document. Compressed variants and the content hash are made on first use
+    and kept.
+    """
+
+    __slots__ = ('data', 'body', '_text', '_hash', '_variants', '_gzip_heads', '_lock')
+
+    def __init__(self, data):
+        """
+        Serialize a value.
+
+        Args:
+            data: JSON-compatible value; must not be changed afterwards
+        """
+        self.data = data
+        self.body = dumps(data)
+        self._text = None
+        self._hash = None
+        self._variants: Dict[str, bytes] = {}
+        self._gzip_heads: Dict[int, Tuple[bytes, int]] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __len__(self) -> int:
+        return len(self.body)
+
+    @property
+    def text(self) -> str:
+        """The serialized document as str, for text protocols"""
+        if self._text is None:
+            self._text = self.body.decode('utf-8')
+        return self._text
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        """
+        Strong entity tag of the document with a content encoding applied.
+
+        Derived from a hash of the body; each encoding has its own tag since
+        its bytes differ.
+
+        Args:
+            encoding: Content encoding, or None for the plain body
+
+        Returns:
+            str: Entity tag value (without quotes)
+        """
+        if self._hash is None:
+            self._hash = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+        if not encoding or encoding == 'identity':
+            return self._hash
+        return f"{self._hash}-{encoding}"
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        """
+        The document with a content encoding applied.
+
+        Args:
+            encoding: 'gzip', 'br' (if brotli is installed), or None for the plain body
+
+        Returns:
+            bytes: Encoded document
+        """
+        if not encoding or encoding == 'identity':
+            return self.body
+        with self._lock:
+            variant = self._variants.get(encoding)
+            if variant is None:
+                if encoding == 'gzip':
+                    variant = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+                elif encoding == 'br' and brotli is not None:
+                    variant = brotli.compress(self.body, quality=BROTLI_QUALITY)
+                else:
+                    raise ValueError(f"Unsupported content encoding: {encoding}")
+                self._variants[encoding] = variant
+            return variant
+
+    def with_fields(self, fields: Dict, encoding: Optional[str], within: Tuple[str, ...] = ()) -> bytes:
+        """
+        The document, a JSON object, with fields added at its end and a content encoding applied.
+
+        The document's own bytes are compressed once and kept; a gzip body is
+        that compressed prefix followed by the added fields compressed on
+        their own, so each call only compresses the added fields.
+
+        Args:
+            fields: Fields to add; must not be in the document already
+            encoding: One of FIELDS_ENCODINGS, or None for the plain body
+            within: Keys leading to a nested object to add the fields to instead;
+                each must be the last field of its parent
+
+        Returns:
+            bytes: Encoded document
+        """
+        added = dumps(fields)[1:-1]
+        if not added:
+            return self.encoded(encoding)
+        target = self.data
+        for key in within:
+            if not target or next(reversed(target)) != key:
+                raise ValueError(f"{key} is not the last field of its object")
+            target = target[key]
+        cut = len(self.body) - 1 - len(within)
+        head = self.body[:cut]
+        tail = (b',' + added if target else added) + self.body[cut:]
+        if not encoding or encoding == 'identity':
+            return head + tail
+        if encoding != 'gzip':
+            raise ValueError(f"Unsupported content encoding for added fields: {encoding}")
+        with self._lock:
+            prefix = self._gzip_heads.get(cut)
+            if prefix is None:
+                # A sync flush ends the deflate stream of the head on a byte boundary without
+                # a final block, so the separately compressed tail can follow it
+                compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+                prefix = (_GZIP_HEADER + compressor.compress(head) + compressor.flush(zlib.Z_SYNC_FLUSH),
+                          zlib.crc32(head))
+                self._gzip_heads[cut] = prefix
+        compressed_head, crc = prefix
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+        deflated = compressor.compress(tail) + compressor.flush()
+        trailer = struct.pack('<II', zlib.crc32(tail, crc), (len(head) + len(tail)) & 0xFFFFFFFF)
+        return compressed_head + deflated + trailer
+
+
+class SocketJSON:
+    """
+    json module for Socket.IO packets (SocketIO(json=SocketJSON)).
+
+    Event arguments that are EncodedJSON are spliced into the packet as they
+    are instead of being serialized again for every emit.
+    """
+
+    @staticmethod
+    def dumps(value, **kwargs) -> str:
+        if isinstance(value, list) and any(isinstance(item, EncodedJSON) for item in value):
+            parts = [item.text if isinstance(item, EncodedJSON) else dumps(item).decode('utf-8')
+                     for item in value]
+            return '[' + ','.join(parts) + ']'
+        return dumps(value).decode('utf-8')
+
+    @staticmethod
+    def loads(document, **kwargs):
+        return loads(document)
@@ -0,0 +1,183 @@
+"""
+Reverse lookup of IP and MAC addresses across all routers.
+A LookupIndex maps normalized addresses to the rows that carry them: active
+PPP sessions (address, and caller-id, which is the client MAC for PPPoE or its
+IP for other tunnels), PPPoE interfaces (client-mac-address) and DHCP leases
+(address, mac-address). Each router's part is brought up to date from its
+latest snapshot; only rows that changed are re-indexed.
+"""
+
+import ipaddress
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+IP = 'ip'
+MAC = 'mac'
+
+# Fields of each snapshot list that hold addresses; caller-id holds either kind
+INDEXED_FIELDS = {
+    'ppp_active': ('address', 'caller-id'),
+    'pppoe_interfaces': ('client-mac-address',),
+    'dhcp_leases': ('address', 'mac-address', 'active-address', 'active-mac-address'),
+}
+
+_MAC_SEPARATORS = re.compile(r'[:\-.\s]')
+_HEX_DIGITS = re.compile(r'[0-9A-F]{12}')
+
+# (kind, normalized address)
+_Key = Tuple[str, str]
+
+# (router ID, source list, row key)
+_RowId = Tuple[str, str, str]
+
+
+def normalize_ip(value: str) -> Optional[str]:
+    """Canonical form of an IPv4/IPv6 address, or None if value is not one"""
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except ValueError:
+        return None
+
+
+def normalize_mac(value: str) -> Optional[str]:
+    """MAC address as upper-case colon-separated hex (any of :, -, . or no separators accepted), or None"""
+    digits = _MAC_SEPARATORS.sub('', value).upper()
+    if not _HEX_DIGITS.fullmatch(digits):
+        return None
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def _row_keys(row: Dict, fields: Tuple[str, ...]) -> Tuple[_Key, ...]:
+    keys = []
+    for field in fields:
+        value = row.get(field)
+        if not value:
+            continue
+        value = str(value)
+        mac = normalize_mac(value)
+        if mac is not None:
+            keys.append((MAC, mac))
+            continue
+        ip = normalize_ip(value)
+        if ip is not None:
+            keys.append((IP, ip))
+    return tuple(dict.fromkeys(keys))
+
+
+class LookupIndex:
+    """
+    Hash indexes from IP and MAC addresses to rows of every router.
+
+    Thread-safe; sync() is called with the routers' latest snapshots before a
+    lookup and only re-indexes what changed since the previous call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._sources: Dict[Tuple[str, str], list] = {}
+        # (router ID, source list) -> row key -> (the row's address keys, the row)
+        self._rows: Dict[Tuple[str, str], Dict[str, Tuple[Tuple[_Key, ...], Dict]]] = {}
+        self._index: Dict[_Key, Dict[_RowId, Dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def sync(self, snapshots: Iterable) -> int:
+        """
+        Bring the index up to date with the latest snapshot of every router.
+
+        Routers whose snapshot version did not change are skipped, as are
+        lists and rows that are the same objects as before; routers missing
+        from snapshots are dropped.
+
+        Returns:
+            int: Number of rows whose addresses were (re-)indexed or removed
+        """
+        snapshots = {snapshot.router_id: snapshot for snapshot in snapshots}
+        changed = 0
+        with self._lock:
+            for router_id in self._versions.keys() - snapshots.keys():
+                changed += self._drop_router(router_id)
+            for router_id, snapshot in snapshots.items():
+                if self._versions.get(router_id) == snapshot.version:
+                    continue
+                for source, fields in INDEXED_FIELDS.items():
+                    rows = getattr(snapshot, source)
+                    if self._sources.get((router_id, source)) is rows:
+                        continue
+                    self._sources[(router_id, source)] = rows
+                    changed += self._sync_rows(router_id, source, rows, fields)
+                self._versions[router_id] = snapshot.version
+        return changed
+
+    def lookup(self, kind: str, address: str) -> List[Tuple[str, str, Dict]]:
+        """
+        Rows carrying an address.
+
+        Args:
+            kind: IP or MAC
+            address: Address normalized with normalize_ip() or normalize_mac()
+
+        Returns:
+            list: (router ID, source list, row) per match
+        """
+        with self._lock:
+            matches = self._index.get((kind, address), {})
+            return [(router_id, source, row) for (router_id, source, _), row in matches.items()]
+
+    def _sync_rows(self, router_id: str, source: str, rows: list, fields: Tuple[str, ...]) -> int:
+        indexed_rows = self._rows.setdefault((router_id, source), {})
+        seen = set()
+        changed = 0
+        for row in rows:
+            key = str(row.get('id', row.get('name')))
+            if key in seen:
+                continue
+            seen.add(key)
+            indexed = indexed_rows.get(key)
+            if indexed is not None and indexed[1] is row:
+                continue
+            row_id = (router_id, source, key)
+            keys = _row_keys(row, fields)
+            if indexed is not None and indexed[0] == keys:
+                # Same addresses: only point the index at the new row
+                indexed_rows[key] = (keys, row)
+                for address in keys:
+                    self._index[address][row_id] = row
+                continue
+            if indexed is not None:
+                self._remove_row(row_id)
+            self._add_row(row_id, keys, row)
+            changed += 1
+        gone = indexed_rows.keys() - seen
+        for key in gone:
+            self._remove_row((router_id, source, key))
+        return changed + len(gone)
+
+    def _drop_router(self, router_id: str) -> int:
+        del self._versions[router_id]
+        dropped = 0
+        for source in INDEXED_FIELDS:
+            self._sources.pop((router_id, source), None)
+            for key in list(self._rows.get((router_id, source), ())):
+                self._remove_row((router_id, source, key))
+                dropped += 1
+            self._rows.pop((router_id, source), None)
+        return dropped
+
+    def _add_row(self, row_id: _RowId, keys: Tuple[_Key, ...], row: Dict) -> None:
+        router_id, source, key = row_id
+        self._rows.setdefault((router_id, source), {})[key] = (keys, row)
+        for address in keys:
+            self._index.setdefault(address, {})[row_id] = row
+
+    def _remove_row(self, row_id: _RowId) -> None:
+        router_id, source, key = row_id
+        keys, _ = self._rows[(router_id, source)].pop(key)
+        for address in keys:
+            rows = self._index[address]
+            del rows[row_id]
+            if not rows:
+                del self._index[address]
@@ -1,10 +1,45 @@
 import routeros_api
 import ssl
 import socket
+import time
 import traceback
-from typing import Dict, List, Union, Optional
+from typing import Dict, Iterator, List, Tuple, Union, Optional
 from datetime import datetime
 import logger
+from field_projection import router_proplist
+
+# Columns requested with =.proplist= so that only what a consumer uses crosses the wire.
+# None means "all properties".
+PPPOE_INTERFACE_PROPLIST = [
+    '.id', 'name', 'type', 'running', 'disabled', 'rx-byte', 'tx-byte',
+    'rx-bits-per-second', 'tx-bits-per-second', 'last-link-up-time', 'client-mac-address'
+]
+
+# Interfaces per /interface/monitor-traffic call when stats have to be fetched that way
+MONITOR_TRAFFIC_CHUNK_SIZE = 50
+
+# Seconds a PPPoE stats refresh may spend on monitor-traffic fallbacks before
+# the remaining interfaces are reported without stats
+PPPOE_STATS_TIME_BUDGET = 3.0
+
+# Data sources collect() can fetch, named after the snapshot fields they fill
+DATA_SOURCES = ('identity', 'resources', 'interfaces', 'pppoe_interfaces', 'ppp_secrets', 'ppp_active', 'dhcp_leases')
+
+PPP_SECRET_PROPLISTS = {
+    'dashboard': ['.id', 'name', 'profile', 'disabled'],
+    'summary': ['.id', 'name', 'profile', 'service', 'disabled', 'last-logged-out', 'comment'],
+    # Everything snapshot consumers read: any field the API lists can be projected to,
+    # which covers the summary, dashboard, search and lookup
+    'snapshot': router_proplist('ppp_secrets'),
+    'full': None,
+}
+
+PPP_ACTIVE_PROPLISTS = {
+    'dashboard': ['.id', 'name', 'address', 'uptime', 'caller-id'],
+    'summary': ['.id', 'name'],
+    'snapshot': router_proplist('ppp_active'),
+    'full': None,
+}
 
 class MikroTikClient:
     """
@@ -51,7 +86,8 @@ class MikroTikClient:
                     'username': self.user,
                     'password': self.password,
                     'port': self.port,
-                    'ssl_wrapper': ssl_context.wrap_socket,
+                    'use_ssl': True,
+                    'ssl_context': ssl_context,
                     'plaintext_login': True
                 }
             else:
@@ -103,6 +139,32 @@ class MikroTikClient:
             self.api.disconnect()
             self.connected = False
     
+    def is_alive(self) -> bool:
+        """
+        Cheap liveness check of the open connection.
+        
+        Returns:
+            bool: True if the router answered, False otherwise
+        """
+        if not self.connected:
+            return False
+        try:
+            self.connection.get_resource('/system/identity').get()
+            return True
+        except Exception:
+            self.connected = False
+            return False
+    
+    def _handle_exception(self, e: Exception) -> None:
+        """
+        Mark the client as disconnected if the exception means the socket is unusable,
+        so that a connection pool discards it instead of reusing it.
+        """
+        if isinstance(e, (routeros_api.exceptions.RouterOsApiConnectionError,
+                          routeros_api.exceptions.FatalRouterOsApiError,
+                          socket.error)):
+            self.connected = False
+    
     def get_system_resources(self) -> Optional[Dict]:
         """
         Get system resources (CPU, memory, etc.).
@@ -117,6 +179,7 @@ class MikroTikClient:
             resource_list = self.connection.get_resource('/system/resource')
             return resource_list[0] if resource_list else None
         except Exception as e:
+            self._handle_exception(e)
             self.error_message = str(e)
             return None
     
@@ -143,6 +206,7 @@ class MikroTikClient:
             identity = self.connection.get_resource('/system/identity')
             return identity[0].get('name') if identity else None
         except Exception as e:
+            self._handle_exception(e)
             self.error_message = str(e)
             return None
     
@@ -184,6 +248,7 @@ class MikroTikClient:
             error_msg = f"Error getting interfaces: {str(e)}"
             logger.error(error_msg, "MikroTikClient.get_interfaces")
 
+            self._handle_exception(e)
             self.error_message = error_msg
             return None
     
@@ -208,6 +273,7 @@ class MikroTikClient:
                 return self.connection.get_resource('/interface/monitor-traffic', 
                                                  {'once': ''})
         except Exception as e:
+            self._handle_exception(e)
             self.error_message = str(e)
             return None
     
@@ -226,6 +292,7 @@ class MikroTikClient:
             resource = self.connection.get_resource('/ip/hotspot/active')
             return list(resource) if resource else []
         except Exception as e:
+            self._handle_exception(e)
             self.error_message = str(e)
             return None
     
@@ -249,16 +316,20 @@ class MikroTikClient:
             return None
             
         try:
-            # Convert resource to a list before returning
             resource = self.connection.get_resource('/ip/dhcp-server/lease')
-            return list(resource) if resource else []
+            return resource.get() if resource else []
         except Exception as e:
+            self._handle_exception(e)
             self.error_message = str(e)
             return None
     
-    def get_ppp_secrets(self) -> Optional[List[Dict]]:
+    def get_ppp_secrets(self, proplist: Optional[List[str]] = None) -> Optional[List[Dict]]:
         """
         Get PPP secrets (accounts).
+        
+        Args:
+            proplist: Properties to fetch (see PPP_SECRET_PROPLISTS), or None for all
+            
         Returns:
             list: List of PPP secrets or empty list if none found
         """
@@ -271,7 +342,7 @@ class MikroTikClient:
             if resource is None:
     
                 return []
-            raw_secrets = resource.get()
+            raw_secrets = resource.call('print', self._proplist_arguments(proplist))
             secrets = list(raw_secrets)
 
             return secrets
@@ -280,13 +351,17 @@ class MikroTikClient:
             logger.error(error_msg, "MikroTikClient.get_ppp_secrets")
             import traceback
 
+            self._handle_exception(e)
             self.error_message = error_msg
             return []
     
-    def get_active_ppp_connections(self) -> Optional[List[Dict]]:
+    def get_active_ppp_connections(self, proplist: Optional[List[str]] = None) -> Optional[List[Dict]]:
         """
         Get active PPP connections.
         
+        Args:
+            proplist: Properties to fetch (see PPP_ACTIVE_PROPLISTS), or None for all
+            
         Returns:
             list: List of active PPP connections or empty list if none found
         """
@@ -299,7 +374,7 @@ class MikroTikClient:
             if resource is None:
     
                 return []
-            connections = list(resource.get())
+            connections = list(resource.call('print', self._proplist_arguments(proplist)))
 
             return connections
         except Exception as e:
@@ -307,22 +382,100 @@ class MikroTikClient:
             logger.error(error_msg, "MikroTikClient.get_active_ppp_connections")
             import traceback
 
+            self._handle_exception(e)
             self.error_message = error_msg
             return []
     
-    def get_ppp_active(self) -> Optional[List[Dict]]:
+    def get_ppp_active(self, proplist: Optional[List[str]] = None) -> Optional[List[Dict]]:
         """
         Get active PPP connections - alias for get_active_ppp_connections.
         
         Returns:
             list: List of active PPP connections or None if failed
         """
-        return self.get_active_ppp_connections()
+        return self.get_active_ppp_connections(proplist)
+    
+    @staticmethod
+    def _proplist_arguments(proplist: Optional[List[str]]) -> Dict:
+        """Build print arguments restricting the reply to the given properties"""
+        return {'.proplist': ','.join(proplist)} if proplist else {}
     
-    def get_pppoe_interfaces_with_stats(self) -> Optional[List[Dict]]:
+    def batch(self, commands: List[Union[str, Dict]]) -> Optional[List[Optional[List[Dict]]]]:
+        """
+        Run several commands pipelined over the same connection.
+        
+        All commands are sent at once, each with its own .tag, and the replies
+        are demultiplexed afterwards, so the whole batch costs one round-trip
+        instead of one per command.
+        
+        Args:
+            commands: Commands as strings such as '/ppp/active/print' or
+                      '/interface/print stats ?type=pppoe-in', or as dicts with
+                      'path', 'command' and optional 'arguments'/'queries'
+            
+        Returns:
+            list: One list of rows per command (None for a command that failed),
+                  or None if the batch could not be sent
+        """
+        if not self.connected:
+            logger.error("batch: Not connected to router", "MikroTikClient.batch")
+            return None
+        
+        try:
+            promises = []
+            for cmd in commands:
+                path, command, arguments, queries = self._parse_batch_command(cmd)
+                resource = self.connection.get_resource(path)
+                promises.append(resource.call_async(command, arguments=arguments, queries=queries))
+        except Exception as e:
+            error_msg = f"Error sending command batch: {str(e)}"
+            logger.error(error_msg, "MikroTikClient.batch")
+            self._handle_exception(e)
+            self.error_message = error_msg
+            return None
+        
+        results = []
+        for cmd, promise in zip(commands, promises):
+            try:
+                results.append(list(promise.get()))
+            except Exception as e:
+                error_msg = f"Error running {cmd}: {str(e)}"
+                logger.error(error_msg, "MikroTikClient.batch")
+                self._handle_exception(e)
+                self.error_message = error_msg
+                results.append(None)
+        return results
+    
+    @staticmethod
+    def _parse_batch_command(cmd: Union[str, Dict]):
+        """
+        Split a batch command into (path, command, arguments, queries).
+        
+        String form: '<path>/<command> [flag] [key=value] [?key=value] ...'
+        """
+        if isinstance(cmd, dict):
+            return cmd['path'], cmd.get('command', 'print'), cmd.get('arguments') or {}, cmd.get('queries') or {}
+        
+        tokens = cmd.split()
+        path, _, command = tokens[0].rstrip('/').rpartition('/')
+        arguments = {}
+        queries = {}
+        for token in tokens[1:]:
+            if token.startswith('?'):
+                key, _, value = token[1:].partition('=')
+                queries[key] = value
+            else:
+                key, _, value = token.lstrip('=').partition('=')
+                arguments[key] = value
+        return path or '/', command, arguments, queries
+    
+    def get_pppoe_interfaces_with_stats(self, time_budget: float = PPPOE_STATS_TIME_BUDGET) -> Optional[List[Dict]]:
         """
         Get PPPoE-in interfaces with their traffic statistics.
         
+        Args:
+            time_budget: Seconds the refresh may take before fallbacks are skipped
+            
         Returns:
             list: List of PPPoE-in interfaces with traffic stats or None if failed
         """
@@ -331,103 +484,232 @@ class MikroTikClient:
             return None
             
         try:
-    
-            # Get all interfaces first
-            interfaces_resource = self.connection.get_resource('/interface')
-            if interfaces_resource is None:
+            deadline = time.monotonic() + time_budget
+            replies = self.batch([self._pppoe_stats_command()])
+            if replies is None or replies[0] is None:
                 return None
-            all_interfaces = list(interfaces_resource.get())
-            
-            # Filter for PPPoE-in interfaces
-            pppoe_interfaces = [iface for iface in all_interfaces if iface.get('type') == 'pppoe-in']
-
+            return self._apply_pppoe_stats(replies[0], deadline)
             
-            # Get the interface statistics from the /interface/print stats command
-            # This is a more reliable way to get interface statistics than monitor-traffic
-            try:
-                # Get detailed interface statistics including bytes
-                api_path = '/interface/print'
-                params = {
-                    'stats': '',  # This flag is important to get statistics
-                }
-                interface_stats_cmd = self.connection.path(api_path)
-                interface_stats_result = interface_stats_cmd(**params)
-                
+        except Exception as e:
+            error_msg = f"Error getting PPPoE-in interfaces: {str(e)}"
+            logger.error(error_msg, "MikroTikClient.get_pppoe_interfaces_with_stats")
+            self._handle_exception(e)
+            self.error_message = error_msg
+            return None
     
-                
-                # Create a mapping of interface name to stats
-                interface_stats_map = {}
-                for stat in interface_stats_result:
-                    interface_stats_map[stat.get('name')] = stat
-                    
+    @staticmethod
+    def _pppoe_stats_command() -> Dict:
+        """
+        Build '/interface/print stats ?type=pppoe-in =.proplist=...'.
+        
+        The router filters to PPPoE-in interfaces and returns only the columns
+        we use, statistics included, in a single command.
+        """
+        return {
+            'path': '/interface',
+            'command': 'print',
+            'arguments': {'stats': '', '.proplist': ','.join(PPPOE_INTERFACE_PROPLIST)},
+            'queries': {'type': 'pppoe-in'}
+        }
     
-            except Exception as e:
-                logger.error(f"Error getting interface statistics: {str(e)}", "MikroTikClient.get_pppoe_interfaces_with_stats")
-                interface_stats_map = {}
+    def _apply_pppoe_stats(self, pppoe_interfaces: List[Dict], deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Attach rx/tx bytes and rates to PPPoE-in interfaces from their stats columns.
+        
+        Interfaces that came back without stats are looked up with batched
+        monitor-traffic calls until the deadline; any left over are marked
+        with 'stats_unavailable'.
+        
+        Args:
+            pppoe_interfaces: Rows from the command built by _pppoe_stats_command()
+            deadline: time.monotonic() value after which no fallback calls are made
             
-            # Enhance with traffic statistics
-            result = []
-            for iface in pppoe_interfaces:
-                interface_name = iface.get('name')
-
+        Returns:
+            list: PPPoE-in interfaces with rx/tx bytes and rates
+        """
+        result = []
+        missing = {}
+        for iface in pppoe_interfaces:
+            # The router already filtered on type; keep the check for routers that ignore the query
+            if iface.get('type', 'pppoe-in') != 'pppoe-in':
+                continue
+            
+            # Default to zero for stats
+            iface['rx_bytes'] = '0'
+            iface['tx_bytes'] = '0'
+            iface['rx_rate'] = '0'
+            iface['tx_rate'] = '0'
+            
+            if 'rx-byte' in iface or 'tx-byte' in iface:
+                # Get total bytes
+                iface['rx_bytes'] = iface.get('rx-byte', '0')
+                iface['tx_bytes'] = iface.get('tx-byte', '0')
                 
-                # Default to zero for stats
-                iface['rx_bytes'] = '0'
-                iface['tx_bytes'] = '0'
-                iface['rx_rate'] = '0'
-                iface['tx_rate'] = '0'
+                # Get current rates
+                iface['rx_rate'] = iface.get('rx-bits-per-second', '0')
+                iface['tx_rate'] = iface.get('tx-bits-per-second', '0')
                 
-                # Try to get stats from the stats map
-                if interface_name in interface_stats_map:
-                    stats = interface_stats_map[interface_name]
-
-                    
-                    # Get total bytes
+                # Use the exact same field names as expected in the template
+                if 'client-mac-address' in iface:
+                    iface['mac-address'] = iface.get('client-mac-address')
+            elif iface.get('name'):
+                missing[iface['name']] = iface
+            
+            result.append(iface)
+        
+        if missing:
+            self._apply_monitor_traffic(missing, deadline)
+        
+        return result
+    
+    def _apply_monitor_traffic(self, interfaces: Dict[str, Dict], deadline: Optional[float]) -> None:
+        """
+        Fetch stats for interfaces missing from the stats print with
+        '/interface/monitor-traffic interface=a,b,c once', in chunks of
+        MONITOR_TRAFFIC_CHUNK_SIZE, stopping when the deadline is reached.
+        
+        Args:
+            interfaces: Interface rows keyed by name, updated in place
+            deadline: time.monotonic() value after which no more calls are made
+        """
+        names = list(interfaces)
+        done = 0
+        try:
+            for start in range(0, len(names), MONITOR_TRAFFIC_CHUNK_SIZE):
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                if remaining is not None and self.api:
+                    # Bound a single slow call by what is left of the budget
+                    self.api.set_timeout(remaining)
+                chunk = names[start:start + MONITOR_TRAFFIC_CHUNK_SIZE]
+                traffic_resource = self.connection.get_resource('/interface')
+                traffic_stats = traffic_resource.call('monitor-traffic', {'interface': ','.join(chunk), 'once': ''})
+                for stats in traffic_stats:
+                    iface = interfaces.get(stats.get('name'))
+                    if iface is None:
+                        continue
+                    # Add traffic stats to the interface data
                     iface['rx_bytes'] = stats.get('rx-byte', '0')
                     iface['tx_bytes'] = stats.get('tx-byte', '0')
-                    
-                    # Get current rates
                     iface['rx_rate'] = stats.get('rx-bits-per-second', '0')
                     iface['tx_rate'] = stats.get('tx-bits-per-second', '0')
-                    
-                    # Ensure important fields are preserved from original interface data
-                    # Use the exact same field names as expected in the template
-                    if 'client-mac-address' in stats:
-                        iface['mac-address'] = stats.get('client-mac-address')
-                    if 'last-link-up-time' in stats:
-                        iface['last-link-up-time'] = stats.get('last-link-up-time')
-                    
-                    
-                    
-                else:
-                    # If interface isn't in the stats map, try to get stats directly
-                    # using the monitor-traffic command as fallback
-                    try:
+                done = start + len(chunk)
+        except Exception as e:
+            self._handle_exception(e)
+            logger.error(f"Error getting monitor-traffic stats: {str(e)}",
+                         "MikroTikClient.get_pppoe_interfaces_with_stats")
+        finally:
+            if self.api and self.connected:
+                self.api.set_timeout(routeros_api.RouterOsApiPool.socket_timeout)
+        
+        if done < len(names):
+            logger.warning(f"Stats unavailable for {len(names) - done} PPPoE interface(s): refresh time budget exhausted",
+                           "MikroTikClient.get_pppoe_interfaces_with_stats")
+            for name in names[done:]:
+                interfaces[name]['stats_unavailable'] = True
     
-                        traffic_resource = self.connection.path('/interface/monitor-traffic')
-                        traffic_stats = traffic_resource('once', {'interface': interface_name})
-                        
-                        if traffic_stats and len(traffic_stats) > 0:
-                            # Add traffic stats to the interface data
-                            iface['rx_bytes'] = traffic_stats[0].get('rx-byte', '0')
-                            iface['tx_bytes'] = traffic_stats[0].get('tx-byte', '0')
-                            iface['rx_rate'] = traffic_stats[0].get('rx-bits-per-second', '0')
-                            iface['tx_rate'] = traffic_stats[0].get('tx-bits-per-second', '0')
-                            
-                            
-                    except Exception as e:
-                        logger.error(f"Error getting monitor-traffic stats for {interface_name}: {str(e)}", 
-                                    "MikroTikClient.get_pppoe_interfaces_with_stats")
-                
-                result.append(iface)
+    def collect(self, sources: List[str], secret_proplist: Optional[List[str]] = None,
+                active_proplist: Optional[List[str]] = None,
+                time_budget: float = PPPOE_STATS_TIME_BUDGET) -> Optional[Dict]:
+        """
+        Fetch several data sources in a single pipelined round-trip.
+        
+        Args:
+            sources: Names from DATA_SOURCES to fetch
+            secret_proplist: Properties to fetch for PPP secrets, or None for all
+            active_proplist: Properties to fetch for active PPP connections, or None for all
+            time_budget: Seconds the refresh may take before PPPoE stats fallbacks are skipped
+            
+        Returns:
+            dict: Result per requested source (None for a source whose command failed),
+                  or None if the batch could not be run
+        """
+        deadline = time.monotonic() + time_budget
+        commands = {
+            'identity': '/system/identity/print',
+            'resources': '/system/resource/print',
+            'interfaces': '/interface/print',
+            'pppoe_interfaces': self._pppoe_stats_command(),
+            'ppp_secrets': {'path': '/ppp/secret', 'arguments': self._proplist_arguments(secret_proplist)},
+            'ppp_active': {'path': '/ppp/active', 'arguments': self._proplist_arguments(active_proplist)},
+            'dhcp_leases': '/ip/dhcp-server/lease/print',
+        }
+        sources = [source for source in DATA_SOURCES if source in sources]
+        replies = self.batch([commands[source] for source in sources])
+        if replies is None:
+            return None
+        
+        result = {}
+        for source, rows in zip(sources, replies):
+            if rows is None:
+                result[source] = None
+            elif source == 'identity':
+                result[source] = rows[0].get('name') if rows else None
+            elif source == 'resources':
+                result[source] = rows[0] if rows else None
+            elif source == 'pppoe_interfaces':
+                result[source] = self._apply_pppoe_stats(rows, deadline)
+            else:
+                result[source] = rows
+        return result
+    
+    def get_dashboard_batch(self, secret_proplist: Optional[List[str]] = PPP_SECRET_PROPLISTS['dashboard'],
+                            active_proplist: Optional[List[str]] = PPP_ACTIVE_PROPLISTS['dashboard'],
+                            time_budget: float = PPPOE_STATS_TIME_BUDGET) -> Optional[Dict]:
+        """
+        Get everything the dashboard needs in a single pipelined round-trip.
+        
+        Args:
+            secret_proplist: Properties to fetch for PPP secrets, or None for all
+            active_proplist: Properties to fetch for active PPP connections, or None for all
+            time_budget: Seconds the refresh may take before PPPoE stats fallbacks are skipped
             
-            return result
+        Returns:
+            dict: {'pppoe_interfaces', 'ppp_secrets', 'ppp_active'} or None if failed
+        """
+        result = self.collect(['pppoe_interfaces', 'ppp_secrets', 'ppp_active'],
+                              secret_proplist, active_proplist, time_budget)
+        if result is None:
+            return None
+        result['ppp_secrets'] = result['ppp_secrets'] or []
+        result['ppp_active'] = result['ppp_active'] or []
+        return result
+    
+    def listen(self, path: str, proplist: Optional[List[str]] = None,
+               timeout: Optional[float] = None) -> Optional[Tuple[List[Dict], Iterator[Dict]]]:
+        """
+        Start streaming change notifications for a menu with its 'listen' command.
+        
+        The listen command is sent before the initial print, so no change made
+        between the two is missed. Notifications are rows with the item's current
+        properties; rows for removed items carry '.dead'. Replies are buffered per
+        command by routeros_api until the connection is closed, so a listening
+        client should be dedicated to that purpose and reconnected periodically.
+        
+        Args:
+            path: Menu path, e.g. '/ppp/active'
+            proplist: Properties to include in rows and notifications, or None for all
+            timeout: Seconds the notification iterator may wait for data before
+                     raising, or None to keep the default socket timeout
             
+        Returns:
+            tuple: (current rows, iterator of notifications) or None if failed
+        """
+        if not self.connected:
+            logger.error("listen: Not connected to router", "MikroTikClient.listen")
+            return None
+        try:
+            resource = self.connection.get_resource(path)
+            notifications = resource.call_async('listen', self._proplist_arguments(proplist))
+            rows = list(resource.call('print', self._proplist_arguments(proplist)))
+            if timeout is not None:
+                self.api.set_timeout(timeout)
+            return rows, iter(notifications)
         except Exception as e:
-            error_msg = f"Error getting PPPoE-in interfaces: {str(e)}"
-            logger.error(error_msg, "MikroTikClient.get_pppoe_interfaces_with_stats")
-            import traceback
-
+            error_msg = f"Error listening on {path}: {str(e)}"
+            logger.error(error_msg, "MikroTikClient.listen")
+            self._handle_exception(e)
             self.error_message = error_msg
             return None
     
@@ -464,7 +746,7 @@ class MikroTikClient:
             }
             
             # Get PPP secrets (accounts)
-            ppp_secrets = self.get_ppp_secrets()
+            ppp_secrets = self.get_ppp_secrets(['.id', 'disabled'])
             if ppp_secrets:
                 stats['total_accounts'] = len(ppp_secrets)
                 # Count enabled/disabled accounts
@@ -472,7 +754,7 @@ class MikroTikClient:
                 stats['disabled_accounts'] = stats['total_accounts'] - stats['enabled_accounts']
             
             # Get active PPP connections
-            active_ppp = self.get_active_ppp_connections()
+            active_ppp = self.get_active_ppp_connections(['.id'])
             if active_ppp:
                 stats['online_accounts'] = len(active_ppp)
             
@@ -519,11 +801,16 @@ class MikroTikClient:
 
     def test_connection(self) -> bool:
         """
-        Test connection to the MikroTik router without maintaining a persistent connection.
+        Test connection to the MikroTik router.
+        
+        An already open connection is probed in place; otherwise a temporary
+        connection is opened and closed again.
         
         Returns:
             bool: True if connection test was successful, False otherwise
         """
+        if self.connected:
+            return self.is_alive()
         try:
     
             if self.use_ssl:
@@ -536,7 +823,8 @@ class MikroTikClient:
                     'username': self.user,
                     'password': self.password,
                     'port': self.port,
-                    'ssl_wrapper': ssl_context.wrap_socket,
+                    'use_ssl': True,
+                    'ssl_context': ssl_context,
                     'plaintext_login': True
                 }
             else:
@@ -0,0 +1,175 @@
+"""
+Session throughput from byte counters.
+RouterOS often reports rx/tx-bits-per-second as missing or zero for pppoe-in
+interfaces, so rates are derived here from successive rx-byte/tx-byte samples
+of each session and the time between them.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Counters wrap at 2^64
+COUNTER_MODULUS = 1 << 64
+
+# A counter that went backwards from within this distance of 2^64 is treated
+# as a wraparound; any other decrease means the counter was reset (reconnect)
+WRAP_WINDOW = 1 << 62
+
+# Default EWMA weight of the newest sample; 1.0 disables smoothing
+DEFAULT_RATE_SMOOTHING = 1.0
+
+# Samples closer together than this many seconds are not used for a rate
+MIN_SAMPLE_INTERVAL = 0.5
+
+# Samples further apart than this (e.g. after polling was suspended) start over
+# instead of reporting the average over the whole gap
+MAX_SAMPLE_INTERVAL = 60
+
+
+def counter_delta(previous: int, current: int) -> Optional[int]:
+    """
+    Bytes counted between two samples of a 64-bit counter.
+
+    Args:
+        previous: Earlier counter value
+        current: Later counter value
+
+    Returns:
+        int: Bytes in between, or None if the counter was reset
+    """
+    if current >= previous:
+        return current - previous
+    if previous >= COUNTER_MODULUS - WRAP_WINDOW and current < WRAP_WINDOW:
+        return current + COUNTER_MODULUS - previous
+    return None
+
+
+def get_rate_smoothing(router: Dict) -> float:
+    """
+    Get a router's EWMA weight for new rate samples.
+
+    Args:
+        router: Router configuration; its optional "rate_smoothing" (0 < value <= 1) overrides the default
+
+    Returns:
+        float: Weight of the newest sample
+    """
+    value = router.get('rate_smoothing', DEFAULT_RATE_SMOOTHING)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RATE_SMOOTHING
+    return value if 0 < value <= 1 else DEFAULT_RATE_SMOOTHING
+
+
+def _to_int(value) -> Optional[int]:
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _Sample:
+    __slots__ = ('interface_id', 'at', 'rx_bytes', 'tx_bytes', 'rx_rate', 'tx_rate')
+
+    def __init__(self, interface_id, at, rx_bytes, tx_bytes):
+        self.interface_id = interface_id
+        self.at = at
+        self.rx_bytes = rx_bytes
+        self.tx_bytes = tx_bytes
+        self.rx_rate = None
+        self.tx_rate = None
+
+
+class RateEngine:
+    """
+    Per-router rate state: the last counter sample of every session.
+
+    Sessions are keyed by interface name. A new interface .id under the same
+    name, or a counter that went backwards without wrapping, marks a
+    reconnect; the session then starts over from the new sample.
+    """
+
+    def __init__(self, smoothing: float = DEFAULT_RATE_SMOOTHING):
+        """
+        Initialize the engine.
+
+        Args:
+            smoothing: EWMA weight of the newest sample (1.0 = no smoothing)
+        """
+        self.smoothing = smoothing
+        self._samples: Dict[str, _Sample] = {}
+        self._lock = threading.Lock()
+
+    def apply(self, interfaces: List[Dict], at: Optional[float] = None) -> List[Dict]:
+        """
+        Sample the counters of a stats poll and attach rates in bits per second.
+
+        Rows are not changed; rows that get a rate are copied. Sessions seen for
+        the first time keep the rates the router reported, if any.
+
+        Args:
+            interfaces: pppoe-in interfaces with rx-byte/tx-byte counters
+            at: time.monotonic() value when the counters were read (default: now)
+
+        Returns:
+            list: The interfaces with rx_rate and tx_rate set
+        """
+        at = time.monotonic() if at is None else at
+        result = []
+        seen = set()
+        with self._lock:
+            for iface in interfaces:
+                name = iface.get('name')
+                # Only counters read from the stats print are used; rows filled in
+                # by monitor-traffic carry the router's own rates instead
+                rx_bytes = _to_int(iface.get('rx-byte'))
+                tx_bytes = _to_int(iface.get('tx-byte'))
+                if not name or rx_bytes is None or tx_bytes is None:
+                    result.append(iface)
+                    continue
+                seen.add(name)
+                rates = self._sample(name, iface.get('id'), at, rx_bytes, tx_bytes)
+                if rates is None:
+                    result.append(iface)
+                    continue
+                row = dict(iface)
+                row['rx_rate'], row['tx_rate'] = str(round(rates[0])), str(round(rates[1]))
+                result.append(row)
+            # Sessions that disconnected start over if they come back
+            for name in self._samples.keys() - seen:
+                del self._samples[name]
+        return result
+
+    def _sample(self, name: str, interface_id, at: float,
+                rx_bytes: int, tx_bytes: int) -> Optional[Tuple[float, float]]:
+        """Record one sample and return the session's (rx, tx) rate, or None if there is none yet"""
+        previous = self._samples.get(name)
+        if previous is None or previous.interface_id != interface_id or at - previous.at > MAX_SAMPLE_INTERVAL:
+            self._samples[name] = _Sample(interface_id, at, rx_bytes, tx_bytes)
+            return None
+        elapsed = at - previous.at
+        if elapsed < MIN_SAMPLE_INTERVAL:
+            # Too close to the last sample for a meaningful rate; keep the old one
+            return (previous.rx_rate, previous.tx_rate) if previous.rx_rate is not None else None
+        rx_delta = counter_delta(previous.rx_bytes, rx_bytes)
+        tx_delta = counter_delta(previous.tx_bytes, tx_bytes)
+        sample = _Sample(interface_id, at, rx_bytes, tx_bytes)
+        self._samples[name] = sample
+        if rx_delta is None or tx_delta is None:
+            # Counters reset: the session reconnected between polls
+            return None
+        rx_rate = rx_delta * 8 / elapsed
+        tx_rate = tx_delta * 8 / elapsed
+        if previous.rx_rate is not None and self.smoothing < 1:
+            rx_rate = self.smoothing * rx_rate + (1 - self.smoothing) * previous.rx_rate
+            tx_rate = self.smoothing * tx_rate + (1 - self.smoothing) * previous.tx_rate
+        sample.rx_rate, sample.tx_rate = rx_rate, tx_rate
+        return rx_rate, tx_rate
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
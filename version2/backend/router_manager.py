@@ -1,10 +1,23 @@
 import json
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from mikrotik_client import MikroTikClient
+from connection_pool import RouterConnectionPool
+from single_flight import SingleFlight
+from circuit_breaker import CircuitBreaker
+from session_columns import member_name
 from logger import log, info, error, warning, debug
 
+# Seconds between sweeps that close idle pooled connections
+POOL_REAP_INTERVAL = 30
+
+# Seconds between checks for routers whose open circuit breaker is due a probe
+BREAKER_PROBE_INTERVAL = 1
+
 class RouterManager:
     """
     Manages multiple MikroTik router configurations and connections.
@@ -14,7 +27,15 @@ class RouterManager:
         self.routers_file = 'data/routers.json'
         self.routers = {}
         self.active_router_id = None
+        self.pools: Dict[str, RouterConnectionPool] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._pools_lock = threading.Lock()
+        # Per router: ((mtime_ns, size) of the groups file, {account name: [{id, name}]})
+        self._account_groups: Dict[str, Tuple[Tuple[int, int], Dict[str, List[Dict]]]] = {}
+        self.single_flight = SingleFlight()
         self.load_routers()
+        threading.Thread(target=self._pool_reaper_loop, daemon=True).start()
+        threading.Thread(target=self._breaker_probe_loop, daemon=True).start()
     
     def load_routers(self) -> None:
         """Load router configurations from file"""
@@ -112,7 +133,8 @@ class RouterManager:
                 return False
 
             # Only update fields that are present and not None/empty
-            for key in ['name', 'description', 'host', 'port', 'username', 'use_ssl']:
+            for key in ['name', 'description', 'host', 'port', 'username', 'use_ssl', 'enabled', 'poll_intervals',
+                        'listen', 'rate_smoothing']:
                 if key in router_data and router_data[key] not in [None, '']:
                     self.routers[router_id][key] = router_data[key]
             # Special handling for password: only update if provided and not empty
@@ -121,6 +143,8 @@ class RouterManager:
 
             self.routers[router_id]['updated_at'] = datetime.now().isoformat()
             self.save_routers()
+            # Drop pooled connections so new ones pick up the changed settings
+            self.close_pool(router_id)
 
             info(f"Updated router: {router_id}")
             return True
@@ -138,6 +162,8 @@ class RouterManager:
             # Remove router from configuration
             del self.routers[router_id]
             self.save_routers()
+            self.close_pool(router_id)
+            self._account_groups.pop(router_id, None)
             
             # Remove groups directory
             groups_dir = f"data/groups/{router_id}"
@@ -152,13 +178,21 @@ class RouterManager:
             return False
     
     def get_mikrotik_client(self, router_id: str) -> Optional[MikroTikClient]:
-        """Get MikroTik client for specific router"""
+        """Create a new connected MikroTik client for specific router (not pooled)"""
+        return self.connect_client(router_id)[0]
+
+    def connect_client(self, router_id: str) -> Tuple[Optional[MikroTikClient], Optional[str]]:
+        """
+        Create a new connected MikroTik client for specific router (not pooled).
+
+        Returns:
+            tuple: (connected client, None), or (None, error message) if the connection failed
+        """
         router = self.get_router(router_id)
         if not router:
             error_msg = f"Router {router_id} not found"
             error(error_msg)
-            self.last_client_error = error_msg
-            return None
+            return None, error_msg
         try:
             client = MikroTikClient(
                 host=router['host'],
@@ -168,51 +202,178 @@ class RouterManager:
                 use_ssl=router.get('use_ssl', False)
             )
             if client.connect():
-                self.last_client_error = None
-                return client
+                return client, None
             else:
                 error_msg = f"Failed to connect to router {router_id}: {client.get_error()}"
                 error(error_msg)
-                self.last_client_error = error_msg
-                return None
+                return None, error_msg
         except Exception as e:
             error_msg = f"Error creating client for router {router_id}: {e}"
             error(error_msg)
-            self.last_client_error = error_msg
-            return None
+            return None, error_msg
     
+    def get_pool(self, router_id: str) -> Optional[RouterConnectionPool]:
+        """Get (or lazily create) the connection pool for a router"""
+        if router_id not in self.routers:
+            return None
+        with self._pools_lock:
+            pool = self.pools.get(router_id)
+            if pool is None:
+                pool = RouterConnectionPool(router_id, lambda: self.connect_client(router_id))
+                self.pools[router_id] = pool
+            return pool
+
+    def close_pool(self, router_id: str) -> None:
+        """Close and forget the connection pool and circuit breaker for a router"""
+        with self._pools_lock:
+            pool = self.pools.pop(router_id, None)
+            self.breakers.pop(router_id, None)
+        if pool:
+            pool.close()
+
+    def get_breaker(self, router_id: str) -> Optional[CircuitBreaker]:
+        """Get (or lazily create) the circuit breaker for a router"""
+        if router_id not in self.routers:
+            return None
+        with self._pools_lock:
+            breaker = self.breakers.get(router_id)
+            if breaker is None:
+                breaker = self.breakers[router_id] = CircuitBreaker(router_id)
+            return breaker
+
+    @contextmanager
+    def checkout_client(self, router_id: str,
+                        force: bool = False) -> Iterator[Tuple[Optional[MikroTikClient], Optional[str]]]:
+        """
+        Borrow a pooled, connected client for a router for the duration of a with-block.
+        Yields (client, None), or (None, error message) if no connection could be made;
+        no connection is tried while the router's circuit breaker is open and force is not set.
+        A client whose with-block raised is disconnected instead of returned to the pool.
+        """
+        pool = self.get_pool(router_id)
+        breaker = self.get_breaker(router_id)
+        if pool is None or breaker is None:
+            yield None, f"Router {router_id} not found"
+            return
+        if not force and not breaker.allow_request():
+            yield None, f"Router {router_id} is unreachable: {breaker.last_error}"
+            return
+        client, checkout_error = pool.checkout()
+        if client is None:
+            if breaker.record_failure(checkout_error):
+                warning(f"Circuit opened for router {router_id}: {checkout_error}")
+        else:
+            breaker.record_success()
+        try:
+            yield client, checkout_error
+        except Exception:
+            # A command may have been cut off midway, leaving replies on the connection
+            pool.discard(client)
+            raise
+        if client is not None and not client.connected:
+            if breaker.record_failure(client.get_error()):
+                warning(f"Circuit opened for router {router_id}: {client.get_error()}")
+        pool.checkin(client)
+
+    def get_pool_stats(self) -> List[Dict]:
+        """Get usage counters for all connection pools"""
+        with self._pools_lock:
+            pools = list(self.pools.values())
+        return [pool.get_stats() for pool in pools]
+
+    def fetch(self, router_id: str, method: str, *args) -> Tuple[Any, Optional[str]]:
+        """
+        Call a MikroTikClient fetch method on a pooled client.
+
+        Args:
+            router_id: Router ID
+            method: Name of the MikroTikClient method to call
+            *args: Arguments for the method
+
+        Returns:
+            tuple: (method result or None, error message or None)
+        """
+        with self.checkout_client(router_id) as (client, checkout_error):
+            if client is None:
+                return None, checkout_error
+            result = getattr(client, method)(*args)
+            return result, client.get_error()
+
+    def get_single_flight_stats(self) -> Dict:
+        """Get counters of router refreshes and connection tests that were coalesced"""
+        return self.single_flight.get_stats()
+
+    def _pool_reaper_loop(self) -> None:
+        """Periodically close idle pooled connections"""
+        while True:
+            time.sleep(POOL_REAP_INTERVAL)
+            with self._pools_lock:
+                pools = list(self.pools.values())
+            for pool in pools:
+                try:
+                    pool.reap()
+                except Exception as e:
+                    error(f"Error reaping connections for router {pool.router_id}: {e}")
+
+    def _breaker_probe_loop(self) -> None:
+        """Probe routers whose circuit is open, backing off after each failed probe"""
+        while True:
+            time.sleep(BREAKER_PROBE_INTERVAL)
+            with self._pools_lock:
+                breakers = list(self.breakers.values())
+            for breaker in breakers:
+                if breaker.start_probe():
+                    threading.Thread(target=self._probe_router, args=(breaker,), daemon=True).start()
+
+    def _probe_router(self, breaker: CircuitBreaker) -> None:
+        router_id = breaker.router_id
+        try:
+            client, probe_error = self.connect_client(router_id)
+        except Exception as e:
+            client, probe_error = None, str(e)
+        if client is None:
+            breaker.record_failure(probe_error)
+            debug(f"Probe of router {router_id} failed: {breaker.get_state()}")
+            return
+        client.disconnect()
+        breaker.record_success()
+        info(f"Router {router_id} is reachable again, circuit closed")
+
     def test_router_connection(self, router_id: str) -> Dict:
-        """Test connection to a specific router"""
+        """Test connection to a specific router; concurrent tests of the same router share one attempt"""
+        return self.single_flight.do((router_id, 'test_connection'), self._test_router_connection, router_id)
+
+    def _test_router_connection(self, router_id: str) -> Dict:
         router = self.get_router(router_id)
         if not router:
             return {'success': False, 'error': 'Router not found'}
         
         try:
-            client = self.get_mikrotik_client(router_id)
-            if not client:
-                return {'success': False, 'error': 'Failed to create client'}
-            
-            connected = client.test_connection()
-            
-            # Update router status
-            router['last_connection'] = datetime.now().isoformat()
-            router['connection_status'] = 'connected' if connected else 'disconnected'
-            self.save_routers()
-            
-            if connected:
-                identity = client.get_identity()
-                return {
-                    'success': True,
-                    'connected': True,
-                    'identity': identity,
-                    'router_name': router['name']
-                }
-            else:
-                return {
-                    'success': False,
-                    'connected': False,
-                    'error': client.get_error() or 'Connection failed'
-                }
+            with self.checkout_client(router_id, force=True) as (client, checkout_error):
+                if not client:
+                    return {'success': False, 'error': checkout_error or 'Failed to create client'}
+                
+                connected = client.test_connection()
+                
+                # Update router status
+                router['last_connection'] = datetime.now().isoformat()
+                router['connection_status'] = 'connected' if connected else 'disconnected'
+                self.save_routers()
+                
+                if connected:
+                    identity = client.get_identity()
+                    return {
+                        'success': True,
+                        'connected': True,
+                        'identity': identity,
+                        'router_name': router['name']
+                    }
+                else:
+                    return {
+                        'success': False,
+                        'connected': False,
+                        'error': client.get_error() or 'Connection failed'
+                    }
         except Exception as e:
             error(f"Error testing connection to router {router_id}: {e}")
             return {'success': False, 'error': str(e)}
@@ -245,11 +406,33 @@ class RouterManager:
             os.makedirs(os.path.dirname(groups_file), exist_ok=True)
             with open(groups_file, 'w') as f:
                 json.dump(groups, f, indent=2)
+            self._account_groups.pop(router_id, None)
             return True
         except Exception as e:
             error(f"Error saving groups for router {router_id}: {e}")
             return False
     
+    def get_account_groups(self, router_id: str) -> Dict[str, List[Dict]]:
+        """
+        Groups of each account of a router, as {account name: [{id, name}]}.
+        Read-only; built from the groups file once and again after it changes.
+        """
+        try:
+            stat = os.stat(self.get_groups_file_path(router_id))
+        except OSError:
+            return {}
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._account_groups.get(router_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        account_groups: Dict[str, List[Dict]] = {}
+        for group in self.get_groups(router_id):
+            entry = {'id': group.get('id'), 'name': group.get('name')}
+            for name in dict.fromkeys(member_name(member) for member in group.get('accounts', [])):
+                account_groups.setdefault(name, []).append(entry)
+        self._account_groups[router_id] = (stamp, account_groups)
+        return account_groups
+    
     def get_all_routers_status(self) -> List[Dict]:
         """Get status for all routers"""
         status_list = []
@@ -261,7 +444,8 @@ class RouterManager:
                 'enabled': router.get('enabled', True),
                 'connection_status': router.get('connection_status', 'unknown'),
                 'last_connection': router.get('last_connection'),
-                'description': router.get('description', '')
+                'description': router.get('description', ''),
+                'circuit': self.get_breaker(router_id).get_state()
             }
             status_list.append(status)
         return status_list
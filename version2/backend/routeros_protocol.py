@@ -0,0 +1,186 @@
+"""
+RouterOS API wire protocol helpers.
+Encoding and decoding of length-prefixed words and sentences, shared by the
+asyncio client and anything else that speaks the API directly.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple, Union
+
+
+class RouterOsProtocolError(Exception):
+    """Raised when the byte stream does not follow the RouterOS API protocol."""
+
+
+class RouterOsTrapError(Exception):
+    """Raised when a command finishes with a !trap reply."""
+
+    def __init__(self, message: str, category: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.category = category
+
+
+class RouterOsFatalError(Exception):
+    """Raised when the router sends !fatal; the connection is closed afterwards."""
+
+
+def encode_length(length: int) -> bytes:
+    """
+    Encode a word length using the RouterOS variable-length scheme.
+
+    Args:
+        length: Length of the word in bytes
+
+    Returns:
+        bytes: 1 to 5 byte length prefix
+    """
+    if length < 0:
+        raise RouterOsProtocolError("Negative word length")
+    if length < 0x80:
+        return bytes((length,))
+    if length < 0x4000:
+        return (length | 0x8000).to_bytes(2, 'big')
+    if length < 0x200000:
+        return (length | 0xC00000).to_bytes(3, 'big')
+    if length < 0x10000000:
+        return (length | 0xE0000000).to_bytes(4, 'big')
+    if length < 0x100000000:
+        return b'\xF0' + length.to_bytes(4, 'big')
+    raise RouterOsProtocolError("Word too long")
+
+
+def length_prefix_size(first_byte: int) -> int:
+    """
+    Get the total size of a length prefix from its first byte.
+
+    Args:
+        first_byte: First byte of the length prefix
+
+    Returns:
+        int: Number of bytes in the prefix (1-5)
+    """
+    if first_byte < 0x80:
+        return 1
+    if first_byte < 0xC0:
+        return 2
+    if first_byte < 0xE0:
+        return 3
+    if first_byte < 0xF0:
+        return 4
+    if first_byte == 0xF0:
+        return 5
+    raise RouterOsProtocolError(f"Malformed length prefix 0x{first_byte:02x}")
+
+
+def decode_length(prefix: bytes) -> int:
+    """
+    Decode a complete length prefix.
+
+    Args:
+        prefix: The 1-5 byte prefix as returned by length_prefix_size()
+
+    Returns:
+        int: Decoded word length
+    """
+    size = len(prefix)
+    if size == 1:
+        return prefix[0]
+    if size == 5:
+        return int.from_bytes(prefix[1:], 'big')
+    mask = (1 << (8 * size - size)) - 1
+    return int.from_bytes(prefix, 'big') & mask
+
+
+def encode_word(word: Union[str, bytes]) -> bytes:
+    """Encode a single word with its length prefix."""
+    if isinstance(word, str):
+        word = word.encode('utf-8')
+    return encode_length(len(word)) + word
+
+
+def encode_sentence(words: List[Union[str, bytes]]) -> bytes:
+    """Encode a sentence (list of words) terminated by an empty word."""
+    return b''.join(encode_word(word) for word in words) + b'\x00'
+
+
+async def read_sentence(reader: asyncio.StreamReader) -> List[str]:
+    """
+    Read one sentence from a stream.
+
+    Args:
+        reader: Stream positioned at the start of a sentence
+
+    Returns:
+        list: Decoded words, without the terminating empty word
+
+    Raises:
+        asyncio.IncompleteReadError: If the stream ends inside the sentence
+    """
+    words = []
+    while True:
+        first = await reader.readexactly(1)
+        size = length_prefix_size(first[0])
+        prefix = first + (await reader.readexactly(size - 1) if size > 1 else b'')
+        length = decode_length(prefix)
+        if not length:
+            return words
+        words.append((await reader.readexactly(length)).decode('utf-8', errors='replace'))
+
+
+def build_command(path: str, command: str = 'print', arguments: Optional[Dict] = None,
+                  queries: Optional[Dict] = None, proplist: Optional[List[str]] = None,
+                  tag: Optional[str] = None) -> List[str]:
+    """
+    Build the words of an API command sentence.
+
+    Args:
+        path: Menu path, e.g. '/ppp/secret'
+        command: Command within the menu, e.g. 'print'
+        arguments: Attribute words sent as '=key=value'
+        queries: Equality query words sent as '?key=value'
+        proplist: Properties to return, sent as '=.proplist=a,b,c'
+        tag: Optional '.tag' value used to match replies
+
+    Returns:
+        list: Words of the sentence
+    """
+    words = [f"{path.rstrip('/')}/{command}" if command else path]
+    for key, value in (arguments or {}).items():
+        words.append(f"={key}={value}")
+    if proplist:
+        words.append(f"=.proplist={','.join(proplist)}")
+    for key, value in (queries or {}).items():
+        words.append(f"?{key}={value}")
+    if tag is not None:
+        words.append(f".tag={tag}")
+    return words
+
+
+def parse_sentence(words: List[str]) -> Tuple[str, Optional[str], Dict[str, str]]:
+    """
+    Split a reply sentence into its type, tag and attributes.
+
+    Attribute keys are returned the way routeros_api returns them, so '.id'
+    becomes 'id' and rows look the same as those from MikroTikClient.
+
+    Args:
+        words: Decoded words of one reply sentence
+
+    Returns:
+        tuple: (reply type such as '!re', tag or None, attribute dict)
+    """
+    if not words:
+        raise RouterOsProtocolError("Empty sentence")
+    reply_type = words[0]
+    tag = None
+    attributes = {}
+    for word in words[1:]:
+        if word.startswith('.tag='):
+            tag = word[5:]
+        elif word.startswith('='):
+            key, _, value = word[1:].partition('=')
+            if key == '.id':
+                key = 'id'
+            attributes[key] = value
+    return reply_type, tag, attributes
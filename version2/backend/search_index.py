@@ -0,0 +1,205 @@
+"""
+Account search over a router's PPP secrets and sessions.
+A SearchIndex holds every searchable value of a router (secret names,
+comments, caller-ids and remote addresses, and the caller-id/MAC and address
+of active sessions) lowercased in two structures: a sorted array of values
+for prefix matches, found by bisection, and a trigram index for substring
+matches. When the router's snapshot changes only the rows whose searchable
+values changed are re-indexed.
+"""
+
+import bisect
+import heapq
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+# Searchable fields of each snapshot list
+SECRET_FIELDS = ('name', 'comment', 'caller-id', 'remote-address')
+ACTIVE_FIELDS = ('caller-id', 'address')
+
+# Length of the n-grams of the substring index; shorter queries only match prefixes
+NGRAM = 3
+
+# Share of indexed rows above which a sync re-sorts the prefix array instead of
+# updating it entry by entry
+REBUILD_FRACTION = 0.1
+
+DEFAULT_RESULTS = 10
+MAX_RESULTS = 100
+
+# Match kinds, best first
+EXACT = 'exact'
+PREFIX = 'prefix'
+SUBSTRING = 'substring'
+_MATCH_RANK = {EXACT: 0, PREFIX: 1, SUBSTRING: 2}
+
+# (value lowercased, field, account name, value as stored)
+_Entry = Tuple[str, str, str, str]
+
+
+def _grams(value: str) -> Set[str]:
+    return {value[i:i + NGRAM] for i in range(len(value) - NGRAM + 1)}
+
+
+def _row_entries(row: Dict, fields: Tuple[str, ...], source: str) -> Tuple[_Entry, ...]:
+    name = str(row.get('name', ''))
+    entries = []
+    for field in fields:
+        value = row.get(field)
+        if value:
+            value = str(value)
+            entries.append((value.lower(), f"{source}.{field}", name, value))
+    return tuple(entries)
+
+
+class SearchIndex:
+    """
+    Prefix and substring index over one router's accounts.
+
+    One index is kept per router and brought up to date with sync() before
+    each search; it is thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        self._sources: Dict[str, list] = {}
+        # Row key -> (entries of the row, their entry ids, the row they were made from)
+        self._rows: Dict[Tuple[str, str], Tuple[Tuple[_Entry, ...], Tuple[int, ...], Dict]] = {}
+        self._entries: Dict[int, _Entry] = {}
+        self._next_id = 0
+        # Sorted (value, entry id) for prefix search
+        self._sorted: List[Tuple[str, int]] = []
+        self._grams: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sync(self, snapshot) -> int:
+        """
+        Bring the index up to date with a snapshot of its router.
+
+        Lists and rows that are the same objects as at the last sync are
+        skipped; other rows are matched by .id and only those whose searchable
+        values changed are re-indexed. A snapshot no newer than the last one
+        synced is ignored, so a reader holding an older one cannot roll the
+        index back.
+
+        Returns:
+            int: Number of rows re-indexed
+        """
+        with self._lock:
+            if self.version is not None and snapshot.version <= self.version:
+                return 0
+            changed = 0
+            for source, rows, fields in (('secret', snapshot.ppp_secrets, SECRET_FIELDS),
+                                         ('active', snapshot.ppp_active, ACTIVE_FIELDS)):
+                if self._sources.get(source) is rows:
+                    continue
+                self._sources[source] = rows
+                changed += self._sync_rows(source, rows, fields)
+            self.version = snapshot.version
+            return changed
+
+    def search(self, query: str, limit: int = DEFAULT_RESULTS) -> List[Dict]:
+        """
+        Best matching accounts for a query, case-insensitive.
+
+        Exact matches of a value rank first, then prefix matches in value
+        order, then substring matches (queries of at least NGRAM characters)
+        by value length. Each account is listed once, with its best match.
+
+        Args:
+            query: Text to find
+            limit: Number of accounts to return
+
+        Returns:
+            list: [{'name', 'field', 'value', 'match'}] best first
+        """
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        results: Dict[str, Dict] = {}
+
+        def add(entry: _Entry, match: str) -> None:
+            _, field, name, value = entry
+            if name not in results:
+                results[name] = {'name': name, 'field': field, 'value': value, 'match': match}
+
+        with self._lock:
+            position = bisect.bisect_left(self._sorted, (needle, -1))
+            while position < len(self._sorted) and len(results) < limit:
+                value, entry_id = self._sorted[position]
+                if not value.startswith(needle):
+                    break
+                add(self._entries[entry_id], EXACT if value == needle else PREFIX)
+                position += 1
+            if len(results) < limit and len(needle) >= NGRAM:
+                postings = sorted((self._grams.get(gram, set()) for gram in _grams(needle)), key=len)
+                candidates = set.intersection(*postings) if postings and postings[0] else set()
+                rank = lambda entry: (len(entry[0]), entry[0])
+                best: Dict[str, _Entry] = {}
+                for entry_id in candidates:
+                    entry = self._entries[entry_id]
+                    value, _, name, _ = entry
+                    if (needle in value and not value.startswith(needle) and name not in results
+                            and (name not in best or rank(entry) < rank(best[name]))):
+                        best[name] = entry
+                for entry in heapq.nsmallest(limit - len(results), best.values(), key=rank):
+                    add(entry, SUBSTRING)
+        return sorted(results.values(), key=lambda result: _MATCH_RANK[result['match']])
+
+    def _sync_rows(self, source: str, rows: list, fields: Tuple[str, ...]) -> int:
+        seen = set()
+        stale, fresh = [], []
+        for row in rows:
+            key = (source, str(row.get('id', row.get('name'))))
+            if key in seen:
+                continue
+            seen.add(key)
+            indexed = self._rows.get(key)
+            if indexed is not None and indexed[2] is row:
+                continue
+            entries = _row_entries(row, fields, source)
+            if indexed is None or indexed[0] != entries:
+                if indexed is not None:
+                    stale.append(key)
+                fresh.append((key, row, entries))
+            else:
+                self._rows[key] = (indexed[0], indexed[1], row)
+        gone = [key for key in self._rows if key[0] == source and key not in seen]
+        stale.extend(gone)
+        # Many changes (e.g. the first sync): re-sort the value array once instead of per entry
+        bulk = len(stale) + len(fresh) > REBUILD_FRACTION * len(self._rows)
+        for key in stale:
+            self._remove_row(key, bulk)
+        for key, row, entries in fresh:
+            self._add_row(key, row, entries, bulk)
+        if bulk:
+            self._sorted = sorted((entry[0], entry_id) for entry_id, entry in self._entries.items())
+        return len(fresh) + len(gone)
+
+    def _add_row(self, key: Tuple[str, str], row: Dict, entries: Tuple[_Entry, ...], bulk: bool) -> None:
+        entry_ids = []
+        for entry in entries:
+            entry_id = self._next_id
+            self._next_id += 1
+            entry_ids.append(entry_id)
+            self._entries[entry_id] = entry
+            if not bulk:
+                bisect.insort(self._sorted, (entry[0], entry_id))
+            for gram in _grams(entry[0]):
+                self._grams.setdefault(gram, set()).add(entry_id)
+        self._rows[key] = (entries, tuple(entry_ids), row)
+
+    def _remove_row(self, key: Tuple[str, str], bulk: bool) -> None:
+        entries, entry_ids, _ = self._rows.pop(key)
+        for entry, entry_id in zip(entries, entry_ids):
+            del self._entries[entry_id]
+            if not bulk:
+                del self._sorted[bisect.bisect_left(self._sorted, (entry[0], entry_id))]
+            for gram in _grams(entry[0]):
+                postings = self._grams[gram]
+                postings.discard(entry_id)
+                if not postings:
+                    del self._grams[gram]
@@ -0,0 +1,230 @@
+"""
+Columnar PPP session table.
+Holds one router's PPP accounts as NumPy arrays (one entry per secret, in
+snapshot order) so that status counts, offline lists and group statistics are
+mask/reduce operations instead of repeated passes over lists of dicts.
+"""
+
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# RouterOS durations such as '1w2d3h4m5s', optionally ending in 'hh:mm:ss'
+_DURATION_UNITS = {'w': 604800, 'd': 86400, 'h': 3600, 'm': 60, 's': 1}
+_DURATION_PART = re.compile(r'(\d+)([wdhms])')
+_DURATION = re.compile(r'((?:\d+[wdhms])*)(?:(\d+):(\d\d):(\d\d))?')
+
+# Naive start of the epoch; wall-clock times are offsets from it
+_EPOCH = datetime(1970, 1, 1)
+
+# Prefix and suffix of the dynamic interface RouterOS creates per PPPoE session
+PPPOE_INTERFACE_PREFIX = '<pppoe-'
+PPPOE_INTERFACE_SUFFIX = '>'
+
+
+def parse_duration(value: Optional[str]) -> int:
+    """
+    Convert a RouterOS duration to seconds.
+
+    Args:
+        value: Duration such as '1d2h3m4s' or '1d02:03:04'
+
+    Returns:
+        int: Seconds, or -1 if the value is missing or not a duration
+    """
+    match = _DURATION.fullmatch(value.strip()) if value else None
+    if not match or not match.group(0):
+        return -1
+    units, hours, minutes, seconds = match.groups()
+    total = sum(int(amount) * _DURATION_UNITS[unit] for amount, unit in _DURATION_PART.findall(units))
+    if hours is not None:
+        total += int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+    return total
+
+
+def _is_timestamp(value) -> bool:
+    return isinstance(value, str) and len(value) == 19 and value[4] == '-' and value[10] == ' '
+
+
+def parse_timestamps(values: List[Optional[str]]) -> np.ndarray:
+    """
+    Convert RouterOS 'YYYY-MM-DD HH:MM:SS' local timestamps to epoch seconds in one pass.
+
+    Args:
+        values: Timestamps; missing values and other formats (e.g. 'never') are allowed
+
+    Returns:
+        ndarray: float64 epoch seconds, NaN where a value could not be parsed
+    """
+    result = np.full(len(values), np.nan, dtype=np.float64)
+    rows = [row for row, value in enumerate(values) if _is_timestamp(value)]
+    if not rows:
+        return result
+    try:
+        naive = np.array([values[row] for row in rows], dtype='datetime64[s]').astype(np.int64)
+    except ValueError:
+        # Some value looked like a timestamp but was not one; fall back to parsing one by one
+        return np.array([_parse_timestamp(value) for value in values], dtype=np.float64)
+    # The values are local time; shift each hour by the UTC offset in effect then.
+    # A naive datetime's timestamp() resolves the offset, DST included, for that wall-clock time.
+    hours, inverse = np.unique(naive // 3600, return_inverse=True)
+    offsets = np.array([(_EPOCH + timedelta(hours=int(hour))).timestamp() - int(hour) * 3600 for hour in hours])
+    result[rows] = naive + offsets[inverse]
+    return result
+
+
+def _parse_timestamp(value: Optional[str]) -> float:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S').timestamp()
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def member_name(member) -> str:
+    """Account name of a group member, stored either as the name or as {'name': ...}"""
+    return str(member.get('name', '') if isinstance(member, dict) else member)
+
+
+def _is_disabled(value) -> bool:
+    return value is True or value == 1 or str(value).strip().lower() in ('true', 'yes', '1')
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class SessionColumns:
+    """
+    One router's PPP accounts as parallel NumPy columns.
+
+    Row i describes ppp_secrets[i] of the snapshot the table was built from.
+    Instances are treated as immutable once built, so they can be cached on
+    the snapshot and shared between requests.
+    """
+
+    def __init__(self, secrets: List[Dict], ppp_active: List[Dict], pppoe_interfaces: List[Dict]):
+        """
+        Build the columns from one snapshot's lists.
+
+        Args:
+            secrets: PPP secrets (accounts)
+            ppp_active: Active PPP connections
+            pppoe_interfaces: pppoe-in interfaces with stats
+        """
+        active_by_name = {}
+        for session in ppp_active:
+            if session.get('name'):
+                active_by_name[session['name'].lower()] = session
+        interfaces_by_name = {}
+        for iface in pppoe_interfaces:
+            name = iface.get('name', '')
+            if name.startswith(PPPOE_INTERFACE_PREFIX) and name.endswith(PPPOE_INTERFACE_SUFFIX):
+                interfaces_by_name[name[len(PPPOE_INTERFACE_PREFIX):-len(PPPOE_INTERFACE_SUFFIX)].lower()] = iface
+
+        count = len(secrets)
+        self.secrets = secrets
+        self.account_id = np.empty(count, dtype=object)
+        self.online = np.zeros(count, dtype=bool)
+        self.disabled = np.zeros(count, dtype=bool)
+        self.rx_bytes = np.zeros(count, dtype=np.int64)
+        self.tx_bytes = np.zeros(count, dtype=np.int64)
+        self.rx_rate = np.zeros(count, dtype=np.float64)
+        self.tx_rate = np.zeros(count, dtype=np.float64)
+        self.uptime_seconds = np.full(count, -1, dtype=np.int64)
+        self.last_logged_out = parse_timestamps([secret.get('last-logged-out') for secret in secrets])
+        self.row_by_name: Dict[str, int] = {}
+
+        for row, secret in enumerate(secrets):
+            name = secret.get('name', '').lower()
+            self.row_by_name.setdefault(name, row)
+            self.account_id[row] = secret.get('id')
+            self.disabled[row] = _is_disabled(secret.get('disabled', ''))
+            session = active_by_name.get(name)
+            if session is not None:
+                self.online[row] = True
+                self.uptime_seconds[row] = parse_duration(session.get('uptime'))
+            iface = interfaces_by_name.get(name)
+            if iface is not None:
+                self.rx_bytes[row] = int(_to_float(iface.get('rx_bytes', iface.get('rx-byte'))))
+                self.tx_bytes[row] = int(_to_float(iface.get('tx_bytes', iface.get('tx-byte'))))
+                self.rx_rate[row] = _to_float(iface.get('rx_rate'))
+                self.tx_rate[row] = _to_float(iface.get('tx_rate'))
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> 'SessionColumns':
+        """Build the table for a RouterSnapshot"""
+        return cls(snapshot.ppp_secrets, snapshot.ppp_active, snapshot.pppoe_interfaces)
+
+    def __len__(self) -> int:
+        return len(self.secrets)
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Count accounts by status.
+
+        Returns:
+            dict: total, online, offline, enabled and disabled account counts
+        """
+        total = len(self)
+        online = int(np.count_nonzero(self.online))
+        disabled = int(np.count_nonzero(self.disabled))
+        return {
+            'total_accounts': total,
+            'online_accounts': online,
+            'offline_accounts': total - online,
+            'enabled_accounts': total - disabled,
+            'disabled_accounts': disabled
+        }
+
+    def downtime_seconds(self, now: Optional[float] = None) -> np.ndarray:
+        """
+        Seconds since each account last logged out.
+
+        Returns:
+            ndarray: int64 seconds, -1 where last-logged-out is unknown
+        """
+        now = time.time() if now is None else now
+        known = ~np.isnan(self.last_logged_out)
+        downtime = np.full(len(self), -1, dtype=np.int64)
+        downtime[known] = (now - self.last_logged_out[known]).astype(np.int64)
+        return downtime
+
+    def group_members(self, groups: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map accounts to the groups listing them; an account may be in several groups.
+
+        Args:
+            groups: Groups as stored by RouterManager, with members in 'accounts'
+
+        Returns:
+            tuple: (row, group index) int arrays, one entry per membership of an
+                   account found on the router
+        """
+        memberships = set()
+        for index, group in enumerate(groups):
+            for member in group.get('accounts', []):
+                row = self.row_by_name.get(member_name(member).lower())
+                if row is not None:
+                    memberships.add((row, index))
+        pairs = np.array(sorted(memberships), dtype=np.int64).reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def group_counts(self, groups: List[Dict]) -> List[Dict[str, int]]:
+        """
+        Count each group's members by status.
+
+        Returns:
+            list: {'total', 'online', 'offline', 'disabled'} per group, in the order given
+        """
+        rows, group_index = self.group_members(groups)
+        size = len(groups)
+        total = np.bincount(group_index, minlength=size)
+        online = np.bincount(group_index[self.online[rows]], minlength=size)
+        disabled = np.bincount(group_index[self.disabled[rows]], minlength=size)
+        return [{'total': int(total[i]), 'online': int(online[i]), 'offline': int(total[i] - online[i]),
+                 'disabled': int(disabled[i])} for i in range(size)]
@@ -0,0 +1,212 @@
+"""
+Incremental session tracking for MikroTik routers.
+Follows /ppp/active and the pppoe-in interfaces of a router with the RouterOS
+'listen' command and applies the add/remove/modify notifications to in-memory
+tables, so the full tables do not have to be downloaded on every poll.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from mikrotik_client import PPP_ACTIVE_PROPLISTS, MikroTikClient
+from logger import info, error, warning, debug
+
+# Seconds between full resyncs of a listened table, guarding against drift
+LISTEN_RESYNC_INTERVAL = 300
+
+# Seconds to wait before reconnecting after a listen connection failed
+LISTEN_RETRY_DELAY = 5
+
+# Seconds between checks for table changes to publish; notifications arriving
+# within this window are published together
+LISTEN_PUBLISH_INTERVAL = 0.5
+
+# Listened menus: snapshot field -> (menu path, properties, row filter)
+LISTEN_TABLES = {
+    'ppp_active': ('/ppp/active', PPP_ACTIVE_PROPLISTS['snapshot'], None),
+    'pppoe_interfaces': ('/interface',
+                         ['.id', 'name', 'type', 'running', 'disabled', 'last-link-up-time', 'client-mac-address'],
+                         lambda row: row.get('type') == 'pppoe-in'),
+}
+
+
+class SessionTable:
+    """
+    Rows of one RouterOS menu keyed by .id, kept current from listen notifications.
+    """
+
+    def __init__(self, row_filter: Optional[Callable[[Dict], bool]] = None):
+        """
+        Initialize an empty table.
+
+        Args:
+            row_filter: Predicate selecting the rows to keep; other rows are dropped
+        """
+        self.row_filter = row_filter
+        self.version = 0
+        self.last_resync = None
+        self._rows: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def replace_all(self, rows: List[Dict]) -> None:
+        """Replace the table contents with the result of a full print"""
+        with self._lock:
+            self._rows = {row.get('id'): row for row in rows if self._keep(row)}
+            self.version += 1
+            self.last_resync = time.time()
+
+    def apply(self, notification: Dict) -> bool:
+        """
+        Apply one listen notification.
+
+        Args:
+            notification: Row from the listen command; '.dead' marks a removed item
+
+        Returns:
+            bool: True if the table changed
+        """
+        row_id = notification.get('id')
+        if row_id is None:
+            return False
+        with self._lock:
+            current = self._rows.get(row_id)
+            row = {**current, **notification} if current else dict(notification)
+            if '.dead' in notification or not self._keep(row):
+                if self._rows.pop(row_id, None) is None:
+                    return False
+            else:
+                if row == current:
+                    return False
+                self._rows[row_id] = row
+            self.version += 1
+            return True
+
+    def rows(self) -> List[Dict]:
+        """Get the current rows"""
+        with self._lock:
+            return list(self._rows.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def _keep(self, row: Dict) -> bool:
+        return self.row_filter is None or self.row_filter(row)
+
+
+class SessionTracker:
+    """
+    Follows the session tables of one router through listen connections.
+
+    Each table gets its own dedicated connection and thread. A connection is
+    closed and reopened with a fresh print every resync_interval, or after a
+    failure. Changes are handed to on_change(router_id, field, rows) at most
+    once per LISTEN_PUBLISH_INTERVAL.
+    """
+
+    def __init__(self, router_id: str, client_factory: Callable[[], Optional[MikroTikClient]],
+                 on_change: Callable[[str, str, List[Dict]], None],
+                 resync_interval: float = LISTEN_RESYNC_INTERVAL):
+        """
+        Initialize the tracker.
+
+        Args:
+            router_id: ID of the router to follow
+            client_factory: Callable returning a new connected client, or None on failure
+            on_change: Called with (router_id, field, rows) when a table changed
+            resync_interval: Seconds between full resyncs of each table
+        """
+        self.router_id = router_id
+        self.client_factory = client_factory
+        self.on_change = on_change
+        self.resync_interval = resync_interval
+        self.tables = {field: SessionTable(row_filter) for field, (_, _, row_filter) in LISTEN_TABLES.items()}
+        self.stats = {'notifications': 0, 'resyncs': 0, 'failures': 0}
+
+        self._stopped = threading.Event()
+        self._clients: Dict[str, MikroTikClient] = {}
+        self._clients_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def fields(self) -> List[str]:
+        """Snapshot fields kept current by this tracker"""
+        return list(self.tables)
+
+    def start(self) -> None:
+        """Open the listen connections and start publishing changes"""
+        for field in self.tables:
+            self._threads.append(threading.Thread(target=self._follow, args=(field,), daemon=True))
+        self._threads.append(threading.Thread(target=self._publish_loop, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        info(f"Listening for session changes on router {self.router_id}", "SessionTracker")
+
+    def stop(self) -> None:
+        """Stop following the router and close the listen connections"""
+        self._stopped.set()
+        with self._clients_lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            try:
+                client.disconnect()
+            except Exception as e:
+                debug(f"Error closing listen connection: {e}", "SessionTracker")
+
+    def is_synced(self, field: str) -> bool:
+        """Whether a table has been loaded by at least one full print"""
+        return self.tables[field].last_resync is not None
+
+    def _follow(self, field: str) -> None:
+        """Listen loop for one table: print, apply notifications, reconnect to resync"""
+        path, proplist, _ = LISTEN_TABLES[field]
+        table = self.tables[field]
+        while not self._stopped.is_set():
+            client = self.client_factory()
+            if client is None:
+                self.stats['failures'] += 1
+                self._stopped.wait(LISTEN_RETRY_DELAY)
+                continue
+            with self._clients_lock:
+                if self._stopped.is_set():
+                    client.disconnect()
+                    return
+                self._clients[field] = client
+            resync_at = time.monotonic() + self.resync_interval
+            try:
+                # An idle read times out at the next resync, which ends this connection
+                started = client.listen(path, proplist, timeout=self.resync_interval)
+                if started is None:
+                    raise ConnectionError(client.get_error() or f"listen on {path} failed")
+                rows, notifications = started
+                table.replace_all(rows)
+                self.stats['resyncs'] += 1
+                for notification in notifications:
+                    self.stats['notifications'] += 1
+                    table.apply(notification)
+                    if self._stopped.is_set() or time.monotonic() >= resync_at:
+                        break
+            except Exception as e:
+                if not self._stopped.is_set() and time.monotonic() < resync_at:
+                    self.stats['failures'] += 1
+                    warning(f"Listen on {path} for router {self.router_id} failed: {e}", "SessionTracker")
+                    self._stopped.wait(LISTEN_RETRY_DELAY)
+            finally:
+                with self._clients_lock:
+                    self._clients.pop(field, None)
+                client.disconnect()
+
+    def _publish_loop(self) -> None:
+        """Hand changed tables to on_change, batching notifications that arrive close together"""
+        published = {field: 0 for field in self.tables}
+        while not self._stopped.wait(LISTEN_PUBLISH_INTERVAL):
+            for field, table in self.tables.items():
+                version = table.version
+                if version == published[field]:
+                    continue
+                published[field] = version
+                try:
+                    self.on_change(self.router_id, field, table.rows())
+                except Exception as e:
+                    error(f"Error publishing {field} for router {self.router_id}: {e}", "SessionTracker")
@@ -0,0 +1,97 @@
+"""
+Single-flight request coalescing.
+Concurrent calls with the same key share one execution: the first caller runs
+the function and every caller that arrives while it is running waits for and
+receives the same result.
+"""
+
+import threading
+from typing import Callable, Dict, Hashable
+
+
+class _Call:
+    """Result of one in-flight execution, published to the callers waiting on it."""
+
+    __slots__ = ('done', 'result', 'exception')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """
+    Thread-safe coalescing of concurrent identical calls.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        Run fn once per key at a time.
+
+        Args:
+            key: Hashable identity of the call; tuples are grouped in the stats by key[1]
+            fn: Function to run
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            The result of fn, shared with every caller coalesced onto this execution
+
+        Raises:
+            Whatever fn raised, in every coalesced caller
+        """
+        with self._lock:
+            stats = self._stats.setdefault(self._stats_name(key), {'calls': 0, 'executions': 0, 'coalesced': 0})
+            stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                stats['coalesced'] += 1
+                leader = False
+            else:
+                stats['executions'] += 1
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def get_stats(self) -> Dict:
+        """
+        Get coalescing counters.
+
+        Returns:
+            dict: Totals plus per-command counters of calls, executions and coalesced calls
+        """
+        with self._lock:
+            by_command = {name: dict(stats) for name, stats in self._stats.items()}
+            in_flight = len(self._calls)
+        totals = {'calls': 0, 'executions': 0, 'coalesced': 0}
+        for stats in by_command.values():
+            for name in totals:
+                totals[name] += stats[name]
+        return {**totals, 'in_flight': in_flight, 'by_command': by_command}
+
+    @staticmethod
+    def _stats_name(key: Hashable) -> str:
+        if isinstance(key, tuple) and len(key) > 1:
+            return str(key[1])
+        return str(key)
@@ -0,0 +1,86 @@
+"""
+Tests for paginated account listings.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import unittest
+
+from account_index import AccountIndex, decode_cursor, encode_cursor
+from session_columns import SessionColumns
+
+SECRETS = [{'id': f"*{index}", 'name': f"user{index:02d}", 'profile': 'gold' if index % 3 else 'basic',
+            'disabled': 'true' if index % 5 == 0 else 'false'} for index in range(1, 31)]
+ACTIVE = [{'name': f"user{index:02d}", 'uptime': f"{index}m"} for index in range(1, 31, 2)]
+
+
+class CursorTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        for sort, descending, value in (('name', False, 'user05'), ('uptime', True, 300), ('rx', False, 1.5)):
+            with self.subTest(sort=sort):
+                cursor = encode_cursor(sort, descending, value, 'user05', 4)
+                self.assertNotIn('=', cursor)
+                self.assertEqual(decode_cursor(cursor, sort, descending), (value, 'user05', 4))
+
+    def test_rejects_other_sort_order_and_garbage(self):
+        cursor = encode_cursor('uptime', True, 300, 'user05', 4)
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor, 'uptime', False)
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor, 'name', True)
+        with self.assertRaises(ValueError):
+            decode_cursor('not a cursor!', 'name', False)
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor('name', False, 'user05', 'user05', None), 'name', False)
+
+
+class AccountIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = AccountIndex(SessionColumns(SECRETS, ACTIVE, []))
+
+    def names(self, rows):
+        return [SECRETS[row]['name'] for row in rows]
+
+    def test_cursor_pages_cover_every_row_once(self):
+        for sort, descending in (('name', False), ('name', True), ('uptime', True), ('status', False)):
+            with self.subTest(sort=sort, descending=descending):
+                seen, after = [], None
+                while True:
+                    rows, total, _ = self.index.page(sort, descending, limit=7, after=after)
+                    seen.extend(self.names(rows))
+                    if len(seen) >= total:
+                        break
+                    after = decode_cursor(self.index.cursor_for(rows[-1], sort, descending), sort, descending)
+                self.assertEqual(seen, self.names(self.index.order(sort, descending)))
+
+    def test_cursor_pages_names_differing_only_by_case(self):
+        secrets = [{'name': name} for name in ('bob', 'Alice', 'alice', 'ALICE', 'carol')]
+        active = [{'name': name, 'uptime': '5m'} for name in ('Alice', 'alice', 'ALICE', 'bob')]
+        index = AccountIndex(SessionColumns(secrets, active, []))
+        for sort, descending in (('name', False), ('name', True), ('uptime', False), ('uptime', True)):
+            with self.subTest(sort=sort, descending=descending):
+                seen, after = [], None
+                while True:
+                    rows, total, _ = index.page(sort, descending, limit=1, after=after)
+                    seen.extend(rows.tolist())
+                    if len(seen) >= total:
+                        break
+                    after = decode_cursor(index.cursor_for(rows[-1], sort, descending), sort, descending)
+                self.assertEqual(seen, index.order(sort, descending).tolist())
+
+    def test_filters(self):
+        mask = self.index.filter_mask(statuses=['online'], profiles=['GOLD'])
+        rows, total, _ = self.index.page(mask=mask, limit=100)
+        self.assertEqual(self.names(rows), [f"user{index:02d}" for index in range(1, 31, 2) if index % 3])
+        self.assertEqual(total, len(rows))
+        mask = self.index.filter_mask(members=['USER01', {'name': 'user02'}, 'missing'], name='0')
+        self.assertEqual(self.names(self.index.page(mask=mask)[0]), ['user01', 'user02'])
+
+    def test_disabled_but_connected_counts_as_online(self):
+        row = self.index.rows([4])[0]
+        self.assertEqual((row['name'], row['status'], row['uptime_seconds']), ('user05', 'Online', 300))
+
+
+if __name__ == '__main__':
+    unittest.main()
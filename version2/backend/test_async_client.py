@@ -0,0 +1,84 @@
+"""
+Tests for AsyncMikroTikClient against the fake RouterOS server.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import asyncio
+import unittest
+
+from async_client import AsyncMikroTikClient
+from fake_routeros import FakeRouterOS
+
+
+class AsyncClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeRouterOS(port=0, secrets=50, active=20, seed=1).start()
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def run_client(self, body, max_in_flight=8):
+        async def main():
+            client = AsyncMikroTikClient('127.0.0.1', 'admin', '', port=self.fake.port,
+                                         max_in_flight=max_in_flight, timeout=5)
+            self.assertTrue(await client.connect(), client.get_error())
+            try:
+                return await body(client)
+            finally:
+                await client.disconnect()
+        return asyncio.run(main())
+
+    def test_pipelined_commands_get_their_own_replies(self):
+        # Jitter makes the router answer the tagged commands out of order
+        self.fake.latency_jitter = 0.05
+        queries = [f"user{index:05d}" for index in range(1, 21)]
+
+        async def body(client):
+            return await asyncio.gather(*(client.command('/ppp/secret', queries={'name': name})
+                                          for name in queries))
+
+        results = self.run_client(body)
+        self.assertEqual([[row['name'] for row in rows] for rows in results], [[name] for name in queries])
+        stats = self.fake.get_stats()
+        self.assertEqual(stats['connections'], 1)
+
+    def test_pipelined_mixed_menus(self):
+        async def body(client):
+            return await asyncio.gather(client.get_ppp_secrets(), client.get_active_ppp_connections(),
+                                        client.get_system_identity())
+
+        secrets, active, identity = self.run_client(body)
+        self.assertEqual(len(secrets), 50)
+        self.assertEqual(len(active), 20)
+        self.assertEqual(identity, 'FakeRouter')
+
+
+    def test_empty_reply_completes_without_rows(self):
+        self.fake.empty_replies = True
+
+        async def body(client):
+            empty = await client.command('/ppp/secret', queries={'name': 'nobody'})
+            # The connection stays usable after !empty and its trailing !done
+            after = await client.command('/ppp/secret', queries={'name': 'user00001'})
+            return empty, after
+
+        empty, after = self.run_client(body)
+        self.assertEqual(empty, [])
+        self.assertEqual([row['name'] for row in after], ['user00001'])
+
+    def test_unknown_reply_type_is_ignored(self):
+        async def body(client):
+            # Feed an unknown reply to the command in flight, then let it finish
+            tag = str(client._next_tag + 1)
+            command = asyncio.ensure_future(client.command('/system/identity'))
+            await asyncio.sleep(0)
+            client._dispatch(['!unknown', '=x=1', f".tag={tag}"])
+            return await command
+
+        rows = self.run_client(body)
+        self.assertEqual(rows, [{'name': 'FakeRouter'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
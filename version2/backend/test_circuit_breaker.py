@@ -0,0 +1,70 @@
+"""
+Tests for the per-router circuit breaker.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import time
+import unittest
+
+from circuit_breaker import CLOSED, OPEN, PROBING, CircuitBreaker
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def open_breaker(self, **kwargs):
+        breaker = CircuitBreaker('router_001', failure_threshold=2, **kwargs)
+        self.assertFalse(breaker.record_failure('timed out'))
+        self.assertTrue(breaker.allow_request())
+        self.assertTrue(breaker.record_failure('connection refused'))
+        return breaker
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = self.open_breaker()
+        self.assertFalse(breaker.allow_request())
+        state = breaker.get_state()
+        self.assertEqual((state['state'], state['consecutive_failures']), (OPEN, 2))
+        self.assertEqual(breaker.last_error, 'connection refused')
+        self.assertIsNotNone(state['opened_at'])
+        # Further failures while open do not report a new opening
+        self.assertFalse(breaker.record_failure(None))
+        self.assertEqual(breaker.last_error, 'connection refused')
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker('router_001', failure_threshold=2)
+        breaker.record_failure('timed out')
+        breaker.record_success()
+        self.assertFalse(breaker.record_failure('timed out'))
+        self.assertEqual(breaker.get_state()['state'], CLOSED)
+
+    def test_probe_waits_for_delay(self):
+        breaker = self.open_breaker(initial_probe_delay=60)
+        self.assertFalse(breaker.start_probe())
+        self.assertGreater(breaker.get_state()['next_probe_in'], 59)
+
+    def test_failed_probe_backs_off_and_successful_probe_closes(self):
+        breaker = self.open_breaker(initial_probe_delay=0.01, max_probe_delay=0.03)
+        time.sleep(0.02)
+        self.assertTrue(breaker.start_probe())
+        self.assertEqual(breaker.get_state()['state'], PROBING)
+        self.assertFalse(breaker.allow_request())
+        # Only one caller gets the probe
+        self.assertFalse(breaker.start_probe())
+
+        breaker.record_failure('timed out')
+        self.assertEqual(breaker.get_state()['state'], OPEN)
+        self.assertEqual(breaker._probe_delay, 0.02)
+        time.sleep(0.03)
+        self.assertTrue(breaker.start_probe())
+        breaker.record_failure('timed out')
+        self.assertEqual(breaker._probe_delay, 0.03)
+
+        time.sleep(0.04)
+        self.assertTrue(breaker.start_probe())
+        breaker.record_success()
+        state = breaker.get_state()
+        self.assertEqual((state['state'], state['consecutive_failures'], state['next_probe_in']), (CLOSED, 0, None))
+        self.assertTrue(breaker.allow_request())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for the snapshot collector.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import unittest
+
+from collector import LIVE_SOURCES, RouterSnapshot, SnapshotCollector
+
+
+class FakeRouterManager:
+
+    def get_router(self, router_id):
+        return {'id': router_id, 'enabled': True}
+
+
+class RecordingCollector(SnapshotCollector):
+    """Collector whose refresh() records the sources asked for instead of polling a router"""
+
+    def __init__(self):
+        super().__init__(FakeRouterManager(), max_workers=1)
+        self.refreshed = []
+
+    def refresh(self, router_id, sources=None):
+        self.refreshed.append(list(sources or []))
+        return self._snapshots.get(router_id)
+
+
+class IdlePollTest(unittest.TestCase):
+
+    def setUp(self):
+        self.collector = RecordingCollector()
+        self.addCleanup(self.collector._executor.shutdown)
+
+    def publish(self, **source_times):
+        self.collector._snapshots['router_001'] = RouterSnapshot('router_001', version=1, success=True,
+                                                                 source_times=source_times)
+
+    def test_idle_router_skips_fetched_live_sources(self):
+        self.publish(ppp_active='t', pppoe_interfaces='t', resources='t')
+        self.collector._poll('router_001', 0, ['resources', *LIVE_SOURCES])
+        self.assertEqual(self.collector.refreshed, [['resources']])
+        self.assertIn('router_001', self.collector._suspended)
+
+    def test_idle_router_still_fetches_live_sources_it_never_had(self):
+        # ppp_active was fetched once; pppoe_interfaces never was
+        self.publish(ppp_active='t')
+        self.collector._poll('router_001', 0, list(LIVE_SOURCES))
+        self.assertEqual(self.collector.refreshed, [['pppoe_interfaces']])
+        self.assertIn('router_001', self.collector._suspended)
+
+    def test_watched_router_polls_live_sources(self):
+        self.publish(ppp_active='t', pppoe_interfaces='t')
+        self.collector.watch('router_001')
+        self.collector._poll('router_001', 0, list(LIVE_SOURCES))
+        self.assertEqual(self.collector.refreshed, [list(LIVE_SOURCES)])
+        self.assertNotIn('router_001', self.collector._suspended)
+
+    def test_read_resumes_suspended_live_sources(self):
+        self.publish(ppp_active='t', pppoe_interfaces='t')
+        self.collector._poll('router_001', 0, list(LIVE_SOURCES))
+        self.collector.get_snapshot('router_001')
+        self.assertEqual(self.collector.refreshed, [list(LIVE_SOURCES)])
+        self.assertNotIn('router_001', self.collector._suspended)
+
+
+class VersionTest(unittest.TestCase):
+
+    def test_versions_keep_increasing_after_router_is_forgotten(self):
+        collector = SnapshotCollector(FakeRouterManager(), max_workers=1)
+        self.addCleanup(collector._executor.shutdown)
+        collector._publish(RouterSnapshot('router_001', version=7))
+        # Disabled and enabled again: the previous snapshot is gone
+        collector._snapshots.pop('router_001')
+        collector.router_manager.fetch = lambda *args: (None, 'timed out')
+        snapshot = collector._collect('router_001', None, ['identity'])
+        self.assertEqual((snapshot.version, snapshot.error), (8, 'timed out'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Tests for the columnar encoding of row lists.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import unittest
+
+from columnar_format import COLUMNAR, decode_rows, encode_lists, encode_rows, parse_format
+
+ROWS = [
+    {'id': '*1', 'name': 'alice', 'profile': 'gold', 'disabled': 'false', 'comment': 'x'},
+    {'id': '*2', 'name': 'bob', 'profile': 'gold', 'disabled': 'true'},
+    {'id': '*3', 'name': 'carol', 'profile': 'basic', 'disabled': 'false', 'uptime_seconds': 60},
+    {'id': '*4', 'name': 'dave', 'profile': 'gold', 'disabled': 'false'},
+]
+
+
+class ColumnarFormatTest(unittest.TestCase):
+
+    def test_encode_rows(self):
+        table = encode_rows(ROWS)
+        self.assertEqual(table['columns'], ['id', 'name', 'profile', 'disabled', 'comment', 'uptime_seconds'])
+        # Few distinct values: dictionary-encoded; unique names and ids are not
+        self.assertEqual(table['dictionaries'], {'profile': ['gold', 'basic'], 'disabled': ['false', 'true'],
+                                                 'comment': ['x']})
+        self.assertEqual(table['rows'][0], ['*1', 'alice', 0, 0, 0, None])
+        self.assertEqual(table['rows'][2], ['*3', 'carol', 1, 0, None, 60])
+
+    def test_round_trip(self):
+        self.assertEqual(decode_rows(encode_rows(ROWS)), ROWS)
+        self.assertEqual(encode_rows([]), {'columns': [], 'rows': [], 'dictionaries': {}})
+        self.assertEqual(decode_rows(encode_rows([])), [])
+
+    def test_encode_lists(self):
+        data = {'success': True, 'ppp_accounts': ROWS, 'ppp_active': None}
+        result = encode_lists(data, ('ppp_accounts', 'ppp_active', 'missing'))
+        self.assertEqual(decode_rows(result['ppp_accounts']), ROWS)
+        self.assertIsNone(result['ppp_active'])
+        self.assertIs(data['ppp_accounts'], ROWS)
+
+    def test_parse_format(self):
+        self.assertIsNone(parse_format(None))
+        self.assertIsNone(parse_format('rows'))
+        self.assertEqual(parse_format('columnar'), COLUMNAR)
+        with self.assertRaises(ValueError):
+            parse_format('csv')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Tests for the per-router connection pool.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import threading
+import time
+import unittest
+
+from connection_pool import RouterConnectionPool
+from router_manager import RouterManager
+
+
+class FakeClient:
+    """Stands in for a connected MikroTikClient"""
+
+    def __init__(self, number):
+        self.number = number
+        self.connected = True
+        self.alive = True
+        self.probes = 0
+
+    def is_alive(self):
+        self.probes += 1
+        return self.alive
+
+    def disconnect(self):
+        self.connected = False
+
+    def get_error(self):
+        return None if self.connected else 'connection refused'
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def make_pool(self, **kwargs):
+        self.clients = []
+
+        def factory():
+            client = FakeClient(len(self.clients))
+            self.clients.append(client)
+            return client, None
+
+        return RouterConnectionPool('router_001', factory, **kwargs)
+
+    def test_checkin_makes_connection_reusable(self):
+        pool = self.make_pool()
+        client, _ = pool.checkout()
+        pool.checkin(client)
+        self.assertEqual(pool.checkout(), (client, None))
+        stats = pool.get_stats()
+        self.assertEqual((stats['created'], stats['reused'], stats['open'], stats['in_use']), (1, 1, 1, 1))
+
+    def test_full_pool_waits_then_times_out(self):
+        pool = self.make_pool(max_size=2, checkout_timeout=0.2)
+        (first, _), (second, _) = pool.checkout(), pool.checkout()
+        client, message = pool.checkout()
+        self.assertIsNone(client)
+        self.assertIn('Timed out', message)
+        # A waiting checkout gets the connection returned meanwhile
+        threading.Timer(0.05, pool.checkin, (first,)).start()
+        self.assertIs(pool.checkout()[0], first)
+        self.assertEqual(pool.get_stats()['timeouts'], 1)
+        pool.checkin(second)
+
+    def test_stale_connection_is_probed_and_replaced(self):
+        pool = self.make_pool(liveness_interval=0)
+        client, _ = pool.checkout()
+        pool.checkin(client)
+        client.alive = False
+        replacement, _ = pool.checkout()
+        self.assertIsNot(replacement, client)
+        self.assertEqual(client.probes, 1)
+        self.assertFalse(client.connected)
+        self.assertEqual(pool.get_stats()['discarded'], 1)
+
+    def test_recently_used_connection_is_not_probed(self):
+        pool = self.make_pool(liveness_interval=60)
+        client, _ = pool.checkout()
+        pool.checkin(client)
+        self.assertIs(pool.checkout()[0], client)
+        self.assertEqual(client.probes, 0)
+
+    def test_broken_connection_is_not_kept(self):
+        pool = self.make_pool()
+        client, _ = pool.checkout()
+        client.connected = False
+        pool.checkin(client)
+        self.assertEqual(pool.get_stats()['open'], 0)
+        self.assertIsNot(pool.checkout()[0], client)
+
+    def test_discarded_connection_frees_its_slot(self):
+        pool = self.make_pool(max_size=1)
+        client, _ = pool.checkout()
+        pool.discard(client)
+        self.assertFalse(client.connected)
+        self.assertEqual(pool.get_stats()['open'], 0)
+        self.assertIsNot(pool.checkout()[0], client)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = RouterConnectionPool('router_001', lambda: (None, 'connection refused'), max_size=1,
+                                    checkout_timeout=0.1)
+        self.assertEqual(pool.checkout(), (None, 'connection refused'))
+        self.assertEqual(pool.checkout(), (None, 'connection refused'))
+        self.assertEqual(pool.get_stats()['open'], 0)
+
+    def test_reap_closes_idle_connections(self):
+        pool = self.make_pool(idle_timeout=0.05)
+        (first, _), (second, _) = pool.checkout(), pool.checkout()
+        pool.checkin(first)
+        time.sleep(0.1)
+        pool.checkin(second)
+        self.assertEqual(pool.reap(), 1)
+        self.assertFalse(first.connected)
+        self.assertTrue(second.connected)
+        self.assertEqual(pool.get_stats()['open'], 1)
+
+    def test_close_refuses_checkouts_and_drops_returned_clients(self):
+        pool = self.make_pool()
+        (idle, _), (busy, _) = pool.checkout(), pool.checkout()
+        pool.checkin(idle)
+        pool.close()
+        self.assertFalse(idle.connected)
+        self.assertIn('closed', pool.checkout()[1])
+        pool.checkin(busy)
+        self.assertFalse(busy.connected)
+        self.assertEqual(pool.get_stats()['open'], 0)
+
+
+class CheckoutClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = RouterManager()
+        self.manager.routers = {'router_001': {'id': 'router_001', 'name': 'Test Router', 'enabled': True}}
+        self.clients = []
+        self.refuse = None
+
+        def factory():
+            if self.refuse:
+                return None, self.refuse
+            client = FakeClient(len(self.clients))
+            client.collect = lambda: ['row']
+            self.clients.append(client)
+            return client, None
+
+        self.pool = self.manager.pools['router_001'] = RouterConnectionPool('router_001', factory)
+
+    def test_client_is_returned_after_use(self):
+        with self.manager.checkout_client('router_001') as (client, checkout_error):
+            self.assertIsNone(checkout_error)
+        self.assertTrue(client.connected)
+        self.assertEqual(self.pool.get_stats()['idle'], 1)
+        self.assertEqual(self.manager.fetch('router_001', 'collect'), (['row'], None))
+
+    def test_client_is_discarded_when_the_block_raises(self):
+        with self.assertRaises(KeyError):
+            with self.manager.checkout_client('router_001') as (client, _):
+                raise KeyError('reply')
+        self.assertFalse(client.connected)
+        self.assertEqual(self.pool.get_stats()['open'], 0)
+
+    def test_errors_are_returned_per_call(self):
+        self.refuse = 'connection refused'
+        self.assertEqual(self.manager.fetch('router_001', 'collect'), (None, 'connection refused'))
+        self.refuse = None
+        self.assertEqual(self.manager.fetch('router_001', 'collect'), (['row'], None))
+        self.assertEqual(self.manager.fetch('router_999', 'collect'), (None, 'Router router_999 not found'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Tests for dashboard broadcast pacing and the per-client send queues.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import time
+import unittest
+from types import SimpleNamespace
+
+from dashboard_broadcast import BroadcastCadence, ClientSendQueues
+from dashboard_delta import DELTA, FULL
+
+
+def full(seq):
+    return {'type': FULL, 'seq': seq, 'router_id': 'router_001'}
+
+
+def delta(seq, **fields):
+    return {'type': DELTA, 'seq': seq, 'base_seq': seq - 1, 'router_id': 'router_001', 'set': fields, 'lists': {}}
+
+
+class BroadcastCadenceTest(unittest.TestCase):
+
+    def test_target_interval_from_start(self):
+        cadence = BroadcastCadence(3)
+        self.assertEqual(cadence.next_due('router_001'), 0.0)
+        self.assertEqual(cadence.record('router_001', 100.0, 0.1), 3)
+        self.assertEqual(cadence.next_due('router_001'), 103.0)
+
+    def test_stretches_for_cost_poll_duration_and_load(self):
+        cadence = BroadcastCadence(3, max_interval=30)
+        self.assertEqual(cadence.record('r1', 0.0, 2.0), 4.0)
+        self.assertEqual(cadence.record('r2', 0.0, 0.1, SimpleNamespace(duration=5.0, resources={})), 5.0)
+        self.assertEqual(cadence.record('r3', 0.0, 0.1, SimpleNamespace(duration=0.2, resources={'cpu-load': '90'})), 6)
+        self.assertEqual(cadence.record('r4', 0.0, 100.0), 30)
+        cadence.forget('r4')
+        self.assertEqual(cadence.interval('r4'), 3)
+
+
+class ClientSendQueuesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.full_messages = {}
+        self.queues = ClientSendQueues(self.full_messages.get, max_in_flight=2)
+        self.queues.sent('sid', 'router_001', full(1))
+
+    def test_client_that_keeps_up_gets_every_message(self):
+        self.assertEqual(self.queues.offer('sid', delta(2))['seq'], 2)
+        self.queues.ack('sid', 2)
+        self.assertEqual(self.queues.offer('sid', delta(3))['seq'], 3)
+        self.assertEqual(self.queues.backlog('sid'), 1)
+
+    def test_slow_client_gets_merged_delta_on_ack(self):
+        self.queues.offer('sid', delta(2, timestamp='a'))
+        self.assertIsNone(self.queues.offer('sid', delta(3, timestamp='b')))
+        self.assertIsNone(self.queues.offer('sid', delta(4, uptime='1m')))
+        # Old or duplicate messages are ignored
+        self.assertIsNone(self.queues.offer('sid', delta(2)))
+        message = self.queues.ack('sid', 1)
+        self.assertEqual((message['seq'], message['base_seq']), (4, 2))
+        self.assertEqual(message['set'], {'timestamp': 'b', 'uptime': '1m'})
+        self.assertIsNone(self.queues.ack('sid', 4))
+
+    def test_broken_chain_falls_back_to_full_state(self):
+        self.queues.offer('sid', delta(2))
+        self.queues.offer('sid', delta(3))
+        # Seq 4 is missing: 5 cannot be merged onto 3
+        self.queues.offer('sid', delta(5))
+        self.full_messages['router_001'] = full(5)
+        self.assertEqual(self.queues.ack('sid', 2)['type'], FULL)
+
+    def test_unacknowledged_messages_expire(self):
+        queues = ClientSendQueues(self.full_messages.get, max_in_flight=1, ack_timeout=0.05)
+        queues.sent('sid', 'router_001', full(1))
+        self.assertIsNone(queues.offer('sid', delta(2)))
+        time.sleep(0.06)
+        self.assertEqual(queues.offer('sid', delta(3))['base_seq'], 1)
+
+    def test_unknown_or_removed_client(self):
+        self.queues.remove('sid')
+        self.assertIsNone(self.queues.offer('sid', delta(2)))
+        self.assertIsNone(self.queues.ack('sid', 2))
+        self.assertEqual(self.queues.backlog('sid'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for the dashboard_update delta stream.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import unittest
+
+from dashboard_delta import DELTA, FULL, DashboardStream, diff_rows, merge_deltas, row_key
+
+
+def dashboard(router_id='router_001', **fields):
+    data = {'success': True, 'router_id': router_id, 'timestamp': '2026-01-01T00:00:00',
+            'ppp_accounts': [], 'ppp_active': [], 'pppoe_interfaces': []}
+    data.update(fields)
+    return data
+
+
+def apply_delta(state, message):
+    """Apply a delta message the way the dashboard client does"""
+    state = {**state, **message['set']}
+    for field, diff in message['lists'].items():
+        rows = {row_key(row): row for row in state[field] if row_key(row) not in diff['removed']}
+        for patch in diff['changed']:
+            rows[row_key(patch)] = {**rows[row_key(patch)], **patch}
+        for row in diff['added']:
+            rows[row_key(row)] = row
+        state[field] = sorted(rows.values(), key=row_key)
+    return state
+
+
+class DiffRowsTest(unittest.TestCase):
+
+    def test_added_removed_and_changed(self):
+        old = [{'id': '*1', 'name': 'alice', 'uptime': '1m'}, {'id': '*2', 'name': 'bob'}]
+        new = [{'id': '*1', 'name': 'alice', 'uptime': '2m'}, {'id': '*3', 'name': 'carol'}]
+        self.assertEqual(diff_rows(old, new), {
+            'added': [{'id': '*3', 'name': 'carol'}],
+            'removed': ['*2'],
+            'changed': [{'id': '*1', 'uptime': '2m'}],
+        })
+
+    def test_rows_without_id_are_keyed_by_name(self):
+        diff = diff_rows([{'name': 'alice', 'profile': 'a'}], [{'name': 'alice', 'profile': 'b'}])
+        self.assertEqual(diff['changed'], [{'name': 'alice', 'profile': 'b'}])
+
+    def test_row_that_lost_fields_is_replaced(self):
+        diff = diff_rows([{'id': '*1', 'name': 'alice', 'comment': 'x'}], [{'id': '*1', 'name': 'alice'}])
+        self.assertEqual(diff, {'added': [{'id': '*1', 'name': 'alice'}], 'removed': ['*1'], 'changed': []})
+
+    def test_unchanged(self):
+        rows = [{'id': '*1', 'name': 'alice'}]
+        self.assertIsNone(diff_rows(rows, rows))
+        self.assertIsNone(diff_rows(rows, [dict(rows[0])]))
+
+
+class DashboardStreamTest(unittest.TestCase):
+
+    def test_full_then_delta(self):
+        stream = DashboardStream()
+        self.assertIsNone(stream.full_message())
+        first = stream.publish(dashboard(ppp_active=[{'id': '*1', 'name': 'alice'}]))
+        self.assertEqual((first['type'], first['seq']), (FULL, 1))
+
+        second = stream.publish(dashboard(timestamp='2026-01-01T00:00:03', ppp_active=[]))
+        self.assertEqual((second['type'], second['seq'], second['base_seq']), (DELTA, 2, 1))
+        self.assertEqual(second['set'], {'timestamp': '2026-01-01T00:00:03'})
+        self.assertEqual(second['lists'], {'ppp_active': {'added': [], 'removed': ['*1'], 'changed': []}})
+        self.assertEqual(stream.full_message()['seq'], 2)
+        self.assertEqual(stream.full_message()['ppp_active'], [])
+
+    def test_router_switch_and_errors_send_full_state(self):
+        stream = DashboardStream()
+        stream.publish(dashboard())
+        self.assertEqual(stream.publish(dashboard('router_002'))['type'], FULL)
+        self.assertEqual(stream.publish({'success': False, 'router_id': 'router_002', 'error': 'down'})['type'], FULL)
+        self.assertEqual(stream.publish(dashboard('router_002'))['type'], FULL)
+        self.assertEqual(stream.publish(dashboard('router_002'))['type'], DELTA)
+
+
+class MergeDeltasTest(unittest.TestCase):
+
+    def test_merged_delta_matches_applying_both(self):
+        states = [
+            dashboard(ppp_active=[{'id': '*1', 'name': 'alice', 'uptime': '1m'}, {'id': '*2', 'name': 'bob'}]),
+            # *1 changes, *2 goes away, *3 appears
+            dashboard(timestamp='b', ppp_active=[{'id': '*1', 'name': 'alice', 'uptime': '2m'},
+                                                 {'id': '*3', 'name': 'carol', 'comment': 'x'}]),
+            # *1 changes again, *2 comes back, *3 loses a field, *1's patch and *3's add combine
+            dashboard(timestamp='c', ppp_active=[{'id': '*1', 'name': 'alice', 'uptime': '3m'},
+                                                 {'id': '*2', 'name': 'bob'}, {'id': '*3', 'name': 'carol'}]),
+            # *3 goes away again
+            dashboard(timestamp='d', ppp_active=[{'id': '*1', 'name': 'alice', 'uptime': '3m'},
+                                                 {'id': '*2', 'name': 'bob'}]),
+        ]
+        stream = DashboardStream()
+        stream.publish(states[0])
+        messages = [stream.publish(state) for state in states[1:]]
+        for first in range(len(messages)):
+            for last in range(first + 1, len(messages)):
+                merged = messages[first]
+                for message in messages[first + 1:last + 1]:
+                    merged = merge_deltas(merged, message)
+                with self.subTest(first=first, last=last):
+                    self.assertEqual((merged['base_seq'], merged['seq']),
+                                     (messages[first]['base_seq'], messages[last]['seq']))
+                    expected = apply_delta(states[first], messages[first])
+                    for message in messages[first + 1:last + 1]:
+                        expected = apply_delta(expected, message)
+                    self.assertEqual(apply_delta(states[first], merged), expected)
+                    self.assertEqual(expected['ppp_active'], states[last + 1]['ppp_active'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for ?fields= parsing and row projection.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from field_projection import DEFAULT_FIELDS, parse_fields, project, project_rows, projection_key
+
+SUMMARY_LISTS = {'ppp_secrets': 'ppp_secrets', 'ppp_active': 'ppp_active'}
+
+
+class ParseFieldsTest(unittest.TestCase):
+
+    def test_defaults(self):
+        self.assertEqual(parse_fields(None, SUMMARY_LISTS, 'ppp_secrets'),
+                         {name: DEFAULT_FIELDS[name] for name in SUMMARY_LISTS})
+        self.assertEqual(parse_fields('', SUMMARY_LISTS, 'ppp_secrets', defaults=False),
+                         {'ppp_secrets': None, 'ppp_active': None})
+
+    def test_primary_and_qualified_fields(self):
+        projection = parse_fields(' comment, name ,ppp_active.address,', SUMMARY_LISTS, 'ppp_secrets')
+        # Known-field order, with id always kept
+        self.assertEqual(projection, {'ppp_secrets': ('id', 'name', 'comment'), 'ppp_active': ('id', 'address')})
+        self.assertEqual(parse_fields(['ppp_active.*'], SUMMARY_LISTS, 'ppp_secrets')['ppp_active'], None)
+        self.assertEqual(parse_fields('*', SUMMARY_LISTS, 'ppp_secrets'), {'ppp_secrets': None, 'ppp_active': None})
+        self.assertEqual(parse_fields('name,*', SUMMARY_LISTS, 'ppp_secrets')['ppp_secrets'], None)
+
+    def test_invalid_specs_raise_value_error(self):
+        # The endpoints answer these with 400 and the message
+        for spec, primary in (('nonexistent', 'ppp_secrets'), ('ppp_active.password', 'ppp_secrets'),
+                              ('name', None), ([1], 'ppp_secrets')):
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    parse_fields(spec, SUMMARY_LISTS, primary)
+        with self.assertRaisesRegex(ValueError, 'known fields: id, name'):
+            parse_fields('bogus', SUMMARY_LISTS, 'ppp_secrets')
+
+
+class ProjectTest(unittest.TestCase):
+
+    def test_project(self):
+        data = {'success': True, 'ppp_secrets': [{'id': '*1', 'name': 'alice', 'password': 'x'}],
+                'ppp_active': [{'id': '*a', 'name': 'alice', 'uptime': '1m'}]}
+        projection = {'ppp_secrets': ('id', 'name', 'comment'), 'ppp_active': None}
+        result = project(data, projection)
+        self.assertEqual(result['ppp_secrets'], [{'id': '*1', 'name': 'alice'}])
+        self.assertIs(result['ppp_active'], data['ppp_active'])
+        self.assertEqual(data['ppp_secrets'][0]['password'], 'x')
+        self.assertIs(project(data, {'ppp_secrets': None}), data)
+        rows = [{'id': '*1'}]
+        self.assertIs(project_rows(rows, None), rows)
+
+    def test_projection_key(self):
+        self.assertEqual(projection_key({'ppp_secrets': ('id', 'name'), 'ppp_active': None}), 'ppp_secrets=id,name')
+        self.assertEqual(projection_key({'ppp_secrets': None}), '')
+
+
+class FieldsParameterTest(unittest.TestCase):
+    """The list endpoints reject unknown fields with 400"""
+
+    @classmethod
+    def setUpClass(cls):
+        # The app loads its routers from data/ in the working directory; start it without any
+        cls.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(cls.directory.name, 'data'))
+        with open(os.path.join(cls.directory.name, 'data', 'routers.json'), 'w') as f:
+            json.dump([], f)
+        cwd = os.getcwd()
+        os.chdir(cls.directory.name)
+        try:
+            import app
+        finally:
+            os.chdir(cwd)
+        cls.client = app.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_unknown_field_is_a_bad_request(self):
+        for path in ('/api/interfaces?fields=bogus', '/api/ppp_active?fields=password',
+                     '/api/ppp_accounts?fields=ppp_active.name'):
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+                self.assertIn('field', response.get_json()['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Tests for EncodedJSON serialization and compression.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import gzip
+import json
+import unittest
+
+from json_payload import EncodedJSON, SocketJSON
+
+ROWS = {'success': True, 'rows': [{'name': f"user{index:05d}", 'rx': index * 7} for index in range(2000)]}
+
+
+class EncodedJSONTest(unittest.TestCase):
+
+    def test_body_and_variants(self):
+        payload = EncodedJSON(ROWS)
+        self.assertEqual(json.loads(payload.body), ROWS)
+        self.assertEqual(json.loads(payload.text), ROWS)
+        self.assertEqual((payload['success'], payload.get('missing'), len(payload)), (True, None, len(payload.body)))
+        self.assertIs(payload.encoded(None), payload.body)
+        compressed = payload.encoded('gzip')
+        self.assertIs(payload.encoded('gzip'), compressed)
+        self.assertEqual(gzip.decompress(compressed), payload.body)
+        with self.assertRaises(ValueError):
+            payload.encoded('compress')
+
+    def test_etag(self):
+        payload = EncodedJSON(ROWS)
+        self.assertNotEqual(payload.etag(None), payload.etag('gzip'))
+        # Equal documents get equal tags, so an unchanged view keeps its tag
+        self.assertEqual(payload.etag('gzip'), EncodedJSON(dict(ROWS)).etag('gzip'))
+        self.assertNotEqual(payload.etag(), EncodedJSON({**ROWS, 'success': False}).etag())
+
+    def test_with_fields(self):
+        payload = EncodedJSON(ROWS)
+        for current_time in ('2026-01-01 00:00:00', '2026-01-01 00:00:01'):
+            fields = {'current_time': current_time}
+            body = payload.with_fields(fields, None)
+            self.assertEqual(json.loads(body), {**ROWS, **fields})
+            # The cached compressed head followed by the fresh tail is one valid gzip member
+            self.assertEqual(gzip.decompress(payload.with_fields(fields, 'gzip')), body)
+
+    def test_with_fields_on_empty_and_nested_objects(self):
+        self.assertEqual(json.loads(EncodedJSON({}).with_fields({'a': 1}, None)), {'a': 1})
+        payload = EncodedJSON({'success': True, 'data': {'rows': [1, 2]}})
+        body = gzip.decompress(payload.with_fields({'export_time': 'now'}, 'gzip', ('data',)))
+        self.assertEqual(json.loads(body), {'success': True, 'data': {'rows': [1, 2], 'export_time': 'now'}})
+        with self.assertRaises(ValueError):
+            EncodedJSON({'data': {}, 'success': True}).with_fields({'a': 1}, None, ('data',))
+
+    def test_socket_json_sends_encoded_payloads_as_is(self):
+        payload = EncodedJSON({'seq': 1})
+        packet = SocketJSON.dumps(['dashboard_update', payload])
+        self.assertEqual(packet, '["dashboard_update",' + payload.text + ']')
+        self.assertEqual(SocketJSON.loads(packet), ['dashboard_update', {'seq': 1}])
+        self.assertEqual(SocketJSON.loads(SocketJSON.dumps({'a': 1})), {'a': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Tests for the IP/MAC lookup index.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import unittest
+from types import SimpleNamespace
+
+from lookup_index import IP, MAC, LookupIndex, normalize_ip, normalize_mac
+
+
+def snapshot(router_id, version, ppp_active=(), pppoe_interfaces=(), dhcp_leases=()):
+    return SimpleNamespace(router_id=router_id, version=version, ppp_active=list(ppp_active),
+                           pppoe_interfaces=list(pppoe_interfaces), dhcp_leases=list(dhcp_leases))
+
+
+class NormalizeTest(unittest.TestCase):
+
+    def test_normalize_mac(self):
+        for value in ('aa:bb:cc:dd:ee:0f', 'AA-BB-CC-DD-EE-0F', 'aabb.ccdd.ee0f', 'AABBCCDDEE0F', ' aa bb cc dd ee 0f'):
+            with self.subTest(value=value):
+                self.assertEqual(normalize_mac(value), 'AA:BB:CC:DD:EE:0F')
+        for value in ('aa:bb:cc:dd:ee', 'gg:bb:cc:dd:ee:ff', '10.0.0.1', ''):
+            with self.subTest(value=value):
+                self.assertIsNone(normalize_mac(value))
+
+    def test_normalize_ip(self):
+        self.assertEqual(normalize_ip(' 10.0.0.1 '), '10.0.0.1')
+        self.assertEqual(normalize_ip('2001:DB8:0:0::1'), '2001:db8::1')
+        self.assertIsNone(normalize_ip('10.0.0.256'))
+
+
+class LookupIndexTest(unittest.TestCase):
+
+    def test_lookup_across_routers_and_sources(self):
+        index = LookupIndex()
+        session = {'id': '*1', 'name': 'alice', 'address': '10.0.0.1', 'caller-id': 'aa:bb:cc:dd:ee:01'}
+        lease = {'id': '*9', 'address': '192.168.1.5', 'mac-address': 'AA-BB-CC-DD-EE-01'}
+        index.sync([snapshot('r1', 1, ppp_active=[session]), snapshot('r2', 1, dhcp_leases=[lease])])
+        self.assertEqual(sorted(index.lookup(MAC, 'AA:BB:CC:DD:EE:01'), key=lambda match: match[0]),
+                         [('r1', 'ppp_active', session), ('r2', 'dhcp_leases', lease)])
+        self.assertEqual(index.lookup(IP, '10.0.0.1'), [('r1', 'ppp_active', session)])
+        self.assertEqual(index.lookup(IP, '10.0.0.2'), [])
+
+    def test_sync_updates_changed_rows_and_drops_routers(self):
+        index = LookupIndex()
+        first = snapshot('r1', 1, ppp_active=[{'id': '*1', 'name': 'alice', 'address': '10.0.0.1'}])
+        self.assertEqual(index.sync([first, snapshot('r2', 1, ppp_active=[{'id': '*1', 'address': '10.0.0.9'}])]), 2)
+        self.assertEqual(index.sync([first]), 1)
+        self.assertEqual(index.lookup(IP, '10.0.0.9'), [])
+        # The session got a new address; an unchanged version is not re-read
+        moved = snapshot('r1', 2, ppp_active=[{'id': '*1', 'name': 'alice', 'address': '10.0.0.2'}])
+        self.assertEqual(index.sync([moved]), 1)
+        self.assertEqual(index.lookup(IP, '10.0.0.1'), [])
+        self.assertEqual(index.lookup(IP, '10.0.0.2')[0][2]['name'], 'alice')
+        self.assertEqual(index.sync([moved]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for session rates computed from byte counters.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import unittest
+
+from rate_engine import COUNTER_MODULUS, MAX_SAMPLE_INTERVAL, RateEngine, counter_delta, get_rate_smoothing
+
+
+def interface(name, rx_bytes, tx_bytes, interface_id='*1'):
+    return {'id': interface_id, 'name': name, 'rx-byte': str(rx_bytes), 'tx-byte': str(tx_bytes)}
+
+
+class CounterDeltaTest(unittest.TestCase):
+
+    def test_increase(self):
+        self.assertEqual(counter_delta(100, 250), 150)
+        self.assertEqual(counter_delta(5, 5), 0)
+
+    def test_wraparound(self):
+        self.assertEqual(counter_delta(COUNTER_MODULUS - 10, 5), 15)
+        self.assertEqual(counter_delta(COUNTER_MODULUS - 1, 0), 1)
+
+    def test_reset(self):
+        self.assertIsNone(counter_delta(1_000_000, 10))
+        # Far from 2^64: a decrease is a reset, not a wrap
+        self.assertIsNone(counter_delta(COUNTER_MODULUS // 2, 10))
+
+
+class RateEngineTest(unittest.TestCase):
+
+    def test_rate_from_two_samples(self):
+        engine = RateEngine()
+        first = [interface('<pppoe-a>', 1000, 2000)]
+        self.assertIs(engine.apply(first, at=10.0)[0], first[0])
+        row = engine.apply([interface('<pppoe-a>', 2000, 4000)], at=12.0)[0]
+        self.assertEqual((row['rx_rate'], row['tx_rate']), ('4000', '8000'))
+
+    def test_rate_across_wraparound(self):
+        engine = RateEngine()
+        engine.apply([interface('<pppoe-a>', COUNTER_MODULUS - 500, 0)], at=0.0)
+        row = engine.apply([interface('<pppoe-a>', 500, 0)], at=1.0)[0]
+        self.assertEqual(row['rx_rate'], '8000')
+
+    def test_reconnect_starts_over(self):
+        engine = RateEngine()
+        engine.apply([interface('<pppoe-a>', 5000, 5000)], at=0.0)
+        # Counters went back: no rate for this sample
+        self.assertNotIn('rx_rate', engine.apply([interface('<pppoe-a>', 10, 10)], at=1.0)[0])
+        # A new .id under the same name is a new session too
+        self.assertNotIn('rx_rate', engine.apply([interface('<pppoe-a>', 20, 20, '*2')], at=2.0)[0])
+        self.assertEqual(engine.apply([interface('<pppoe-a>', 120, 20, '*2')], at=3.0)[0]['rx_rate'], '800')
+
+    def test_disconnect_forgets_session(self):
+        engine = RateEngine()
+        engine.apply([interface('<pppoe-a>', 0, 0), interface('<pppoe-b>', 0, 0)], at=0.0)
+        engine.apply([interface('<pppoe-a>', 100, 100)], at=1.0)
+        self.assertEqual(len(engine), 1)
+        self.assertNotIn('rx_rate', engine.apply([interface('<pppoe-b>', 100, 100)], at=2.0)[0])
+
+    def test_gap_starts_over(self):
+        engine = RateEngine()
+        engine.apply([interface('<pppoe-a>', 0, 0)], at=0.0)
+        # Polling was suspended: no average over the whole gap
+        self.assertNotIn('rx_rate', engine.apply([interface('<pppoe-a>', 100, 100)], at=MAX_SAMPLE_INTERVAL + 1)[0])
+        self.assertEqual(engine.apply([interface('<pppoe-a>', 200, 100)], at=MAX_SAMPLE_INTERVAL + 2)[0]['rx_rate'], '800')
+
+    def test_smoothing(self):
+        engine = RateEngine(smoothing=0.5)
+        engine.apply([interface('<pppoe-a>', 0, 0)], at=0.0)
+        engine.apply([interface('<pppoe-a>', 1000, 0)], at=1.0)
+        row = engine.apply([interface('<pppoe-a>', 1000, 0)], at=2.0)[0]
+        self.assertEqual(row['rx_rate'], '4000')
+
+    def test_get_rate_smoothing(self):
+        self.assertEqual(get_rate_smoothing({'rate_smoothing': '0.3'}), 0.3)
+        self.assertEqual(get_rate_smoothing({'rate_smoothing': 0}), 1.0)
+        self.assertEqual(get_rate_smoothing({}), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for the RouterOS API word and sentence codec.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import asyncio
+import unittest
+
+from routeros_protocol import (
+    RouterOsProtocolError, build_command, decode_length, encode_length, encode_sentence,
+    length_prefix_size, parse_sentence, read_sentence
+)
+
+
+class LengthPrefixTest(unittest.TestCase):
+
+    def test_round_trip_at_prefix_size_boundaries(self):
+        for length, size in ((0, 1), (0x7F, 1), (0x80, 2), (0x3FFF, 2), (0x4000, 3), (0x1FFFFF, 3),
+                             (0x200000, 4), (0xFFFFFFF, 4), (0x10000000, 5), (0xFFFFFFFF, 5)):
+            with self.subTest(length=hex(length)):
+                prefix = encode_length(length)
+                self.assertEqual(len(prefix), size)
+                self.assertEqual(length_prefix_size(prefix[0]), size)
+                self.assertEqual(decode_length(prefix), length)
+
+    def test_known_encodings(self):
+        self.assertEqual(encode_length(0x7F), b'\x7f')
+        self.assertEqual(encode_length(0x80), b'\x80\x80')
+        self.assertEqual(encode_length(0x4000), b'\xc0\x40\x00')
+        self.assertEqual(encode_length(0x200000), b'\xe0\x20\x00\x00')
+        self.assertEqual(encode_length(0x10000000), b'\xf0\x10\x00\x00\x00')
+
+    def test_out_of_range(self):
+        with self.assertRaises(RouterOsProtocolError):
+            encode_length(-1)
+        with self.assertRaises(RouterOsProtocolError):
+            encode_length(0x100000000)
+        with self.assertRaises(RouterOsProtocolError):
+            length_prefix_size(0xF8)
+
+
+class SentenceTest(unittest.TestCase):
+
+    def test_build_command(self):
+        words = build_command('/ppp/secret/', arguments={'detail': ''}, queries={'name': 'a'},
+                              proplist=['.id', 'name'], tag='7')
+        self.assertEqual(words, ['/ppp/secret/print', '=detail=', '=.proplist=.id,name', '?name=a', '.tag=7'])
+
+    def test_parse_sentence_maps_id(self):
+        reply_type, tag, attributes = parse_sentence(['!re', '=.id=*1', '=name=a=b', '.tag=3'])
+        self.assertEqual((reply_type, tag), ('!re', '3'))
+        self.assertEqual(attributes, {'id': '*1', 'name': 'a=b'})
+
+    def test_read_sentence_from_split_stream(self):
+        long_value = 'x' * 0x5000
+        first = ['!re', f"=comment={long_value}", '.tag=1']
+        stream = encode_sentence(first) + encode_sentence(['!done', '.tag=1'])
+
+        async def read(chunk_size):
+            reader = asyncio.StreamReader()
+            # Deliver the bytes in chunks that cut through prefixes and words
+            for start in range(0, len(stream), chunk_size):
+                reader.feed_data(stream[start:start + chunk_size])
+            reader.feed_eof()
+            sentences = [await read_sentence(reader), await read_sentence(reader)]
+            with self.assertRaises(asyncio.IncompleteReadError):
+                await read_sentence(reader)
+            return sentences
+
+        for chunk_size in (1, 3, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(asyncio.run(read(chunk_size)), [first, ['!done', '.tag=1']])
+
+
+if __name__ == '__main__':
+    unittest.main()
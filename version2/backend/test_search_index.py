@@ -0,0 +1,70 @@
+"""
+Tests for the incremental account search index.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import unittest
+from types import SimpleNamespace
+
+from search_index import EXACT, PREFIX, SUBSTRING, SearchIndex
+
+
+def snapshot(version, secrets, active=()):
+    return SimpleNamespace(version=version, ppp_secrets=list(secrets), ppp_active=list(active))
+
+
+SECRETS = [
+    {'id': '*1', 'name': 'alice', 'comment': 'Main street 12'},
+    {'id': '*2', 'name': 'alicia', 'caller-id': 'AA:BB:CC:00:00:01'},
+    {'id': '*3', 'name': 'bob', 'comment': 'near alice'},
+]
+
+
+class SearchIndexTest(unittest.TestCase):
+
+    def test_exact_prefix_and_substring(self):
+        index = SearchIndex()
+        index.sync(snapshot(1, SECRETS))
+        results = index.search('ALICE')
+        self.assertEqual([(r['name'], r['match']) for r in results],
+                         [('alice', EXACT), ('bob', SUBSTRING)])
+        self.assertEqual([(r['name'], r['match']) for r in index.search('ali')],
+                         [('alice', PREFIX), ('alicia', PREFIX), ('bob', SUBSTRING)])
+        self.assertEqual(index.search('street')[0]['field'], 'secret.comment')
+        self.assertEqual(index.search('cc:00')[0]['name'], 'alicia')
+        # Substrings shorter than the n-gram length only match prefixes
+        self.assertEqual(index.search('li'), [])
+        self.assertEqual(len(index.search('a', limit=1)), 1)
+
+    def test_incremental_sync(self):
+        index = SearchIndex()
+        self.assertEqual(index.sync(snapshot(1, SECRETS)), 3)
+        self.assertEqual(index.sync(snapshot(1, SECRETS)), 0)
+        changed = [SECRETS[0], {'id': '*2', 'name': 'alicia', 'caller-id': 'AA:BB:CC:00:00:02'}]
+        # One row changed, one row (bob) removed
+        self.assertEqual(index.sync(snapshot(2, changed, [{'id': '*a', 'name': 'alice', 'address': '10.0.0.7'}])), 3)
+        self.assertEqual(index.search('bob'), [])
+        self.assertEqual(index.search('00:01'), [])
+        self.assertEqual(index.search('00:02')[0]['name'], 'alicia')
+        self.assertEqual(index.search('10.0.0.7')[0], {'name': 'alice', 'field': 'active.address',
+                                                        'value': '10.0.0.7', 'match': EXACT})
+
+    def test_older_snapshot_does_not_roll_back(self):
+        index = SearchIndex()
+        index.sync(snapshot(2, SECRETS))
+        self.assertEqual(index.sync(snapshot(1, SECRETS[:1])), 0)
+        self.assertEqual(index.search('bob')[0]['name'], 'bob')
+        self.assertEqual(index.version, 2)
+
+    def test_many_changes_rebuild_consistently(self):
+        secrets = [{'id': f"*{index}", 'name': f"user{index:04d}"} for index in range(500)]
+        index = SearchIndex()
+        index.sync(snapshot(1, secrets))
+        index.sync(snapshot(2, secrets[:250] + [{'id': '*x', 'name': 'zed'}]))
+        self.assertEqual(len(index), 251)
+        self.assertEqual([r['name'] for r in index.search('user0249')], ['user0249'])
+        self.assertEqual(index.search('user0250'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for the columnar PPP account table.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import os
+import time
+import unittest
+from datetime import datetime, timezone
+
+from session_columns import SessionColumns, member_name, parse_duration, parse_timestamps
+
+SECRETS = [
+    {'id': '*1', 'name': 'alice', 'disabled': 'false'},
+    {'id': '*2', 'name': 'Bob', 'disabled': 'true'},
+    {'id': '*3', 'name': 'carol', 'disabled': 'false', 'last-logged-out': '2026-01-01 10:00:00'},
+]
+ACTIVE = [{'id': '*a', 'name': 'alice', 'uptime': '1d2h3m4s'}]
+INTERFACES = [{'id': '*i', 'name': '<pppoe-alice>', 'rx-byte': '100', 'tx-byte': '200', 'rx_rate': '8000'}]
+
+
+class SessionColumnsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = SessionColumns(SECRETS, ACTIVE, INTERFACES)
+
+    def test_columns(self):
+        self.assertEqual(self.columns.online.tolist(), [True, False, False])
+        self.assertEqual(self.columns.disabled.tolist(), [False, True, False])
+        self.assertEqual(self.columns.uptime_seconds.tolist(), [93784, -1, -1])
+        self.assertEqual(self.columns.rx_bytes.tolist(), [100, 0, 0])
+        self.assertEqual(self.columns.rx_rate.tolist(), [8000.0, 0.0, 0.0])
+        self.assertEqual(self.columns.statistics(), {
+            'total_accounts': 3, 'online_accounts': 1, 'offline_accounts': 2,
+            'enabled_accounts': 2, 'disabled_accounts': 1})
+
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration('1w2d3h4m5s'), 788645)
+        self.assertEqual(parse_duration('1d02:03:04'), 93784)
+        self.assertEqual(parse_duration(''), -1)
+        self.assertEqual(parse_duration('soon'), -1)
+
+    def test_member_name(self):
+        self.assertEqual(member_name('alice'), 'alice')
+        self.assertEqual(member_name({'name': 'bob'}), 'bob')
+
+    def test_group_counts_count_every_membership(self):
+        groups = [
+            {'id': 'g1', 'accounts': ['alice', 'bob', 'nobody']},
+            # Same account twice and as an object: counted once
+            {'id': 'g2', 'accounts': ['ALICE', {'name': 'alice'}, 'carol']},
+            {'id': 'g3', 'accounts': []},
+        ]
+        self.assertEqual(self.columns.group_counts(groups), [
+            {'total': 2, 'online': 1, 'offline': 1, 'disabled': 1},
+            {'total': 2, 'online': 1, 'offline': 1, 'disabled': 0},
+            {'total': 0, 'online': 0, 'offline': 0, 'disabled': 0},
+        ])
+
+    def test_group_counts_without_groups(self):
+        self.assertEqual(self.columns.group_counts([]), [])
+
+
+class ParseTimestampsTest(unittest.TestCase):
+
+    def setUp(self):
+        # Local time with DST: UTC-5 in winter, UTC-4 in summer
+        previous = os.environ.get('TZ')
+        os.environ['TZ'] = 'America/New_York'
+        time.tzset()
+
+        def restore():
+            if previous is None:
+                os.environ.pop('TZ', None)
+            else:
+                os.environ['TZ'] = previous
+            time.tzset()
+
+        self.addCleanup(restore)
+
+    def test_local_times_in_and_out_of_dst(self):
+        values = ['2026-01-15 12:00:00', '2026-07-15 12:00:00', '2026-07-15 12:30:05', 'never', None]
+        expected = [datetime(2026, 1, 15, 17, tzinfo=timezone.utc).timestamp(),
+                    datetime(2026, 7, 15, 16, tzinfo=timezone.utc).timestamp(),
+                    datetime(2026, 7, 15, 16, 30, 5, tzinfo=timezone.utc).timestamp()]
+        result = parse_timestamps(values)
+        self.assertEqual(result[:3].tolist(), expected)
+        self.assertTrue(all(value != value for value in result[3:]))
+
+    def test_matches_parsing_one_by_one(self):
+        # Hours around the spring and autumn changes
+        values = [f"2026-03-08 {hour:02d}:15:00" for hour in (0, 1, 3, 4)] + \
+                 [f"2026-11-01 {hour:02d}:15:00" for hour in (0, 2, 3)]
+        self.assertEqual(parse_timestamps(values).tolist(),
+                         [datetime.strptime(value, '%Y-%m-%d %H:%M:%S').timestamp() for value in values])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the listen-based session tracker.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+import session_tracker
+from session_tracker import SessionTable, SessionTracker
+
+
+class FakeListenClient:
+    """Answers listen() with a fixed print and notification list per menu, then idles until closed"""
+
+    def __init__(self, rows, notifications):
+        self.rows = rows
+        self.notifications = notifications
+        self.closed = threading.Event()
+
+    def listen(self, path, proplist=None, timeout=None):
+        return list(self.rows.get(path, [])), self._notify(path)
+
+    def _notify(self, path):
+        yield from self.notifications.get(path, [])
+        self.closed.wait()
+
+    def disconnect(self):
+        self.closed.set()
+
+    def get_error(self):
+        return None
+
+
+ROWS = {'/ppp/active': [{'id': '*1', 'name': 'alice'}],
+        '/interface': [{'id': '*i', 'name': 'ether1', 'type': 'ether'}]}
+NOTIFICATIONS = {'/ppp/active': [{'id': '*2', 'name': 'bob'}, {'id': '*1', '.dead': 'true'}],
+                 '/interface': [{'id': '*p', 'name': '<pppoe-bob>', 'type': 'pppoe-in'}]}
+
+
+class SessionTableTest(unittest.TestCase):
+
+    def test_apply_notifications(self):
+        table = SessionTable()
+        table.replace_all([{'id': '*1', 'name': 'alice', 'address': '10.0.0.1'}])
+        self.assertEqual(table.version, 1)
+        self.assertIsNotNone(table.last_resync)
+
+        self.assertTrue(table.apply({'id': '*2', 'name': 'bob'}))
+        # A modification carries the item's properties and merges into the row
+        self.assertTrue(table.apply({'id': '*1', 'address': '10.0.0.9'}))
+        self.assertFalse(table.apply({'id': '*1', 'address': '10.0.0.9'}))
+        self.assertTrue(table.apply({'id': '*2', '.dead': 'true'}))
+        self.assertFalse(table.apply({'id': '*2', '.dead': 'true'}))
+        self.assertFalse(table.apply({'name': 'no id'}))
+        self.assertEqual(table.rows(), [{'id': '*1', 'name': 'alice', 'address': '10.0.0.9'}])
+        self.assertEqual(table.version, 4)
+
+    def test_row_filter(self):
+        table = SessionTable(lambda row: row.get('type') == 'pppoe-in')
+        table.replace_all([{'id': '*1', 'type': 'pppoe-in'}, {'id': '*2', 'type': 'ether'}])
+        self.assertEqual(len(table), 1)
+        self.assertFalse(table.apply({'id': '*3', 'type': 'ether'}))
+        # A row that stops matching the filter leaves the table
+        self.assertTrue(table.apply({'id': '*1', 'type': 'ether'}))
+        self.assertEqual(len(table), 0)
+
+
+class SessionTrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(session_tracker, 'LISTEN_PUBLISH_INTERVAL', 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_publishes_listened_tables(self):
+        clients = []
+
+        def connect():
+            clients.append(FakeListenClient(ROWS, NOTIFICATIONS))
+            return clients[-1]
+
+        published = {}
+        changed = threading.Event()
+
+        def on_change(router_id, field, rows):
+            published[field] = (router_id, rows)
+            if len(published) == 2:
+                changed.set()
+
+        tracker = SessionTracker('router_001', connect, on_change)
+        tracker.start()
+        self.addCleanup(tracker.stop)
+        self.assertTrue(changed.wait(2))
+        deadline = time.monotonic() + 2
+        while published['ppp_active'][1] != [{'id': '*2', 'name': 'bob'}] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(published['ppp_active'], ('router_001', [{'id': '*2', 'name': 'bob'}]))
+        self.assertEqual(published['pppoe_interfaces'][1], [{'id': '*p', 'name': '<pppoe-bob>', 'type': 'pppoe-in'}])
+        self.assertTrue(tracker.is_synced('ppp_active'))
+        self.assertEqual(tracker.stats['resyncs'], 2)
+        self.assertEqual(tracker.stats['notifications'], 3)
+        # Each table holds its own connection until the tracker stops
+        self.assertEqual(len(clients), 2)
+        tracker.stop()
+        self.assertTrue(all(client.closed.is_set() for client in clients))
+
+
+if __name__ == '__main__':
+    unittest.main()
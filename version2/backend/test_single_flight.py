@@ -0,0 +1,72 @@
+"""
+Tests for SingleFlight call coalescing.
+Run from this directory: python -m pytest (or python -m unittest).
+"""
+
+import threading
+import unittest
+
+from single_flight import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def run_concurrently(self, flight, key, fn, callers=8):
+        results, errors = [], []
+
+        def call():
+            try:
+                results.append(flight.do(key, fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        return results, errors
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        executions = []
+
+        def fetch():
+            executions.append(1)
+            release.wait(5)
+            return 'rows'
+
+        # Let every caller arrive before the leader finishes
+        threading.Timer(0.2, release.set).start()
+        results, errors = self.run_concurrently(flight, ('router_001', 'refresh'), fetch)
+        self.assertEqual(errors, [])
+        self.assertEqual(results, ['rows'] * 8)
+        self.assertEqual(len(executions), 1)
+        stats = flight.get_stats()
+        self.assertEqual((stats['calls'], stats['executions'], stats['coalesced'], stats['in_flight']), (8, 1, 7, 0))
+        self.assertEqual(stats['by_command']['refresh']['coalesced'], 7)
+
+    def test_exception_reaches_every_caller(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise ConnectionError('unreachable')
+
+        threading.Timer(0.2, release.set).start()
+        results, errors = self.run_concurrently(flight, 'test_connection', fail, callers=4)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(all(isinstance(e, ConnectionError) for e in errors))
+
+    def test_sequential_calls_run_again(self):
+        flight = SingleFlight()
+        counter = iter(range(10))
+        self.assertEqual(flight.do('key', lambda: next(counter)), 0)
+        self.assertEqual(flight.do('key', lambda: next(counter)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from "react";
+import React, { useState, useEffect, useCallback, useRef } from "react";
 import axios from "axios";
 import "bootstrap-icons/font/bootstrap-icons.css";
 import { useRouter, useSocket } from "../App";
@@ -29,6 +29,58 @@ function parseUptimeToSeconds(uptime) {
   return total;
 }
 
+// Row fields the dashboard uses, sent with dashboard_subscribe
+const DASHBOARD_FIELDS = [
+  "pppoe_interfaces.name",
+  "pppoe_interfaces.type",
+  "pppoe_interfaces.running",
+  "pppoe_interfaces.rx_rate",
+  "pppoe_interfaces.tx_rate",
+  "ppp_accounts.name",
+  "ppp_accounts.profile",
+  "ppp_active.name",
+  "ppp_active.address",
+  "ppp_active.uptime",
+];
+
+// Row lists of the dashboard state
+const DASHBOARD_LISTS = ["pppoe_interfaces", "ppp_accounts", "ppp_active"];
+
+// Rows of a columnar table ({columns, rows, dictionaries}); arrays pass through
+function decodeRows(table) {
+  if (!table || Array.isArray(table)) return table || [];
+  const dictionaries = table.columns.map((column) => table.dictionaries[column]);
+  return table.rows.map((values) => {
+    const row = {};
+    table.columns.forEach((column, i) => {
+      const value = values[i];
+      if (value === null) return;
+      row[column] = dictionaries[i] ? dictionaries[i][value] : value;
+    });
+    return row;
+  });
+}
+
+// Key identifying a row across dashboard_update messages (RouterOS .id, else name)
+const rowKey = (row) => (row.id !== undefined ? row.id : row.name);
+
+// Apply a dashboard_update delta message to the last full dashboard state
+function applyDashboardDelta(state, delta) {
+  const next = { ...state, ...delta.set, seq: delta.seq };
+  Object.entries(delta.lists || {}).forEach(([field, diff]) => {
+    const removed = new Set(diff.removed);
+    const patches = new Map(diff.changed.map((patch) => [rowKey(patch), patch]));
+    const rows = (state[field] || [])
+      .filter((row) => !removed.has(rowKey(row)))
+      .map((row) => {
+        const patch = patches.get(rowKey(row));
+        return patch ? { ...row, ...patch } : row;
+      });
+    next[field] = rows.concat(decodeRows(diff.added));
+  });
+  return next;
+}
+
 const Dashboard = () => {
   const [rows, setRows] = useState([]);
   const [lastUpdated, setLastUpdated] = useState(null);
@@ -46,6 +98,8 @@ const Dashboard = () => {
   // Add at the top:
   const { activeRouterId } = useRouter();
   const socket = useSocket();
+  // Last full dashboard state received over the socket, with its sequence number
+  const dashboardStateRef = useRef(null);
   const [pppOffline, setPppOffline] = useState([]); // offline accounts
   // Add state for offline accounts pagination
   const [offlineRowsPerPage, setOfflineRowsPerPage] = useState(20);
@@ -73,42 +127,20 @@ const Dashboard = () => {
       if (a.name) activeMap[normalizeName(a.name)] = a;
     });
     // Build table rows and calculate total speeds
-    const now = Date.now();
     let totalUpload = 0;
     let totalDownload = 0;
     const newRows = pppoeIfaces.map((iface) => {
       const username = normalizeName(iface.name);
       const acc = accountMap[username] || {};
       const act = activeMap[username] || {};
-      // Speed calculation (localStorage, v1 logic)
-      const rxBytes = parseFloat(iface["rx-byte"] || 0);
-      const txBytes = parseFloat(iface["tx-byte"] || 0);
-      const storageKey = `pppoe_stats_${username}`;
-      const prevStatsStr = localStorage.getItem(storageKey);
-      let downloadMbps = "0.00",
-        uploadMbps = "0.00";
-      if (prevStatsStr) {
-        try {
-          const prevStats = JSON.parse(prevStatsStr);
-          const dt = (now - prevStats.t) / 1000;
-          if (dt > 0) {
-            const rxDiff = rxBytes - prevStats.rx;
-            const txDiff = txBytes - prevStats.tx;
-            // SWAP: downloadMbps = txDiff, uploadMbps = rxDiff
-            downloadMbps = ((txDiff * 8) / dt / 1e6).toFixed(2);
-            uploadMbps = ((rxDiff * 8) / dt / 1e6).toFixed(2);
-            // Sum for total speeds
-            totalDownload += txDiff > 0 ? (txDiff * 8) / dt : 0;
-            totalUpload += rxDiff > 0 ? (rxDiff * 8) / dt : 0;
-          }
-        } catch (error) {
-          console.error("Failed to fetch routers:", error);
-        }
-      }
-      localStorage.setItem(
-        storageKey,
-        JSON.stringify({ rx: rxBytes, tx: txBytes, t: now }),
-      );
+      // Rates in bits/s, computed by the server from byte counter deltas.
+      // The router's tx is the subscriber's download and its rx the upload.
+      const rxRate = parseFloat(iface.rx_rate) || 0;
+      const txRate = parseFloat(iface.tx_rate) || 0;
+      const downloadMbps = (txRate / 1e6).toFixed(2);
+      const uploadMbps = (rxRate / 1e6).toFixed(2);
+      totalDownload += txRate;
+      totalUpload += rxRate;
       return {
         name: username,
         profile: acc.profile || acc.plan || "-",
@@ -258,12 +290,48 @@ const Dashboard = () => {
         console.error("Failed to fetch dashboard data:", error);
       });
     if (!socket) return;
-    const handler = (data) => {
-      processDashboardData(data);
+    // The server sends a full state, then deltas against the previous sequence number
+    const handler = (message) => {
+      if (message.router_id && message.router_id !== activeRouterId) return;
+      if (message.type === "delta") {
+        const state = dashboardStateRef.current;
+        // Still waiting for the full state requested earlier
+        if (!state) return;
+        if (state.seq !== message.base_seq) {
+          // Missed a message: ask for the full state again
+          dashboardStateRef.current = null;
+          socket.emit("dashboard_resync", { router_id: activeRouterId });
+          return;
+        }
+        dashboardStateRef.current = applyDashboardDelta(state, message);
+      } else {
+        const state = { ...message };
+        DASHBOARD_LISTS.forEach((field) => {
+          if (state[field]) state[field] = decodeRows(state[field]);
+        });
+        dashboardStateRef.current = state;
+      }
+      processDashboardData(dashboardStateRef.current);
+      // Processed: the server holds back further updates until this arrives
+      socket.emit("dashboard_ack", { seq: message.seq });
+    };
+    // Join the room of the viewed router; the server answers with the full state.
+    // Only the fields processDashboardData reads are sent, as columnar tables.
+    const subscribe = () => {
+      dashboardStateRef.current = null;
+      socket.emit("dashboard_subscribe", {
+        router_id: activeRouterId,
+        fields: DASHBOARD_FIELDS,
+        format: "columnar",
+      });
     };
     socket.on("dashboard_update", handler);
+    socket.on("connect", subscribe);
+    subscribe();
     return () => {
       socket.off("dashboard_update", handler);
+      socket.off("connect", subscribe);
+      socket.emit("dashboard_unsubscribe");
     };
   }, [activeRouterId, socket]);
 
@@ -11,6 +11,20 @@ import GroupModal from "./GroupModal";
 
 const API_BASE_URL = "http://localhost:80/api";
 
+// Members of a group by status: the server's member_stats (members found on the
+// router) when it sent them, else counted from the accounts' online flags
+const memberCounts = (group) => {
+  if (group.member_stats) {
+    const { total, online, offline } = group.member_stats;
+    return { total, online, offline };
+  }
+  const total = group.accounts ? group.accounts.length : 0;
+  const online = group.accounts
+    ? group.accounts.filter((acc) => acc.online).length
+    : 0;
+  return { total, online, offline: total - online };
+};
+
 function Groups() {
   const [groups, setGroups] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -53,7 +67,7 @@ function Groups() {
       try {
         const [groupsRes, pppActiveRes] = await Promise.all([
           axios.get(`${API_BASE_URL}/groups?router_id=${activeRouterId}`),
-          axios.get(`${API_BASE_URL}/ppp_active`),
+          axios.get(`${API_BASE_URL}/ppp_active?fields=name`),
         ]);
 
         if (groupsRes.data.success) {
@@ -131,7 +145,7 @@ function Groups() {
   // Helper: Load all PPP accounts (usernames)
   const loadAllAccounts = async () => {
     try {
-      const res = await axios.get(`${API_BASE_URL}/ppp_accounts`);
+      const res = await axios.get(`${API_BASE_URL}/ppp_accounts?fields=name`);
       if (res.data.success && Array.isArray(res.data.ppp_accounts)) {
         return res.data.ppp_accounts.map((a) => a.name);
       }
@@ -160,12 +174,12 @@ function Groups() {
       .sort((a, b) => {
         // Sort by priority: Red (offline) first, then Orange, then Blue, then Green
         const getPriority = (group) => {
-          const totalMembers = group.accounts ? group.accounts.length : 0;
+          const {
+            total: totalMembers,
+            online: onlineMembers,
+            offline: offlineMembers,
+          } = memberCounts(group);
           if (totalMembers === 0) return 3; // Blue for no members
-          const onlineMembers = group.accounts
-            ? group.accounts.filter((acc) => acc.online).length
-            : 0;
-          const offlineMembers = totalMembers - onlineMembers;
           const onlinePercentage = (onlineMembers / totalMembers) * 100;
           if (onlinePercentage === 0 || offlineMembers >= totalMembers * 0.5) {
             return 0; // Red - highest priority
@@ -498,22 +512,23 @@ function Groups() {
               {filteredAndSortedGroups.map((group) => {
                 // Calculate online/offline status
                 const totalMembers = group.accounts ? group.accounts.length : 0;
-                const onlineMembers = group.accounts
-                  ? group.accounts.filter((acc) => acc.online).length
-                  : 0;
-                const offlineMembers = totalMembers - onlineMembers;
+                const {
+                  total: statusMembers,
+                  online: onlineMembers,
+                  offline: offlineMembers,
+                } = memberCounts(group);
 
                 // Determine header color based on status
                 let headerClass = "bg-primary"; // default
-                if (totalMembers > 0) {
-                  const onlinePercentage = (onlineMembers / totalMembers) * 100;
+                if (statusMembers > 0) {
+                  const onlinePercentage = (onlineMembers / statusMembers) * 100;
                   if (onlinePercentage === 100) {
                     headerClass = "bg-success"; // All online - Green
                   } else if (onlinePercentage === 0) {
                     headerClass = "bg-danger"; // All offline - Red
-                  } else if (offlineMembers >= totalMembers * 0.5) {
+                  } else if (offlineMembers >= statusMembers * 0.5) {
                     headerClass = "bg-danger"; // >50% offline - Red
-                  } else if (offlineMembers === totalMembers * 0.5) {
+                  } else if (offlineMembers === statusMembers * 0.5) {
                     headerClass = "bg-warning"; // Exactly 50% offline - Orange
                   } else {
                     headerClass = "bg-primary"; // <50% offline - Blue